@@ -0,0 +1,139 @@
+import argparse
+import concurrent.futures
+import glob
+import json
+import os
+import sys
+import time
+from typing import Iterable, Iterator, List
+
+import src.file_parser as fp
+from src.sliding_block_puzzle import SearchLimitExceeded, SearchStrategies
+
+"""
+Batch solving of many puzzle files with a process pool
+
+Puzzle files are collected from a directory, a glob pattern or a manifest file which lists
+one puzzle file per line. Each puzzle is solved by a long living worker process of the pool,
+so interpreter startup is paid once per worker instead of once per puzzle. Each solve has its
+own node budget and time limit, which are checked by the search itself, and results are
+streamed as JSON lines in the order they complete.
+"""
+
+# Result statuses of a puzzle
+SOLVED_STATUS = 'solved'
+UNSOLVABLE_STATUS = 'unsolvable'
+LIMIT_EXCEEDED_STATUS = 'limit exceeded'
+ERROR_STATUS = 'error'
+
+# Number of puzzles submitted to the pool ahead for each worker
+SUBMISSIONS_PER_WORKER = 4
+PUZZLE_FILE_EXTENSION = '.inp'
+
+
+def collect_puzzle_files(directory: str = None, pattern: str = None, manifest: str = None) -> List[str]:
+    """
+    Collect puzzle files from a directory, a glob pattern or a manifest file
+    :param directory: Directory whose puzzle files are collected
+    :param pattern: Glob pattern of puzzle files which may be recursive
+    :param manifest: Manifest file which lists one puzzle file per line where relative paths are resolved with respect
+    to the manifest file and empty lines are skipped
+    :return: Sorted puzzle file paths
+    """
+    puzzle_files = []
+    if directory is not None:
+        puzzle_files.extend(os.path.join(directory, file_name) for file_name in os.listdir(directory)
+                            if file_name.endswith(PUZZLE_FILE_EXTENSION))
+    if pattern is not None:
+        puzzle_files.extend(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    if manifest is not None:
+        manifest_directory = os.path.dirname(manifest)
+        with open(manifest) as f:
+            puzzle_files.extend(os.path.join(manifest_directory, line.strip()) for line in f if line.strip())
+    return sorted(puzzle_files)
+
+
+def solve_puzzle_file(path: str, strategy: str = SearchStrategies.A_STAR.value, node_budget: int = None,
+                      time_limit: float = None) -> dict:
+    """
+    Solve the puzzle of the given file where exceptions are reported in the result instead of being raised
+    :param path: Puzzle file path
+    :param strategy: Value of the search strategy which can be reached from SearchStrategies enumeration
+    :param node_budget: Maximum number of node expansions where None means no limit
+    :param time_limit: Maximum duration of the search in seconds where None means no limit
+    :return: Result dictionary with file, status, move count, elapsed time and error message
+    """
+    result = {'file': path, 'status': ERROR_STATUS, 'moves': None, 'time': None, 'error': None}
+    start_time = time.monotonic()
+    try:
+        with open(path) as f:
+            puzzle = fp.PuzzleInputParser.parse_file(f)
+        solution_exists, solution_path = puzzle.solve_with_strategy(strategy, node_budget=node_budget,
+                                                                    time_limit=time_limit)
+        if solution_exists:
+            result['status'] = SOLVED_STATUS
+            result['moves'] = len(solution_path) - 1
+        else:
+            result['status'] = UNSOLVABLE_STATUS
+    except SearchLimitExceeded as e:
+        result['status'] = LIMIT_EXCEEDED_STATUS
+        result['error'] = str(e)
+    except Exception as e:
+        result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+    result['time'] = time.monotonic() - start_time
+    return result
+
+
+def solve_batch(puzzle_files: Iterable[str], workers: int = None, strategy: str = SearchStrategies.A_STAR.value,
+                node_budget: int = None, time_limit: float = None) -> Iterator[dict]:
+    """
+    Solve the given puzzle files with a process pool and yield the results as they complete
+    :param puzzle_files: Puzzle file paths
+    :param workers: Number of worker processes where None means the number of processors
+    :param strategy: Value of the search strategy which can be reached from SearchStrategies enumeration
+    :param node_budget: Maximum number of node expansions of each puzzle where None means no limit
+    :param time_limit: Maximum duration of each puzzle in seconds where None means no limit
+    :return: Iterator of result dictionaries
+    """
+    workers = workers or os.cpu_count() or 1
+    puzzle_file_iterator = iter(puzzle_files)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # Only a bounded number of puzzles are submitted ahead, so huge batches do not keep a future per puzzle
+        pending_futures = set()
+        while True:
+            for path in puzzle_file_iterator:
+                pending_futures.add(executor.submit(solve_puzzle_file, path, strategy, node_budget, time_limit))
+                if len(pending_futures) >= workers * SUBMISSIONS_PER_WORKER:
+                    break
+            if not pending_futures:
+                return
+            completed_futures, pending_futures = concurrent.futures.wait(
+                pending_futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in completed_futures:
+                yield future.result()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve many puzzle files with a process pool')
+    parser.add_argument('-d', '--directory', help='Directory whose puzzle files are solved', default=None)
+    parser.add_argument('-g', '--glob', help='Glob pattern of puzzle files to solve', default=None)
+    parser.add_argument('-m', '--manifest', help='Manifest file listing one puzzle file per line', default=None)
+    parser.add_argument('-w', '--workers', help='Number of worker processes', type=int, default=None)
+    # Pool workers cannot start processes of their own, so parallel A* search is not offered
+    parser.add_argument('-s', '--strategy', help='Search strategy to solve puzzles',
+                        choices=[strategy.value for strategy in SearchStrategies
+                                 if strategy != SearchStrategies.PARALLEL_A_STAR],
+                        default=SearchStrategies.A_STAR.value)
+    parser.add_argument('--node-budget', help='Maximum number of node expansions of each puzzle', type=int,
+                        default=None)
+    parser.add_argument('--time-limit', help='Maximum duration of each puzzle in seconds', type=float, default=None)
+    args = parser.parse_args()
+
+    if args.directory is None and args.glob is None and args.manifest is None:
+        parser.error('one of --directory, --glob and --manifest is required')
+
+    # Stream results as JSON lines in completion order
+    for batch_result in solve_batch(collect_puzzle_files(args.directory, args.glob, args.manifest), args.workers,
+                                    args.strategy, args.node_budget, args.time_limit):
+        sys.stdout.write(json.dumps(batch_result) + '\n')
+        sys.stdout.flush()
@@ -0,0 +1,305 @@
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional
+
+import src.file_parser as fp
+import src.puzzle_generator as pg
+from src.search_statistics import SearchStatistics
+from src.sliding_block_puzzle import SearchLimitExceeded, SearchStrategies
+
+try:
+    import resource
+except ImportError:
+    # Peak memory is not reported where the resource module does not exist
+    resource = None
+
+"""
+Reproducible benchmark of search strategies and heuristics over generated puzzle families
+
+Puzzles of each family are generated with a fixed seed, see puzzle_generator, so every run solves
+the same puzzles. Each case, i.e. a puzzle solved with a strategy and a heuristic, runs in a fresh
+process so that its peak resident memory is not hidden by earlier cases. Results of the cases are
+summarized per family, strategy and heuristic, and summaries can be stored as a baseline which
+later runs are compared against to flag regressions.
+"""
+
+# Families of generated puzzles
+BENCHMARK_FAMILIES = [
+    {'name': '3x3-4-blocks', 'rows': 3, 'columns': 3, 'block_count': 4, 'final_state_count': 1, 'walk_length': 30},
+    {'name': '4x4-6-blocks-3-goals', 'rows': 4, 'columns': 4, 'block_count': 6, 'final_state_count': 3,
+     'walk_length': 20},
+    {'name': '4x5-9-blocks', 'rows': 4, 'columns': 5, 'block_count': 9, 'final_state_count': 1, 'walk_length': 16},
+    {'name': '5x5-12-blocks-2-goals', 'rows': 5, 'columns': 5, 'block_count': 12, 'final_state_count': 2,
+     'walk_length': 12},
+]
+DEFAULT_STRATEGIES = [SearchStrategies.A_STAR.value, SearchStrategies.IDA_STAR.value,
+                      SearchStrategies.BIDIRECTIONAL.value]
+DEFAULT_HEURISTICS = [0, 1]
+DEFAULT_INSTANCES = 3
+DEFAULT_SEED = 0
+# Maximum duration of each case in seconds so that a slow strategy cannot stall the whole run
+DEFAULT_TIME_LIMIT = 10.0
+# IDA* search revisits too many states of crowded boards without a transposition table
+DEFAULT_TRANSPOSITION_TABLE_SIZE = 100000
+# Relative change of a metric which is flagged as a regression
+DEFAULT_TOLERANCE = 0.25
+# Time differences below this number of seconds are not flagged since timings of tiny cases are mostly noise
+MINIMUM_TIME_DIFFERENCE = 0.05
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE_PATH = os.path.join(REPOSITORY_DIRECTORY, 'benchmarks', 'baseline.json')
+# Family of the startup benchmark whose puzzles are solved in a few milliseconds
+STARTUP_FAMILY = BENCHMARK_FAMILIES[0]
+
+# Result statuses of a case
+SOLVED_STATUS = 'solved'
+UNSOLVABLE_STATUS = 'unsolvable'
+LIMIT_EXCEEDED_STATUS = 'limit exceeded'
+
+
+def find_peak_memory() -> Optional[int]:
+    """
+    Peak resident memory of the current process in kilobytes where None means it cannot be measured
+    """
+    if resource is None:
+        return None
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Peak memory is reported in bytes on macOS and in kilobytes elsewhere
+    return peak_memory // 1024 if sys.platform == 'darwin' else peak_memory
+
+
+def run_case(puzzle_dict: dict, strategy: str, heuristic: int, node_budget: int = None, time_limit: float = None,
+             transposition_table_size: int = DEFAULT_TRANSPOSITION_TABLE_SIZE) -> dict:
+    """
+    Solve the given puzzle with the given strategy and heuristic
+    :return: Result dictionary with status, time, expansions, expansions per second, peak memory and path length where
+    expansions are only counted by A* search
+    """
+    puzzle = fp.PuzzleInputParser.parse_dict(dict(puzzle_dict, **{fp.PuzzleInputParser.HEURISTIC_LABEL: heuristic}))
+    statistics = SearchStatistics() if strategy == SearchStrategies.A_STAR.value else None
+    result = {'status': LIMIT_EXCEEDED_STATUS, 'time': None, 'expansions': None, 'expansions_per_second': None,
+              'peak_memory': None, 'path_length': None}
+    start_time = time.perf_counter()
+    try:
+        solution_exists, solution_path = puzzle.solve_with_strategy(strategy, transposition_table_size, node_budget,
+                                                                    time_limit, statistics=statistics)
+        result['status'] = SOLVED_STATUS if solution_exists else UNSOLVABLE_STATUS
+        result['path_length'] = len(solution_path) - 1 if solution_exists else None
+    except SearchLimitExceeded:
+        pass
+    result['time'] = time.perf_counter() - start_time
+    if statistics is not None:
+        result['expansions'] = statistics.expansion_count
+        result['expansions_per_second'] = statistics.expansions_per_second
+    result['peak_memory'] = find_peak_memory()
+    return result
+
+
+def run_benchmark(families: List[dict] = None, strategies: List[str] = None, heuristics: List[int] = None,
+                  instances: int = DEFAULT_INSTANCES, seed: int = DEFAULT_SEED, node_budget: int = None,
+                  time_limit: float = None,
+                  transposition_table_size: int = DEFAULT_TRANSPOSITION_TABLE_SIZE) -> Iterable[dict]:
+    """
+    Run every case of the given families, strategies and heuristics where each case runs in a fresh process
+    :param families: Families of generated puzzles where None means BENCHMARK_FAMILIES
+    :param strategies: Values of the search strategies where None means DEFAULT_STRATEGIES
+    :param heuristics: Heuristic functions where None means DEFAULT_HEURISTICS
+    :param instances: Number of generated puzzles of each family
+    :param seed: Seed of the generator which is shifted for each family
+    :param node_budget: Maximum number of node expansions of each case where None means no limit
+    :param time_limit: Maximum duration of each case in seconds where None means no limit
+    :param transposition_table_size: Maximum number of states kept in the transposition table of IDA* Search
+    :return: Iterator of result dictionaries which also have the family, instance, strategy and heuristic of the case
+    """
+    families = BENCHMARK_FAMILIES if families is None else families
+    strategies = DEFAULT_STRATEGIES if strategies is None else strategies
+    heuristics = DEFAULT_HEURISTICS if heuristics is None else heuristics
+    # Cases run one at a time since parallel cases would disturb the timings of each other
+    with multiprocessing.get_context().Pool(1, maxtasksperchild=1) as pool:
+        for family_index, family in enumerate(families):
+            generation_options = {key: value for key, value in family.items() if key != 'name'}
+            puzzle_dicts = pg.generate_puzzles(instances, seed + family_index, **generation_options)
+            for instance, puzzle_dict in enumerate(puzzle_dicts):
+                for strategy in strategies:
+                    for heuristic in heuristics:
+                        result = pool.apply(run_case, (puzzle_dict, strategy, heuristic, node_budget, time_limit,
+                                                             transposition_table_size))
+                        yield dict({'family': family['name'], 'instance': instance, 'strategy': strategy,
+                                    'heuristic': heuristic}, **result)
+
+
+def _time_command(arguments: List[str]) -> float:
+    """
+    Duration in seconds of running the interpreter with the given arguments from the repository directory
+    """
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable] + arguments, cwd=REPOSITORY_DIRECTORY, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start_time
+
+
+def run_startup_benchmark(family: dict = None, instances: int = DEFAULT_INSTANCES,
+                          seed: int = DEFAULT_SEED) -> Dict[str, float]:
+    """
+    Compare short solves through a fresh command line process against the same solves of a warm solver server
+    :param family: Family of generated puzzles where None means STARTUP_FAMILY
+    :param instances: Number of generated puzzles
+    :param seed: Seed of the generator
+    :return: Median durations in seconds of starting the interpreter, importing the solver, solving a puzzle through
+    the command line, answering it by the solver server and searching it in process
+    """
+    family = STARTUP_FAMILY if family is None else family
+    generation_options = {key: value for key, value in family.items() if key != 'name'}
+    # One more puzzle warms the server up, so its first timed answer does not pay for starting it
+    puzzle_dicts = list(pg.generate_puzzles(instances + 1, seed, **generation_options))
+    timings = {'interpreter': [], 'import': [], 'command_line': [], 'server': [], 'search': []}
+    with tempfile.TemporaryDirectory() as directory:
+        for instance, puzzle_dict in enumerate(puzzle_dicts[1:]):
+            path = os.path.join(directory, 'puzzle-{0}.inp'.format(instance))
+            with open(path, 'w') as f:
+                json.dump(puzzle_dict, f)
+            timings['interpreter'].append(_time_command(['-c', 'pass']))
+            timings['import'].append(_time_command(['-c', 'import src.sliding_block_puzzle']))
+            timings['command_line'].append(_time_command(['-m', 'src.sliding_block_puzzle', '-f', path,
+                                                          '-o', 'moves']))
+            timings['search'].append(run_case(puzzle_dict, SearchStrategies.A_STAR.value,
+                                              puzzle_dict[fp.PuzzleInputParser.HEURISTIC_LABEL])['time'])
+
+    with subprocess.Popen([sys.executable, '-m', 'src.solver_server'], cwd=REPOSITORY_DIRECTORY,
+                          stdin=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True) as server:
+        for instance, puzzle_dict in enumerate(puzzle_dicts):
+            start_time = time.perf_counter()
+            server.stdin.write(json.dumps(puzzle_dict) + '\n')
+            server.stdin.flush()
+            server.stdout.readline()
+            if instance > 0:
+                timings['server'].append(time.perf_counter() - start_time)
+        server.stdin.close()
+    return {name: statistics.median(durations) for name, durations in timings.items()}
+
+
+def summarize(results: Iterable[dict]) -> Dict[str, dict]:
+    """
+    Summarize the given results per family, strategy and heuristic
+    :return: Summary of each case group keyed by family, strategy and heuristic separated by slashes with solved case
+    count, total time, mean expansions per second, maximum peak memory and total path length
+    """
+    summary = {}
+    for result in results:
+        key = '{0}/{1}/{2}'.format(result['family'], result['strategy'], result['heuristic'])
+        group = summary.setdefault(key, {'cases': 0, 'solved': 0, 'time': 0.0, 'expansions_per_second': None,
+                                         'peak_memory': None, 'path_length': 0, '_rates': []})
+        group['cases'] += 1
+        group['time'] += result['time']
+        if result['status'] != LIMIT_EXCEEDED_STATUS:
+            group['solved'] += 1
+        if result['path_length'] is not None:
+            group['path_length'] += result['path_length']
+        if result['expansions_per_second'] is not None:
+            group['_rates'].append(result['expansions_per_second'])
+        if result['peak_memory'] is not None:
+            group['peak_memory'] = max(group['peak_memory'] or 0, result['peak_memory'])
+    for group in summary.values():
+        rates = group.pop('_rates')
+        if rates:
+            group['expansions_per_second'] = sum(rates) / len(rates)
+    return summary
+
+
+def find_regressions(summary: Dict[str, dict], baseline: Dict[str, dict],
+                     tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    """
+    Compare the given summary against the baseline where only groups of both are compared
+    :param summary: Summary of the current run, see summarize
+    :param baseline: Summary of the baseline run
+    :param tolerance: Relative change of time, expansions per second and peak memory which is flagged
+    :return: Regression dictionaries with the group, metric, baseline value and current value
+    """
+    regressions = []
+
+    def flag(key: str, metric: str):
+        regressions.append({'group': key, 'metric': metric, 'baseline': baseline[key][metric],
+                            'current': summary[key][metric]})
+
+    for key in sorted(summary.keys() & baseline.keys()):
+        current, previous = summary[key], baseline[key]
+        if current['solved'] < previous['solved']:
+            flag(key, 'solved')
+        # Longer paths of the same solved cases mean a search lost its optimality
+        elif current['path_length'] > previous['path_length']:
+            flag(key, 'path_length')
+        if current['time'] > previous['time'] * (1 + tolerance) and \
+                current['time'] - previous['time'] > MINIMUM_TIME_DIFFERENCE:
+            flag(key, 'time')
+        if current['expansions_per_second'] is not None and previous['expansions_per_second'] is not None and \
+                current['expansions_per_second'] < previous['expansions_per_second'] * (1 - tolerance):
+            flag(key, 'expansions_per_second')
+        if current['peak_memory'] is not None and previous['peak_memory'] is not None and \
+                current['peak_memory'] > previous['peak_memory'] * (1 + tolerance):
+            flag(key, 'peak_memory')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark search strategies over generated puzzle families')
+    parser.add_argument('-s', '--strategies', help='Search strategies to benchmark', nargs='+',
+                        choices=[strategy.value for strategy in SearchStrategies], default=DEFAULT_STRATEGIES)
+    parser.add_argument('--heuristics', help='Heuristic functions to benchmark', nargs='+', type=int,
+                        default=DEFAULT_HEURISTICS)
+    parser.add_argument('--families', help='Names of the puzzle families to benchmark', nargs='+',
+                        choices=[family['name'] for family in BENCHMARK_FAMILIES], default=None)
+    parser.add_argument('-n', '--instances', help='Number of generated puzzles of each family', type=int,
+                        default=DEFAULT_INSTANCES)
+    parser.add_argument('--seed', help='Seed of the puzzle generator', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--node-budget', help='Maximum number of node expansions of each case', type=int,
+                        default=None)
+    parser.add_argument('--time-limit', help='Maximum duration of each case in seconds', type=float,
+                        default=DEFAULT_TIME_LIMIT)
+    parser.add_argument('--transposition-table-size', help='Maximum number of states kept by IDA* transposition table',
+                        type=int, default=DEFAULT_TRANSPOSITION_TABLE_SIZE)
+    parser.add_argument('--baseline', help='Baseline summary file to compare against or to save',
+                        default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--save-baseline', help='Save the summary as the baseline instead of comparing',
+                        action='store_true')
+    parser.add_argument('--tolerance', help='Relative change of a metric flagged as a regression', type=float,
+                        default=DEFAULT_TOLERANCE)
+    parser.add_argument('--startup', help='Compare command line solves against a warm solver server instead',
+                        action='store_true')
+    args = parser.parse_args()
+
+    selected_families = None if args.families is None else \
+        [family for family in BENCHMARK_FAMILIES if family['name'] in args.families]
+    if args.startup:
+        startup_timings = run_startup_benchmark(None if selected_families is None else selected_families[0],
+                                                args.instances, args.seed)
+        sys.stdout.write(json.dumps(startup_timings) + '\n')
+        sys.exit(0)
+
+    benchmark_results = []
+    # Stream results of the cases as JSON lines
+    for benchmark_result in run_benchmark(selected_families, args.strategies, args.heuristics, args.instances,
+                                          args.seed, args.node_budget, args.time_limit,
+                                          args.transposition_table_size):
+        benchmark_results.append(benchmark_result)
+        sys.stdout.write(json.dumps(benchmark_result) + '\n')
+        sys.stdout.flush()
+    benchmark_summary = summarize(benchmark_results)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(benchmark_summary, f, indent=2, sort_keys=True)
+            f.write('\n')
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        benchmark_baseline = json.load(f)
+    benchmark_regressions = find_regressions(benchmark_summary, benchmark_baseline, args.tolerance)
+    for benchmark_regression in benchmark_regressions:
+        sys.stderr.write('Regression: ' + json.dumps(benchmark_regression) + '\n')
+    sys.exit(1 if benchmark_regressions else 0)
@@ -0,0 +1,209 @@
+import heapq
+import math
+import os
+import tempfile
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+"""
+External memory search whose layers are kept in sorted binary files instead of memory
+
+Breadth First Iterative Deepening A* Search visits states layer by layer in breadth first order
+and prunes every state whose f value exceeds the current bound. The bound starts at the heuristic
+value of the initial state and grows to the smallest pruned f value after each iteration, so the
+first solution found is optimal with an admissible heuristic.
+
+Each layer is a file of fixed size encoded states in sorted order. Children of a layer are read
+from its file sequentially and buffered in memory up to the run size, then each buffer is written
+as a sorted run without duplicates. Duplicates are detected later, when all runs are merged as
+sorted streams and states of the previous two layers are subtracted. Every move costs one and can
+be reverted, so a child can only be in the previous, the same or the next layer. The memory usage is
+bounded by the run size whatever the size of a layer is.
+
+All layers of an iteration stay on disk until it ends, so the solution path is rebuilt backwards
+from the final state by looking its neighbours up in the previous layer files with binary search.
+"""
+
+# Maximum number of children buffered in memory before they are written as a sorted run
+DEFAULT_RUN_SIZE = 1 << 18
+# Number of states read from a file at once
+READ_BUFFER_STATES = 1 << 12
+
+
+def solve_external(puzzle, directory: str = None, run_size: int = DEFAULT_RUN_SIZE, node_budget: int = None,
+                   time_limit: float = None) -> Tuple[bool, Optional[List[bytes]]]:
+    """
+    Solve the given puzzle with Breadth First Iterative Deepening A* Search whose layers are kept on disk
+    :param puzzle: Puzzle to solve whose moves slide blocks by one cell
+    :param directory: Directory where layer files are created where None means the default temporary directory
+    :param run_size: Maximum number of children buffered in memory before they are written as a sorted run
+    :param node_budget: Maximum number of node expansions of all iterations where None means no limit
+    :param time_limit: Maximum duration of the search in seconds where None means no limit
+    :return: Whether a solution exists and the solution states starting from the initial state
+    """
+    # Import here since the puzzle module imports this module lazily
+    from src.sliding_block_puzzle import SearchLimits
+
+    if run_size <= 0:
+        raise ValueError("Run size should be positive.")
+    limits = SearchLimits.create(node_budget, time_limit)
+    heuristic = puzzle.heuristic
+    bound = _round_up(heuristic.value(heuristic.evaluate(puzzle.encoded_initial_state)))
+    while not math.isinf(bound):
+        with tempfile.TemporaryDirectory(dir=directory) as iteration_directory:
+            solution_states, bound = _search_layers(puzzle, iteration_directory, run_size, bound, limits)
+        if solution_states is not None:
+            return True, solution_states
+
+    # If this point is reached, then every state which can reach a final state is visited
+    return False, None
+
+
+def _search_layers(puzzle, directory: str, run_size: int, bound: float, limits) \
+        -> Tuple[Optional[List[bytes]], float]:
+    """
+    Run one iteration of the search with the given bound
+    :return: Solution states if a final state is found and the smallest f value which exceeds the bound
+    """
+    state_size = len(puzzle.encoded_initial_state)
+    final_state_set = puzzle.encoded_final_state_set
+    heuristic = puzzle.heuristic
+    move_generator = puzzle.move_generator
+    next_bound = math.inf
+
+    layer_paths = [os.path.join(directory, 'layer-0.bin')]
+    with open(layer_paths[0], 'wb') as f:
+        f.write(puzzle.encoded_initial_state)
+    if puzzle.encoded_initial_state in final_state_set:
+        return [puzzle.encoded_initial_state], bound
+
+    layer_size = 1
+    while layer_size:
+        depth = len(layer_paths) - 1
+        # Children of the layer are buffered and spilled as sorted runs
+        run_paths = []
+        children = set()
+        for state in _read_states(layer_paths[-1], state_size):
+            if limits is not None:
+                limits.expand()
+            components = heuristic.evaluate(state)
+            for child_state, move in move_generator.successors(state):
+                child_f_value = depth + 1 + _round_up(heuristic.value(heuristic.update(
+                    components, move.block, state.find(move.block), child_state.find(move.block))))
+                if child_f_value > bound:
+                    next_bound = min(next_bound, child_f_value)
+                    continue
+                children.add(child_state)
+                if len(children) >= run_size:
+                    run_paths.append(_write_run(directory, depth + 1, len(run_paths), children))
+                    children = set()
+        if children:
+            run_paths.append(_write_run(directory, depth + 1, len(run_paths), children))
+
+        # Merge runs into the next layer while removing duplicates and states of the previous two layers
+        layer_paths.append(os.path.join(directory, 'layer-{0}.bin'.format(depth + 1)))
+        known_states = heapq.merge(*[_read_states(path, state_size) for path in layer_paths[-3:-1]])
+        new_states = _subtract(_unique(heapq.merge(*[_read_states(path, state_size) for path in run_paths])),
+                               known_states)
+        final_state = None
+        with open(layer_paths[-1], 'wb') as f:
+            layer_size = 0
+            for new_state in new_states:
+                f.write(new_state)
+                layer_size += 1
+                if final_state is None and new_state in final_state_set:
+                    final_state = new_state
+        for path in run_paths:
+            os.remove(path)
+        if final_state is not None:
+            return _trace_layers(move_generator, layer_paths, final_state, state_size), bound
+
+    return None, next_bound
+
+
+def _trace_layers(move_generator, layer_paths: List[str], final_state: bytes, state_size: int) -> List[bytes]:
+    """
+    Rebuild the path to the given final state of the last layer where the parent of each state is its neighbour in the
+    previous layer since moves can be reverted
+    :return: Encoded states starting from the initial state
+    """
+    solution_states = [final_state]
+    for path in reversed(layer_paths[:-1]):
+        with open(path, 'rb') as f:
+            solution_states.append(next(state for state, _ in move_generator.successors(solution_states[-1])
+                                        if _contains(f, state, state_size)))
+    solution_states.reverse()
+    return solution_states
+
+
+def _round_up(heuristic_value: float) -> float:
+    """
+    Round up the given heuristic value to an integer where a small tolerance absorbs floating point errors
+    """
+    if math.isinf(heuristic_value):
+        return heuristic_value
+    return math.ceil(heuristic_value - 1e-9)
+
+
+def _write_run(directory: str, depth: int, run_index: int, states: set) -> str:
+    """
+    Write the given states in sorted order as a run of the given layer
+    :return: Path of the run file
+    """
+    path = os.path.join(directory, 'run-{0}-{1}.bin'.format(depth, run_index))
+    with open(path, 'wb') as f:
+        f.write(b''.join(sorted(states)))
+    return path
+
+
+def _read_states(path: str, state_size: int) -> Iterator[bytes]:
+    """
+    Read the states of the given file sequentially in large chunks
+    """
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(state_size * READ_BUFFER_STATES)
+            if not chunk:
+                return
+            for offset in range(0, len(chunk), state_size):
+                yield chunk[offset:offset + state_size]
+
+
+def _unique(sorted_states: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Skip repeated states of the given sorted stream
+    """
+    previous_state = None
+    for state in sorted_states:
+        if state != previous_state:
+            yield state
+            previous_state = state
+
+
+def _subtract(sorted_states: Iterator[bytes], sorted_known_states: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Skip states of the first sorted stream which are in the second sorted stream
+    """
+    known_state = next(sorted_known_states, None)
+    for state in sorted_states:
+        while known_state is not None and known_state < state:
+            known_state = next(sorted_known_states, None)
+        if state != known_state:
+            yield state
+
+
+def _contains(f: BinaryIO, state: bytes, state_size: int) -> bool:
+    """
+    Find whether the given sorted layer file has the given state with binary search
+    """
+    low, high = 0, os.fstat(f.fileno()).st_size // state_size
+    while low < high:
+        middle = (low + high) // 2
+        f.seek(middle * state_size)
+        middle_state = f.read(state_size)
+        if middle_state == state:
+            return True
+        if middle_state < state:
+            low = middle + 1
+        else:
+            high = middle
+    return False
@@ -0,0 +1,172 @@
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+import src as common
+import src.state_transitions as st
+
+"""
+Static feasibility checks which reject final states that cannot be reached from the initial state
+
+The following invariants hold for every state reachable from the initial state, so a final state
+breaking any of them is unreachable:
+
+1) Blocks: Blocks never change their shapes, so a final state should have the same blocks with the
+   same footprints.
+2) Frozen blocks: A set of blocks each of which is blocked by the board edges and the blocks of the
+   same set in every direction can never move, since the first of them to move would need a cell of
+   another one. The largest such set is found by removing movable blocks until none is left.
+3) Block reachability: A movable block can only reach the anchors that are connected to its initial
+   anchor through slides avoiding frozen blocks, where other movable blocks are ignored.
+4) Parity: If every block is a single cell and there is exactly one empty cell, each move swaps the
+   empty cell with a block, so the permutation parity of the board flips together with the parity of
+   the empty cell position, as in the 15 puzzle.
+5) Separators: A block covering a whole row of the board can only slide up and down, and no other
+   block can enter the row it covers, so every other block stays above or below it. The same holds
+   for a block covering a whole column with the blocks on its left and right.
+
+Moves can be reverted, so every state reachable from the initial state reaches the same final
+states. Final states rejected here can therefore be dropped from the goal set and the heuristic of
+the whole search instead of being checked node by node.
+"""
+
+
+class FeasibilityChecker(object):
+
+    def __init__(self, move_generator: st.MoveGenerator, initial_state: bytes):
+        if isinstance(move_generator, st.MacroMoveGenerator):
+            # Moves sliding blocks by many cells are sequences of single cell slides, so the same invariants hold
+            move_generator = move_generator.move_generator
+        self.move_generator = move_generator
+        self.initial_state = initial_state
+        self.rows = move_generator.rows
+        self.columns = move_generator.columns
+        self.footprints = {block: self._find_footprint(initial_state, block) for block in move_generator.block_slides}
+        self.frozen_blocks = self._find_frozen_blocks()
+        # Without frozen blocks, a block reaches every anchor where it fits onto the board, so nothing is restricted
+        self.reachable_anchors = {}
+        if self.frozen_blocks:
+            frozen_cells = {cell for cell, block in enumerate(initial_state) if block in self.frozen_blocks}
+            self.reachable_anchors = {block: self._find_reachable_anchors(block, frozen_cells)
+                                      for block in self.footprints if block not in self.frozen_blocks}
+        self.has_parity_invariant = initial_state.count(common.EMPTY_CELL_BLOCK) == 1 and \
+            all(len(footprint) == 1 for footprint in self.footprints.values())
+        self.initial_parity = self._find_parity(initial_state) if self.has_parity_invariant else None
+        # Blocks covering a whole row or column together with whether the full line is a row
+        self.separators = [(block, is_row) for block in self.footprints for is_row in (True, False)
+                           if self._find_full_line(initial_state, block, is_row) is not None]
+        self.initial_sides = self._find_sides(initial_state)
+
+    def find_infeasibility(self, final_state: bytes) -> Optional[str]:
+        """
+        Find why the given final state cannot be reached from the initial state
+        :param final_state: Encoded final state
+        :return: Reason of the infeasibility where None means no invariant is broken
+        """
+        if len(final_state) != len(self.initial_state) or \
+                set(final_state) | {common.EMPTY_CELL_BLOCK} != set(self.initial_state) | {common.EMPTY_CELL_BLOCK}:
+            return "Final state does not have the same blocks as the initial state"
+        for block, footprint in self.footprints.items():
+            if self._find_footprint(final_state, block) != footprint:
+                return "Block {0} has a different shape in the final state".format(block)
+        for block in self.frozen_blocks:
+            if final_state.find(block) != self.initial_state.find(block):
+                return "Block {0} can never move from its initial position".format(block)
+        for block, reachable_anchors in self.reachable_anchors.items():
+            if final_state.find(block) not in reachable_anchors:
+                return "Block {0} cannot reach its final position".format(block)
+        if self.has_parity_invariant and self._find_parity(final_state) != self.initial_parity:
+            return "Final state has the other permutation parity"
+        for (separator_block, block), side in self._find_sides(final_state).items():
+            if side != self.initial_sides[separator_block, block]:
+                return "Block {0} cannot pass block {1} which separates the board".format(block, separator_block)
+        return None
+
+    def find_feasible_final_states(self, final_states: List[bytes]) -> List[bytes]:
+        """
+        Keep the given final states which do not break any invariant
+        """
+        return [final_state for final_state in final_states if self.find_infeasibility(final_state) is None]
+
+    def _find_footprint(self, state: bytes, block: int) -> frozenset:
+        """
+        Row and column offsets of the cells of the given block relative to its anchor
+        """
+        anchor_row, anchor_column = divmod(state.find(block), self.columns)
+        return frozenset((index // self.columns - anchor_row, index % self.columns - anchor_column)
+                         for index, cell_block in enumerate(state) if cell_block == block)
+
+    def _find_frozen_blocks(self) -> Set[int]:
+        """
+        Find the largest set of blocks which are blocked by the board edges and each other in every direction
+        """
+        frozen_blocks = set(self.footprints)
+        changed = True
+        while changed:
+            changed = False
+            for block in list(frozen_blocks):
+                anchor = self.initial_state.find(block)
+                for _, movable_anchors, entered_cells, _ in self.move_generator.block_slides[block]:
+                    if movable_anchors[anchor] and \
+                            all(self.initial_state[anchor + cell] not in frozen_blocks for cell in entered_cells):
+                        frozen_blocks.remove(block)
+                        changed = True
+                        break
+        return frozen_blocks
+
+    def _find_reachable_anchors(self, block: int, frozen_cells: Set[int]) -> Set[int]:
+        """
+        Find the anchors which the given block reaches through slides avoiding frozen cells on an otherwise empty board
+        """
+        start_anchor = self.initial_state.find(block)
+        reachable_anchors = {start_anchor}
+        anchor_queue = deque([start_anchor])
+        slides = [(movable_anchors, entered_cells,
+                   st.DIRECTION_STEPS[direction][0] * self.columns + st.DIRECTION_STEPS[direction][1])
+                  for direction, movable_anchors, entered_cells, _ in self.move_generator.block_slides[block]]
+        while anchor_queue:
+            anchor = anchor_queue.popleft()
+            for movable_anchors, entered_cells, anchor_step in slides:
+                next_anchor = anchor + anchor_step
+                if not movable_anchors[anchor] or next_anchor in reachable_anchors:
+                    continue
+                if any(anchor + cell in frozen_cells for cell in entered_cells):
+                    continue
+                reachable_anchors.add(next_anchor)
+                anchor_queue.append(next_anchor)
+        return reachable_anchors
+
+    def _find_full_line(self, state: bytes, block: int, is_row: bool) -> Optional[int]:
+        """
+        Index of the first row or column which the given block covers wholly where None means there is no such line
+        """
+        if is_row:
+            return next((row for row in range(self.rows)
+                         if all(state[row * self.columns + column] == block for column in range(self.columns))), None)
+        return next((column for column in range(self.columns)
+                     if all(state[row * self.columns + column] == block for row in range(self.rows))), None)
+
+    def _find_sides(self, state: bytes) -> Dict[Tuple[int, int], bool]:
+        """
+        Whether each block is above the full row or on the left of the full column of each separator block
+        """
+        sides = {}
+        for separator_block, is_row in self.separators:
+            line = self._find_full_line(state, separator_block, is_row)
+            for block in self.footprints:
+                if block != separator_block:
+                    row, column = divmod(state.find(block), self.columns)
+                    sides[separator_block, block] = (row if is_row else column) < line
+        return sides
+
+    def _find_parity(self, state: bytes) -> int:
+        """
+        Parity of the permutation which sorts the blocks of the given state plus the parity of its empty cell position
+        """
+        # Number of inversions among blocks in row major order, where the empty cell is left out
+        blocks = [block for block in state if block != common.EMPTY_CELL_BLOCK]
+        inversions = sum(1 for index, block in enumerate(blocks) for other_block in blocks[index + 1:]
+                         if block > other_block)
+        # Removing the empty cell from the order changes the permutation parity by its distance to the last cell
+        empty_cell = state.find(common.EMPTY_CELL_BLOCK)
+        empty_row, empty_column = divmod(empty_cell, self.columns)
+        return (inversions + len(state) - 1 - empty_cell + empty_row + empty_column) % 2
@@ -1,4 +1,30 @@
-from typing import List, TextIO
+import array
+import ast
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+import src.state_encoding as se
+import src.state_transitions as st
+
+# Binary puzzle archive layout, all integers are little endian
+# Header: magic, version, entry count and offset of the index
+ARCHIVE_MAGIC = b'SBPA'
+ARCHIVE_VERSION = 1
+ARCHIVE_HEADER = struct.Struct('<4sB3xQQ')
+# Index entry of each puzzle: offsets of the puzzle record and the solution record where zero means no solution
+ARCHIVE_INDEX_ENTRY = struct.Struct('<QQ')
+# Puzzle record: heuristic function, row, column, block and final state counts followed by boards of the initial and
+# final states where each cell is one byte
+ARCHIVE_PUZZLE_HEADER = struct.Struct('<BBBBH')
+# Largest heuristic function, row, column and block counts and final state count of a puzzle record
+ARCHIVE_PUZZLE_LIMITS = (0xFF, 0xFF, 0xFF, 0xFF, 0xFFFF)
+# Solution record: move count followed by two byte move codes, see state_transitions.encode_move
+ARCHIVE_SOLUTION_HEADER = struct.Struct('<I')
 
 
 class PuzzleInputParser(object):
@@ -6,6 +32,11 @@ class PuzzleInputParser(object):
     Parser for puzzle state where two input types exist
     1. Dictionary like formatted input
     2. Plain text input format
+
+    Files having many puzzles are streamed one puzzle at a time. Dictionary like formatted puzzles are then written as
+    JSON lines, i.e. one puzzle object per line, while plain formatted puzzles are simply concatenated. Files are read
+    in large chunks which are split into lines, and each state is validated as soon as it is read, so memory usage does
+    not depend on the number of puzzles.
     """
 
     HEURISTIC_LABEL = 'heuristic_function'
@@ -15,21 +46,54 @@ class PuzzleInputParser(object):
     INITIAL_STATE_LABEL = 'start_state'
     FINAL_STATES_LABEL = 'final_states'
 
+    # Number of characters read from a file at once while streaming
+    READ_CHUNK_SIZE = 1 << 20
+
     @staticmethod
     def _validate_inputs(row_count: int, column_count: int, initial_state: List[List[int]],
                          final_states: List[List[List[int]]]):
         all_states = [initial_state] + final_states
         for state in all_states:
-            if len(state) != row_count:
-                raise ValueError("Given state " + str(state) + " not match in row count.")
-            for row in state:
-                if len(row) != column_count:
-                    raise ValueError("Given state " + str(row) + " not match in column count.")
+            PuzzleInputParser._validate_state(row_count, column_count, state)
+
+    @staticmethod
+    def _validate_state(row_count: int, column_count: int, state: List[List[int]]):
+        if len(state) != row_count:
+            raise ValueError("Given state " + str(state) + " not match in row count.")
+        for row in state:
+            if len(row) != column_count:
+                raise ValueError("Given state " + str(row) + " not match in column count.")
 
     @staticmethod
-    def parse_dict_formatted_file(f: TextIO):
+    def parse_file(f: TextIO, **puzzle_options):
+        """
+        Parse the given file by detecting its format where dictionary like formatted inputs start with a curly brace
+        """
+        content = f.read()
+        parser = PuzzleInputParser.parse_dict_formatted_file if content.lstrip().startswith('{') \
+            else PuzzleInputParser.parse_plain_formatted_file
+        return parser(io.StringIO(content), **puzzle_options)
+
+    @staticmethod
+    def parse_dict_formatted_file(f: TextIO, **puzzle_options):
+        content = f.read()
+        try:
+            puzzle = json.loads(content)
+        except ValueError:
+            # Python literals such as single quoted labels are accepted without evaluating any code
+            puzzle = ast.literal_eval(content)
+        return PuzzleInputParser.parse_dict(puzzle, **puzzle_options)
+
+    @staticmethod
+    def parse_dict(puzzle: dict, **puzzle_options):
+        """
+        Create the puzzle of the given dictionary having the labels of the dictionary like input format where other
+        keys are ignored
+        :param puzzle: Dictionary like formatted puzzle which is already decoded, e.g. from JSON
+        :param puzzle_options: Keyword arguments passed to the puzzle
+        :return: Validated puzzle
+        """
         from src.sliding_block_puzzle import Puzzle
-        puzzle = eval(f.read())
 
         heuristic = puzzle[PuzzleInputParser.HEURISTIC_LABEL]
         row = puzzle[PuzzleInputParser.ROW_LABEL]
@@ -39,27 +103,263 @@ class PuzzleInputParser(object):
         final_states = puzzle[PuzzleInputParser.FINAL_STATES_LABEL]
 
         PuzzleInputParser._validate_inputs(row, column, initial_state, final_states)
-        return Puzzle(heuristic, row, column, blocks, initial_state, final_states)
+        return Puzzle(heuristic, row, column, blocks, initial_state, final_states, **puzzle_options)
+
+    @staticmethod
+    def parse_plain_formatted_file(f: TextIO, **puzzle_options):
+        puzzle = next(PuzzleInputParser.stream_plain_formatted_file(f, **puzzle_options), None)
+        if puzzle is None:
+            raise ValueError("Given file does not have any puzzle.")
+        return puzzle
 
     @staticmethod
-    def parse_plain_formatted_file(f: TextIO):
+    def stream_file(f: TextIO, **puzzle_options) -> Iterator:
+        """
+        Stream puzzles of the given file by detecting its format where JSON lines start with a curly brace, and a file
+        whose first line is not a whole JSON object is a single dictionary like formatted puzzle spanning many lines
+        """
+        first_chunk = f.read(PuzzleInputParser.READ_CHUNK_SIZE)
+        if not first_chunk.lstrip().startswith('{'):
+            return PuzzleInputParser.stream_plain_formatted_file(f, first_chunk=first_chunk, **puzzle_options)
+
+        # The first line may continue after the chunk
+        first_chunk += f.readline()
+        try:
+            is_json_lines = isinstance(json.loads(first_chunk.lstrip().split('\n', 1)[0]), dict)
+        except ValueError:
+            is_json_lines = False
+        if is_json_lines:
+            return PuzzleInputParser.stream_json_lines_file(f, first_chunk=first_chunk, **puzzle_options)
+        return iter([PuzzleInputParser.parse_dict_formatted_file(io.StringIO(first_chunk + f.read()),
+                                                                 **puzzle_options)])
+
+    @staticmethod
+    def stream_json_lines_file(f: TextIO, first_chunk: str = '', **puzzle_options) -> Iterator:
+        """
+        Stream puzzles of the given file whose each line is a dictionary like formatted puzzle in JSON
+        :param f: File to read
+        :param first_chunk: Content which is already read from the file
+        :param puzzle_options: Keyword arguments passed to each puzzle
+        :return: Iterator of puzzles
+        """
+        for line_number, line in PuzzleInputParser._read_lines(f, first_chunk):
+            try:
+                puzzle = json.loads(line)
+            except ValueError as e:
+                raise ValueError("Line {0} is not a valid JSON object: {1}".format(line_number, e))
+            yield PuzzleInputParser.parse_dict(puzzle, **puzzle_options)
+
+    @staticmethod
+    def stream_plain_formatted_file(f: TextIO, first_chunk: str = '', **puzzle_options) -> Iterator:
+        """
+        Stream puzzles of the given file where plain formatted puzzles follow each other and empty lines are skipped
+        :param f: File to read
+        :param first_chunk: Content which is already read from the file
+        :param puzzle_options: Keyword arguments passed to each puzzle
+        :return: Iterator of puzzles
+        """
         from src.sliding_block_puzzle import Puzzle
-        # First line must represent heuristic function id
-        heuristic = int(f.readline()[:-1])
-        # Second line represents row count, column count, block count and final state count respectively
-        row, column, blocks, final_state_count = map(lambda x: int(x), f.readline()[:-1].split())
+        lines = PuzzleInputParser._read_lines(f, first_chunk)
+        for _, heuristic_line in lines:
+            # First line must represent heuristic function id
+            heuristic = int(heuristic_line)
+            # Second line represents row count, column count, block count and final state count respectively
+            row, column, blocks, final_state_count = map(int, PuzzleInputParser._next_line(lines).split())
+
+            states = []
+            # There will be one start state but multiple final states
+            for state_index in range(0, 1 + final_state_count):
+                # No need the information of the state label line here
+                PuzzleInputParser._next_line(lines)
+                # Rows are tokenized one at a time with the builtin int instead of a single split of the whole state,
+                # since row boundaries are needed to reject rows of the wrong length instead of truncating them
+                state = [list(map(int, PuzzleInputParser._next_line(lines).split())) for _ in range(row)]
+                PuzzleInputParser._validate_state(row, column, state)
+                states.append(state)
 
-        states = []
-        # There will be one start state but multiple final states
-        for state_index in range(0, 1 + final_state_count):
-            # No need the information here
-            _ = f.readline()
+            yield Puzzle(heuristic, row, column, blocks, states[0], states[1:], **puzzle_options)
 
-            state = [list(map(lambda x: int(x), f.readline()[:-1].split()))[:column] for _ in range(row)]
-            states.append(state)
+    @staticmethod
+    def _read_lines(f: TextIO, first_chunk: str = '') -> Iterator[Tuple[int, str]]:
+        """
+        Read the given file in large chunks and split them into lines
+        :param f: File to read
+        :param first_chunk: Content which is already read from the file
+        :return: Iterator of line numbers and stripped lines where empty lines are skipped
+        """
+        line_number = 0
+        remainder = first_chunk
+        while True:
+            chunk = f.read(PuzzleInputParser.READ_CHUNK_SIZE)
+            # The last line of a chunk may continue in the next chunk
+            lines = (remainder + chunk).split('\n')
+            remainder = lines.pop() if chunk else ''
+            for line in lines:
+                line_number += 1
+                line = line.strip()
+                if line:
+                    yield line_number, line
+            if not chunk:
+                return
 
-        initial_state = states[0]
-        final_states = states[1:]
+    @staticmethod
+    def _next_line(lines: Iterator[Tuple[int, str]]) -> str:
+        line = next(lines, None)
+        if line is None:
+            raise ValueError("Given file ends in the middle of a puzzle.")
+        return line[1]
 
-        PuzzleInputParser._validate_inputs(row, column, initial_state, final_states)
-        return Puzzle(heuristic, row, column, blocks, initial_state, final_states)
+
+class PuzzleArchiveWriter(object):
+    """
+    Writer of binary puzzle archives which keep boards as packed bytes and solutions as move codes
+
+    Records are appended as puzzles are added, and the index of record offsets is written at the end when the writer
+    is closed, so an archive of any size is written at constant memory. The file is replaced atomically on close.
+    """
+
+    def __init__(self, path: str):
+        # Import here since parsing puzzles for a single solve does not need it
+        import tempfile
+
+        self.path = path
+        self.index = array.array('Q')
+        directory = os.path.dirname(os.path.abspath(path))
+        file_descriptor, self.temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        self.file = os.fdopen(file_descriptor, 'wb')
+        # Header is written again once the index offset is known
+        self.file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, 0, 0))
+
+    def add(self, puzzle, solution_moves: Optional[List[st.Move]] = None) -> int:
+        """
+        Append the given puzzle and its solution
+        :param puzzle: Puzzle to append
+        :param solution_moves: Single cell moves of the solution where None means it is not solved
+        :return: Index of the puzzle in the archive
+        """
+        puzzle_header = (puzzle.heuristic_function, puzzle.row_count, puzzle.column_count, puzzle.block_count,
+                         len(puzzle.encoded_final_states))
+        for label, value, limit in zip(['Heuristic function', 'Row count', 'Column count', 'Block count',
+                                        'Final state count'], puzzle_header, ARCHIVE_PUZZLE_LIMITS):
+            if not 0 <= value <= limit:
+                raise ValueError("{0} {1} does not fit into a puzzle archive whose limit is {2}.".format(label, value,
+                                                                                                           limit))
+        puzzle_offset = self.file.tell()
+        self.file.write(ARCHIVE_PUZZLE_HEADER.pack(*puzzle_header))
+        self.file.write(puzzle.encoded_initial_state)
+        for encoded_final_state in puzzle.encoded_final_states:
+            self.file.write(encoded_final_state)
+
+        solution_offset = 0
+        if solution_moves is not None:
+            solution_offset = self.file.tell()
+            move_codes = array.array('H', map(st.encode_move, solution_moves))
+            if sys.byteorder != 'little':
+                move_codes.byteswap()
+            self.file.write(ARCHIVE_SOLUTION_HEADER.pack(len(move_codes)))
+            self.file.write(move_codes.tobytes())
+
+        self.index.extend((puzzle_offset, solution_offset))
+        return len(self.index) // 2 - 1
+
+    def close(self):
+        index_offset = self.file.tell()
+        if sys.byteorder != 'little':
+            self.index.byteswap()
+        self.file.write(self.index.tobytes())
+        self.file.seek(0)
+        self.file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, len(self.index) // 2, index_offset))
+        self.file.close()
+        os.chmod(self.temporary_path, 0o644)
+        os.replace(self.temporary_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Partially written archives are discarded
+            self.file.close()
+            os.remove(self.temporary_path)
+
+
+class PuzzleArchiveReader(object):
+    """
+    Reader of binary puzzle archives through a read only memory map where only the requested records are decoded
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mapped_file) < ARCHIVE_HEADER.size:
+            raise ValueError("File " + path + " is not a puzzle archive.")
+        magic, version, self.entry_count, self.index_offset = ARCHIVE_HEADER.unpack_from(self.mapped_file)
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            raise ValueError("File " + path + " is not a puzzle archive.")
+        if self.index_offset + self.entry_count * ARCHIVE_INDEX_ENTRY.size > len(self.mapped_file):
+            raise ValueError("Puzzle archive " + path + " is truncated.")
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def _find_offsets(self, puzzle_index: int) -> Tuple[int, int]:
+        if not 0 <= puzzle_index < self.entry_count:
+            raise IndexError("Puzzle index {0} is out of the archive".format(puzzle_index))
+        return ARCHIVE_INDEX_ENTRY.unpack_from(self.mapped_file,
+                                               self.index_offset + puzzle_index * ARCHIVE_INDEX_ENTRY.size)
+
+    def read_encoded_puzzle(self, puzzle_index: int) -> Tuple[int, int, int, int, bytes, List[bytes]]:
+        """
+        Read the given puzzle where only its own boards are copied out of the mapped file
+        :param puzzle_index: Index of the puzzle in the archive
+        :return: Heuristic function, row, column and block counts, encoded initial state and encoded final states
+        """
+        puzzle_offset, _ = self._find_offsets(puzzle_index)
+        heuristic, row, column, blocks, final_state_count = ARCHIVE_PUZZLE_HEADER.unpack_from(self.mapped_file,
+                                                                                              puzzle_offset)
+        board_size = row * column
+        boards_offset = puzzle_offset + ARCHIVE_PUZZLE_HEADER.size
+        # States are sliced as bytes since views of the mapped file would keep it from being closed
+        states = [self.mapped_file[boards_offset + index * board_size:boards_offset + (index + 1) * board_size]
+                  for index in range(1 + final_state_count)]
+        return heuristic, row, column, blocks, states[0], states[1:]
+
+    def read_puzzle(self, puzzle_index: int, **puzzle_options):
+        """
+        Read the given puzzle
+        :param puzzle_index: Index of the puzzle in the archive
+        :param puzzle_options: Keyword arguments passed to the puzzle
+        :return: Puzzle of the archive
+        """
+        from src.sliding_block_puzzle import Puzzle
+        heuristic, row, column, blocks, initial_state, final_states = self.read_encoded_puzzle(puzzle_index)
+        return Puzzle(heuristic, row, column, blocks, se.decode_state(initial_state, row, column),
+                      [se.decode_state(final_state, row, column) for final_state in final_states],
+                      **puzzle_options)
+
+    def read_solution(self, puzzle_index: int) -> Optional[List[st.Move]]:
+        """
+        Read the solution of the given puzzle
+        :param puzzle_index: Index of the puzzle in the archive
+        :return: Single cell moves of the solution where None means the puzzle is not solved
+        """
+        _, solution_offset = self._find_offsets(puzzle_index)
+        if solution_offset == 0:
+            return None
+        move_count, = ARCHIVE_SOLUTION_HEADER.unpack_from(self.mapped_file, solution_offset)
+        moves_offset = solution_offset + ARCHIVE_SOLUTION_HEADER.size
+        move_codes = array.array('H', self.mapped_file[moves_offset:moves_offset + 2 * move_count])
+        if sys.byteorder != 'little':
+            move_codes.byteswap()
+        return list(map(st.decode_move, move_codes))
+
+    def close(self):
+        self.mapped_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,223 @@
+import array
+from typing import Dict, Iterator, List, Optional, Tuple
+import zlib
+
+import src as common
+import src.state_transitions as st
+
+"""
+Exact distances to a fixed set of final states which are shared by many puzzles of the same board
+
+Moves sliding a block by one cell can be reverted, so a breadth first search from all final states
+at once visits states in the order of their exact distances to the closest final state. The search
+stops once the state budget is spent, where every state closer than the layer being visited is
+already mapped, so that layer's depth is a lower bound of the distance of any unmapped state.
+Distances are kept in an open addressing hash table whose keys are stored back to back in a single
+byte array, which costs about twice the state size per entry instead of more than a hundred bytes
+of a dictionary entry with a bytes key.
+
+A* search of a puzzle having a goal context uses the exact distance of mapped states as their
+heuristic values and the lower bound for the others if it is larger than the heuristic value. Once a
+mapped state is selected for expansion its exact distance completes an optimal solution, so the rest
+of the path is followed down the table instead of being searched. Puzzles starting on a mapped state
+are solved by lookups only.
+"""
+
+# Maximum number of states mapped by a goal context
+DEFAULT_STATE_BUDGET = 100000
+# Distance of empty slots and the largest distance which can be kept in a slot
+EMPTY_DISTANCE = 0xFFFF
+MAXIMUM_DISTANCE = EMPTY_DISTANCE - 1
+# Initial slot count of a distance table which is doubled once half of its slots are filled
+MINIMUM_SLOT_COUNT = 1 << 10
+
+
+class DistanceTable(object):
+    """
+    Open addressing hash table with linear probing from encoded states of the same size to their distances
+    State Size = Number of cells of each state
+    Keys = States stored back to back where the state of a slot starts at slot times state size
+    Distances = Distance of each slot where empty slots have EMPTY_DISTANCE
+    """
+
+    def __init__(self, state_size: int, slot_count: int = MINIMUM_SLOT_COUNT):
+        if slot_count & (slot_count - 1):
+            raise ValueError("Slot count should be a power of two.")
+        self.state_size = state_size
+        self.slot_count = slot_count
+        self.keys = bytearray(slot_count * state_size)
+        self.distances = array.array('H', [EMPTY_DISTANCE]) * slot_count
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _find_slot(self, state: bytes) -> int:
+        """
+        Slot of the given state if it is in the table; otherwise, the empty slot where it would be added
+        """
+        mask = self.slot_count - 1
+        state_size = self.state_size
+        keys, distances = self.keys, self.distances
+        # Hash of bytes is randomized per process, while CRC-32 keeps the table valid when it is sent to another one
+        slot = zlib.crc32(state) & mask
+        while distances[slot] != EMPTY_DISTANCE:
+            offset = slot * state_size
+            if keys[offset:offset + state_size] == state:
+                return slot
+            slot = (slot + 1) & mask
+        return slot
+
+    def get(self, state: bytes) -> Optional[int]:
+        """
+        Distance of the given state where None means it is not in the table
+        """
+        distance = self.distances[self._find_slot(state)]
+        return None if distance == EMPTY_DISTANCE else distance
+
+    def add(self, state: bytes, distance: int):
+        """
+        Add the given state which is not in the table with the given distance
+        """
+        if (self.size + 1) * 2 > self.slot_count:
+            self._grow()
+        slot = self._find_slot(state)
+        self.keys[slot * self.state_size:(slot + 1) * self.state_size] = state
+        self.distances[slot] = distance
+        self.size += 1
+
+    def items(self) -> Iterator[Tuple[bytes, int]]:
+        """
+        Iterate over states and their distances in slot order
+        """
+        for slot, distance in enumerate(self.distances):
+            if distance != EMPTY_DISTANCE:
+                yield bytes(self.keys[slot * self.state_size:(slot + 1) * self.state_size]), distance
+
+    def _grow(self):
+        entries = list(self.items())
+        self.slot_count *= 2
+        self.keys = bytearray(self.slot_count * self.state_size)
+        self.distances = array.array('H', [EMPTY_DISTANCE]) * self.slot_count
+        for state, distance in entries:
+            slot = self._find_slot(state)
+            self.keys[slot * self.state_size:(slot + 1) * self.state_size] = state
+            self.distances[slot] = distance
+
+
+class GoalContext(object):
+    """
+    Exact distances of the states around the given final states which are found by a budgeted backward search
+    Final States = Encoded final states whose blocks have the same shapes
+    State Budget = Maximum number of mapped states
+    Radius = Lower bound of the distance of every unmapped state
+    Is Complete = Whether every state which can reach a final state is mapped
+    """
+
+    def __init__(self, rows: int, columns: int, block_count: int, final_states: List[bytes],
+                 state_budget: int = DEFAULT_STATE_BUDGET):
+        if not final_states:
+            raise ValueError("Goal context needs at least one final state.")
+        if state_budget <= 0:
+            raise ValueError("State budget of the goal context should be positive.")
+        footprints = _find_footprints(final_states[0], columns)
+        if any(_find_footprints(final_state, columns) != footprints for final_state in final_states[1:]):
+            raise ValueError("Blocks of the final states should have the same shapes.")
+        self.rows = rows
+        self.columns = columns
+        self.final_states = frozenset(final_states)
+        self.state_budget = state_budget
+        self.move_generator = st.MoveGenerator(final_states[0], rows, columns, block_count)
+        self.table = DistanceTable(rows * columns)
+        self.radius, self.is_complete = self._breadth_first_search()
+
+    @staticmethod
+    def for_puzzle(puzzle, state_budget: int = DEFAULT_STATE_BUDGET) -> 'GoalContext':
+        """
+        Build the goal context of the final states of the given puzzle which can be reached from its initial state
+        """
+        return GoalContext(puzzle.row_count, puzzle.column_count, puzzle.block_count,
+                           puzzle.reachable_final_states or puzzle.encoded_final_states, state_budget)
+
+    def __len__(self):
+        return len(self.table)
+
+    def _breadth_first_search(self) -> Tuple[float, bool]:
+        """
+        Map states layer by layer from the final states until the budget is spent or no state is left
+        :return: Lower bound of the distances of unmapped states and whether every reachable state is mapped
+        """
+        layer = list(self.final_states)
+        for final_state in layer:
+            self.table.add(final_state, 0)
+        depth = 0
+        while layer:
+            if depth == MAXIMUM_DISTANCE:
+                return depth, False
+            next_layer = []
+            for state in layer:
+                for child_state, _ in self.move_generator.successors(state):
+                    if self.table.get(child_state) is not None:
+                        continue
+                    if len(self.table) >= self.state_budget:
+                        return depth + 1, False
+                    self.table.add(child_state, depth + 1)
+                    next_layer.append(child_state)
+            layer = next_layer
+            depth += 1
+        return float('inf'), True
+
+    def distance(self, state: bytes) -> Optional[int]:
+        """
+        Exact distance of the given state to the closest final state where None means the state is not mapped
+        """
+        return self.table.get(state)
+
+    def estimate(self, state: bytes, heuristic_value: float) -> float:
+        """
+        Improve the given admissible heuristic value of the given state with the exact distance or the lower bound
+        """
+        distance = self.table.get(state)
+        if distance is not None:
+            return distance
+        return heuristic_value if heuristic_value > self.radius else self.radius
+
+    def find_path(self, state: bytes) -> List[Tuple[bytes, st.Move]]:
+        """
+        Follow the given mapped state down to a final state through states each of which is one move closer
+        :param state: Mapped encoded state
+        :return: States after each move of an optimal path together with the moves
+        """
+        distance = self.table.get(state)
+        if distance is None:
+            raise ValueError("State is not mapped by the goal context.")
+        path = []
+        while distance > 0:
+            # Layers before the one of a mapped state are complete, so a mapped successor one move closer exists
+            distance -= 1
+            state, move = next((child_state, move) for child_state, move in self.move_generator.successors(state)
+                               if self.table.get(child_state) == distance)
+            path.append((state, move))
+        return path
+
+    def matches(self, puzzle) -> bool:
+        """
+        Whether distances of the context are distances of the given puzzle, i.e. the board is the same, moves slide
+        blocks by single cells and the final states are the ones of the puzzle except unreachable ones
+        """
+        return (self.rows, self.columns) == (puzzle.row_count, puzzle.column_count) and \
+            isinstance(puzzle.move_generator, st.MoveGenerator) and \
+            self.final_states.issuperset(puzzle.reachable_final_states) and \
+            self.final_states.issubset(puzzle.encoded_final_states)
+
+
+def _find_footprints(state: bytes, columns: int) -> Dict[int, frozenset]:
+    """
+    Cell offsets of each block relative to its anchor
+    """
+    cells = {}
+    for cell, block in enumerate(state):
+        if block != common.EMPTY_CELL_BLOCK:
+            cells.setdefault(block, []).append(divmod(cell, columns))
+    return {block: frozenset((row - block_cells[0][0], column - block_cells[0][1]) for row, column in block_cells)
+            for block, block_cells in cells.items()}
@@ -1,6 +1,6 @@
+import array
 from enum import Enum
-from typing import Callable, Dict, List
-import unittest
+from typing import Callable, Dict, List, Tuple
 
 import src as common
 
@@ -8,6 +8,16 @@ import src as common
 class Heuristics(Enum):
     MANHATTAN_DISTANCE = 0
     EUCLIDEAN_DISTANCE = 1
+    PATTERN_DATABASE = 2
+    MISPLACED_BLOCKS = 3
+
+
+# Heuristics whose values are integers
+INTEGER_VALUED_HEURISTICS = frozenset([Heuristics.MANHATTAN_DISTANCE.value, Heuristics.MISPLACED_BLOCKS.value])
+
+
+# Final state count above which integer valued heuristic components are packed into a single integer
+PACKED_FINAL_STATE_THRESHOLD = 8
 
 
 def find_heuristic_function(heuristic_function: int) -> Callable:
@@ -20,10 +30,40 @@ def find_heuristic_function(heuristic_function: int) -> Callable:
         return find_manhattan_distance
     elif heuristic_function == Heuristics.EUCLIDEAN_DISTANCE.value:
         return find_euclidean_distance
+    elif heuristic_function == Heuristics.MISPLACED_BLOCKS.value:
+        return find_misplaced_blocks
+    elif heuristic_function == Heuristics.PATTERN_DATABASE.value:
+        raise ValueError("Pattern database heuristic is only available as an incremental heuristic")
     else:
         raise ValueError("Unknown heuristic function value {0}".format(heuristic_function))
 
 
+def find_incremental_heuristic(heuristic_function: int, rows: int, columns: int, final_states: List[bytes],
+                               block_count: int = None, pattern_database_directory: str = None):
+    """
+    Incremental heuristic match function
+    :param heuristic_function: Integer value of the heuristic function which can be reached from Heuristics enumeration
+    :param rows: Row count of the board
+    :param columns: Column count of the board
+    :param final_states: Encoded final states
+    :param block_count: Block count of the puzzle which is required by the pattern database heuristic
+    :param pattern_database_directory: Directory where pattern databases are saved and loaded, they are only kept in
+    memory if it is None
+    :return: Incremental heuristic evaluator of the given parameter where components of integer valued heuristics are
+    packed if there are many final states; otherwise, exception is raised
+    """
+    if heuristic_function == Heuristics.PATTERN_DATABASE.value:
+        # Pattern database module depends on this module, so it is imported here
+        from src.pattern_database import PatternDatabaseHeuristic
+        if block_count is None:
+            block_count = max(max(final_state) for final_state in final_states)
+        return PatternDatabaseHeuristic(rows, columns, block_count, final_states,
+                                        directory=pattern_database_directory)
+    if heuristic_function in INTEGER_VALUED_HEURISTICS and len(final_states) > PACKED_FINAL_STATE_THRESHOLD:
+        return PackedIncrementalHeuristic(heuristic_function, rows, columns, final_states)
+    return IncrementalHeuristic(heuristic_function, rows, columns, final_states)
+
+
 def find_manhattan_distance(first_state, second_state):
     """
     This heuristic function calculates manhattan distance for each unique block by checking the most UPPER-LEFT piece
@@ -35,12 +75,7 @@ def find_manhattan_distance(first_state, second_state):
     :return: Manhattan distance between states
     """
     first_state_piece_coordinate_dict, second_state_piece_coordinate_dict = _state_traverser(first_state, second_state)
-    distance = 0
-    for key in first_state_piece_coordinate_dict.keys() & second_state_piece_coordinate_dict.keys():
-        x1, y1 = first_state_piece_coordinate_dict[key]
-        x2, y2 = second_state_piece_coordinate_dict[key]
-        distance += abs(x1 - x2) + abs(y1 - y2)
-    return distance
+    return _sum_manhattan_distances(first_state_piece_coordinate_dict, second_state_piece_coordinate_dict)
 
 
 def find_euclidean_distance(first_state, second_state):
@@ -54,6 +89,87 @@ def find_euclidean_distance(first_state, second_state):
     :return: Euclidean distance between states
     """
     first_state_piece_coordinate_dict, second_state_piece_coordinate_dict = _state_traverser(first_state, second_state)
+    return _sum_euclidean_distances(first_state_piece_coordinate_dict, second_state_piece_coordinate_dict)
+
+
+def find_misplaced_blocks(first_state, second_state):
+    """
+    This heuristic function counts blocks whose most UPPER-LEFT pieces are at different coordinates. Since a move
+    changes the position of a single block, it never overestimates the number of moves even if a move slides a block
+    through many cells.
+    :param first_state: First state representing the board
+    :param second_state: Second state representing the board
+    :return: Number of misplaced blocks between states
+    """
+    first_state_piece_coordinate_dict, second_state_piece_coordinate_dict = _state_traverser(first_state, second_state)
+    return _sum_misplaced_blocks(first_state_piece_coordinate_dict, second_state_piece_coordinate_dict)
+
+
+def find_encoded_heuristic_function(heuristic_function: int) -> Callable:
+    """
+    Heuristic function match function for encoded states
+    :param heuristic_function: Integer value of the heuristic function which can be reached from Heuristics enumeration
+    :return: Corresponding heuristic function of the given parameter which accepts two encoded states and column count
+    if it is valid; otherwise, exception is raised
+    """
+    if heuristic_function == Heuristics.MANHATTAN_DISTANCE.value:
+        return find_encoded_manhattan_distance
+    elif heuristic_function == Heuristics.EUCLIDEAN_DISTANCE.value:
+        return find_encoded_euclidean_distance
+    elif heuristic_function == Heuristics.MISPLACED_BLOCKS.value:
+        return find_encoded_misplaced_blocks
+    elif heuristic_function == Heuristics.PATTERN_DATABASE.value:
+        raise ValueError("Pattern database heuristic is only available as an incremental heuristic")
+    else:
+        raise ValueError("Unknown heuristic function value {0}".format(heuristic_function))
+
+
+def find_encoded_manhattan_distance(first_state: bytes, second_state: bytes, columns: int):
+    """
+    Manhattan distance between two encoded states, see find_manhattan_distance
+    :param first_state: First encoded state representing the board
+    :param second_state: Second encoded state representing the board
+    :param columns: Column count of the board
+    :return: Manhattan distance between states
+    """
+    return _sum_manhattan_distances(_encoded_state_traverser(first_state, columns),
+                                    _encoded_state_traverser(second_state, columns))
+
+
+def find_encoded_euclidean_distance(first_state: bytes, second_state: bytes, columns: int):
+    """
+    Euclidean distance between two encoded states, see find_euclidean_distance
+    :param first_state: First encoded state representing the board
+    :param second_state: Second encoded state representing the board
+    :param columns: Column count of the board
+    :return: Euclidean distance between states
+    """
+    return _sum_euclidean_distances(_encoded_state_traverser(first_state, columns),
+                                    _encoded_state_traverser(second_state, columns))
+
+
+def find_encoded_misplaced_blocks(first_state: bytes, second_state: bytes, columns: int):
+    """
+    Number of misplaced blocks between two encoded states, see find_misplaced_blocks
+    :param first_state: First encoded state representing the board
+    :param second_state: Second encoded state representing the board
+    :param columns: Column count of the board
+    :return: Number of misplaced blocks between states
+    """
+    return _sum_misplaced_blocks(_encoded_state_traverser(first_state, columns),
+                                 _encoded_state_traverser(second_state, columns))
+
+
+def _sum_manhattan_distances(first_state_piece_coordinate_dict: Dict, second_state_piece_coordinate_dict: Dict):
+    distance = 0
+    for key in first_state_piece_coordinate_dict.keys() & second_state_piece_coordinate_dict.keys():
+        x1, y1 = first_state_piece_coordinate_dict[key]
+        x2, y2 = second_state_piece_coordinate_dict[key]
+        distance += abs(x1 - x2) + abs(y1 - y2)
+    return distance
+
+
+def _sum_euclidean_distances(first_state_piece_coordinate_dict: Dict, second_state_piece_coordinate_dict: Dict):
     distance = 0
     for key in first_state_piece_coordinate_dict.keys() & second_state_piece_coordinate_dict.keys():
         x1, y1 = first_state_piece_coordinate_dict[key]
@@ -62,6 +178,11 @@ def find_euclidean_distance(first_state, second_state):
     return distance
 
 
+def _sum_misplaced_blocks(first_state_piece_coordinate_dict: Dict, second_state_piece_coordinate_dict: Dict):
+    return sum(1 for key in first_state_piece_coordinate_dict.keys() & second_state_piece_coordinate_dict.keys()
+               if first_state_piece_coordinate_dict[key] != second_state_piece_coordinate_dict[key])
+
+
 def _state_traverser(first_state: List[List[int]], second_state: List[List[int]]) -> (Dict, Dict):
     """
     State parsing procedure which iterates over two states at the same time and returns two
@@ -93,41 +214,134 @@ def _state_traverser(first_state: List[List[int]], second_state: List[List[int]]
     return first_state_piece_coordinate_dict, second_state_piece_coordinate_dict
 
 
-class HeuristicFunctionUnittest(unittest.TestCase):
-    initial_state = [
-        [0, 0, 0],
-        [1, 2, 0],
-        [0, 3, 3],
-        [0, 3, 3]
-    ]
+def _encoded_state_traverser(state: bytes, columns: int) -> Dict[int, Tuple[int, int]]:
+    """
+    Encoded state parsing procedure which returns the most UPPER-LEFT piece coordinates for each block. Since cells
+    are stored row by row, the first occurrence of a block id is its most UPPER-LEFT piece.
+    :param state: Encoded state representing the board
+    :param columns: Column count of the board
+    :return: Dictionary of block coordinates
+    """
+    return {block: divmod(state.index(block), columns) for block in set(state) if block != common.EMPTY_CELL_BLOCK}
+
+
+class IncrementalHeuristic(object):
+    """
+    Heuristic evaluator which keeps the heuristic value of a state against each final state as separate components so
+    that the values of a child state are updated from its parent's components instead of traversing boards again.
+
+    All of these heuristics are sums over blocks of a distance between the most UPPER-LEFT pieces of the block in the state and
+    in the final state. A move only changes the position of one block, so the component of each final state changes by
+    the difference of that block's distances. Distances of each block from every cell to its position in each final
+    state are precomputed once, which makes an update a single lookup per final state.
+    """
+
+    def __init__(self, heuristic_function: int, rows: int, columns: int, final_states: List[bytes]):
+        if heuristic_function == Heuristics.MANHATTAN_DISTANCE.value:
+            block_distance = _manhattan_block_distance
+        elif heuristic_function == Heuristics.EUCLIDEAN_DISTANCE.value:
+            block_distance = _euclidean_block_distance
+        elif heuristic_function == Heuristics.MISPLACED_BLOCKS.value:
+            block_distance = _misplaced_block_distance
+        else:
+            raise ValueError("Unknown heuristic function value {0}".format(heuristic_function))
+
+        self.columns = columns
+        final_state_coordinate_dicts = [_encoded_state_traverser(final_state, columns) for final_state in final_states]
+        blocks = set().union(*final_state_coordinate_dicts)
+        # Block to the list of distance tuples mapping where the tuple of a cell keeps the distance of the block from
+        # that cell to its position in each final state, which is zero if the block does not exist in the final state
+        self.block_distances = {
+            block: [tuple(block_distance(divmod(cell, columns), coordinate_dict[block])
+                          if block in coordinate_dict else 0 for coordinate_dict in final_state_coordinate_dicts)
+                    for cell in range(rows * columns)]
+            for block in blocks
+        }
+        self.final_state_count = len(final_states)
+
+    def evaluate(self, state: bytes) -> Tuple[float, ...]:
+        """
+        Compute heuristic components of the given state from scratch
+        :param state: Encoded board state
+        :return: Heuristic value of the state against each final state
+        """
+        anchor_distances = [distances[anchor] for block, distances in self.block_distances.items()
+                            for anchor in [state.find(block)] if anchor >= 0]
+        if not anchor_distances:
+            return (0,) * self.final_state_count
+        return tuple(map(sum, zip(*anchor_distances)))
+
+    def update(self, components: Tuple[float, ...], block: int, previous_anchor: int, anchor: int) \
+            -> Tuple[float, ...]:
+        """
+        Compute heuristic components of a child state where only the given block is moved
+        :param components: Heuristic components of the parent state
+        :param block: Moved block
+        :param previous_anchor: Cell index of the most UPPER-LEFT piece of the block in the parent state
+        :param anchor: Cell index of the most UPPER-LEFT piece of the block in the child state
+        :return: Heuristic value of the child state against each final state
+        """
+        distances = self.block_distances.get(block)
+        if distances is None:
+            return components
+        return tuple(component - previous_distance + distance for component, previous_distance, distance
+                     in zip(components, distances[previous_anchor], distances[anchor]))
+
+    def value(self, components: Tuple[float, ...]) -> float:
+        """
+        Heuristic value of a state which is the minimum of its components among final states
+        :param components: Heuristic components of the state
+        :return: Heuristic value of the state
+        """
+        return min(components)
+
+
+class PackedIncrementalHeuristic(IncrementalHeuristic):
+    """
+    Incremental heuristic evaluator for integer valued heuristics with many final states where the components of all
+    final states are packed into fixed width lanes of a single integer. Distance tuples of each block and cell are
+    packed in the same way, so an update is one integer subtraction and one integer addition whatever the final state
+    count is, and a node keeps a compact integer instead of a tuple. Lanes never borrow from each other since a
+    component always includes the distance subtracted from it, and the lane width fits the largest possible sum.
+    """
+
+    def __init__(self, heuristic_function: int, rows: int, columns: int, final_states: List[bytes]):
+        if heuristic_function not in INTEGER_VALUED_HEURISTICS:
+            raise ValueError("Heuristic function value {0} is not integer valued".format(heuristic_function))
+        super(PackedIncrementalHeuristic, self).__init__(heuristic_function, rows, columns, final_states)
+
+        largest_component = sum(max(map(max, cell_distances)) for cell_distances in self.block_distances.values())
+        self.lane_type = next(lane_type for lane_type in 'BHIQ'
+                              if largest_component < 1 << (8 * array.array(lane_type).itemsize))
+        self.packed_size = array.array(self.lane_type).itemsize * self.final_state_count
+        self.block_distances = {block: [self._pack(distances) for distances in cell_distances]
+                                for block, cell_distances in self.block_distances.items()}
+
+    def _pack(self, components: Tuple[int, ...]) -> int:
+        return int.from_bytes(array.array(self.lane_type, components).tobytes(), 'little')
+
+    def evaluate(self, state: bytes) -> int:
+        return sum(distances[anchor] for block, distances in self.block_distances.items()
+                   for anchor in [state.find(block)] if anchor >= 0)
 
-    final_state = [
-        [3, 3, 0],
-        [3, 3, 0],
-        [2, 0, 0],
-        [1, 0, 0]
-    ]
+    def update(self, components: int, block: int, previous_anchor: int, anchor: int) -> int:
+        distances = self.block_distances.get(block)
+        if distances is None:
+            return components
+        return components - distances[previous_anchor] + distances[anchor]
 
-    def test_valid_heuristic_function(self):
-        self.assertEquals(find_manhattan_distance, find_heuristic_function(int(Heuristics.MANHATTAN_DISTANCE.value)))
-        self.assertEquals(find_euclidean_distance, find_heuristic_function(int(Heuristics.EUCLIDEAN_DISTANCE.value)))
+    def value(self, components: int) -> int:
+        return min(array.array(self.lane_type, components.to_bytes(self.packed_size, 'little')))
 
-    def test_invalid_heuristic_function(self):
-        with self.assertRaises(ValueError) as context:
-            find_heuristic_function(int(1e10))
 
-        self.assertEquals(ValueError, type(context.exception))
+def _manhattan_block_distance(first_coordinate: Tuple[int, int], second_coordinate: Tuple[int, int]):
+    return abs(first_coordinate[0] - second_coordinate[0]) + abs(first_coordinate[1] - second_coordinate[1])
 
-    def test_manhattan_heuristic(self):
-        expected_distance = 7
-        output_distance = find_manhattan_distance(self.initial_state, self.final_state)
-        self.assertEquals(expected_distance, output_distance)
 
-    def test_euclidean_heuristic(self):
-        expected_distance = 5.650281539872885
-        output_distance = find_euclidean_distance(self.initial_state, self.final_state)
-        self.assertAlmostEqual(expected_distance, output_distance, delta=1e-4)
+def _euclidean_block_distance(first_coordinate: Tuple[int, int], second_coordinate: Tuple[int, int]):
+    return ((first_coordinate[0] - second_coordinate[0]) ** 2 +
+            (first_coordinate[1] - second_coordinate[1]) ** 2) ** 0.5
 
 
-if __name__ == '__main__':
-    unittest.main()
+def _misplaced_block_distance(first_coordinate: Tuple[int, int], second_coordinate: Tuple[int, int]):
+    return 0 if first_coordinate == second_coordinate else 1
@@ -0,0 +1,310 @@
+import heapq
+import itertools
+import multiprocessing
+import queue
+import time
+import zlib
+from typing import List
+
+"""
+Hash distributed A* Search (HDA*) of a single puzzle across worker processes
+
+Each state is owned by exactly one worker which is chosen by a hash of the encoded state.
+A worker keeps OPEN and CLOSED information of its own states only. Children generated by
+a worker are sent to their owners in batches through queues, and the owner does duplicate
+detection and reopening. The cost of the best solution found so far, i.e. incumbent, is
+shared by all workers, and nodes whose f values are not lower than the incumbent are not
+expanded. Workers compare against local copies of the incumbent and of the total expansion
+count, which are refreshed when messages arrive or after a batch of expansions, so a stale
+copy may only cause a few needless expansions or a slightly exceeded node budget.
+
+The search terminates when every worker is idle, i.e. it has no node with f value lower
+than the incumbent, and no message is in flight. The coordinator checks this by reading
+sent and received message counters before and after reading idle flags of workers, and it
+terminates only if both readings are equal and all workers are idle. Since the heuristic is
+admissible, every node which could lead to a cheaper solution would still be waiting in
+some worker, so the incumbent is optimal at that point. Finally, the solution path is traced
+back by asking the owner of each state for its parent.
+"""
+
+# Number of children buffered for a worker before they are sent
+MESSAGE_BATCH_SIZE = 64
+# Number of expansions after which all buffered children are sent
+FLUSH_INTERVAL = 256
+# Waiting duration of idle workers and the coordinator in seconds
+POLL_INTERVAL = 0.005
+# Waiting duration of the coordinator for a result after which it checks whether workers are alive in seconds
+RESULT_TIMEOUT = 0.5
+
+# Message tags
+CHILDREN_MESSAGE = 'children'
+STOP_MESSAGE = 'stop'
+STOPPED_MESSAGE = 'stopped'
+PARENT_MESSAGE = 'parent'
+EXIT_MESSAGE = 'exit'
+
+
+def find_owner(state: bytes, workers: int) -> int:
+    """
+    Worker owning the given state where a deterministic hash is used since string hashes are randomized per process
+    """
+    return zlib.crc32(state) % workers
+
+
+def solve_parallel(puzzle, workers: int, node_budget: int = None, time_limit: float = None):
+    """
+    Solve the given puzzle with Hash Distributed A* Search
+    :param puzzle: Puzzle to solve
+    :param workers: Number of worker processes
+    :param node_budget: Maximum number of node expansions of all workers where None means no limit
+    :param time_limit: Maximum duration of the search in seconds where None means no limit
+    :return: Whether a solution exists and the solution states starting from the initial state
+    """
+    # Import here since the puzzle module imports this module lazily
+    from src.sliding_block_puzzle import SearchLimitExceeded
+
+    if workers <= 0:
+        raise ValueError("Worker count should be positive.")
+    start_state = puzzle.encoded_initial_state
+    if start_state in puzzle.encoded_final_state_set:
+        return True, [start_state]
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    incumbent = context.Value('d', float('inf'))
+    idle_flags = context.Array('b', workers, lock=False)
+    sent_counts = context.Array('q', workers, lock=False)
+    received_counts = context.Array('q', workers, lock=False)
+    expansion_counts = context.Array('q', workers, lock=False)
+    budget_exceeded = context.Value('b', 0, lock=False)
+
+    processes = [context.Process(target=_run_worker,
+                                 args=(worker_index, workers, puzzle, inboxes, results, incumbent, idle_flags,
+                                       sent_counts, received_counts, expansion_counts, node_budget, budget_exceeded),
+                                 daemon=True)
+                 for worker_index in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        # Seed the owner of the initial state, the coordinator counts it as sent by the first worker
+        start_components = puzzle.heuristic.evaluate(start_state)
+        sent_counts[0] += 1
+        inboxes[find_owner(start_state, workers)].put((CHILDREN_MESSAGE, [(start_state, 0, start_components, None)]))
+
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        limit_message = None
+        while True:
+            _check_workers(processes)
+            if deadline is not None and time.monotonic() > deadline:
+                limit_message = "Time limit is exceeded after {0} expansions".format(sum(expansion_counts))
+                break
+            if budget_exceeded.value:
+                limit_message = "Node budget of {0} expansions is exceeded".format(node_budget)
+                break
+            if _is_terminated(idle_flags, sent_counts, received_counts):
+                # Workers stop expanding once the budget is exceeded, so they may look terminated
+                if budget_exceeded.value:
+                    limit_message = "Node budget of {0} expansions is exceeded".format(node_budget)
+                break
+            time.sleep(POLL_INTERVAL)
+
+        # Stop all workers and collect the best final state found by each of them
+        for inbox in inboxes:
+            inbox.put((STOP_MESSAGE,))
+        best_final_state, best_g_value = None, float('inf')
+        for _ in range(workers):
+            _, final_state, g_value = _get_result(results, processes)
+            if final_state is not None and g_value < best_g_value:
+                best_final_state, best_g_value = final_state, g_value
+
+        if limit_message is not None:
+            raise SearchLimitExceeded(limit_message)
+        if best_final_state is None:
+            return False, None
+
+        # Trace parents back from the final state through their owners
+        solution_states = [best_final_state]
+        while True:
+            inboxes[find_owner(solution_states[-1], workers)].put((PARENT_MESSAGE, solution_states[-1]))
+            _, parent_state = _get_result(results, processes)
+            if parent_state is None:
+                break
+            solution_states.append(parent_state)
+        solution_states.reverse()
+        return True, solution_states
+    finally:
+        for inbox in inboxes:
+            inbox.put((EXIT_MESSAGE,))
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+
+def _check_workers(processes: List):
+    """
+    Raise RuntimeError if any worker has exited since workers only exit after the search is over
+    """
+    for worker_index, process in enumerate(processes):
+        if process.exitcode is not None:
+            raise RuntimeError("Worker {0} exited unexpectedly with code {1}".format(worker_index, process.exitcode))
+
+
+def _get_result(results, processes: List) -> tuple:
+    """
+    Wait for the next result message of workers while checking that they are still alive
+    """
+    while True:
+        try:
+            return results.get(timeout=RESULT_TIMEOUT)
+        except queue.Empty:
+            _check_workers(processes)
+
+
+def _is_terminated(idle_flags, sent_counts, received_counts) -> bool:
+    """
+    Termination check where message counters are read before and after idle flags, so a message sent or received
+    while flags are read changes the counters
+    """
+    sent_count, received_count = sum(sent_counts), sum(received_counts)
+    if sent_count != received_count or not all(idle_flags):
+        return False
+    return sent_count == sum(sent_counts) and received_count == sum(received_counts)
+
+
+def _run_worker(worker_index: int, workers: int, puzzle, inboxes: List, results, incumbent, idle_flags, sent_counts,
+                received_counts, expansion_counts, node_budget, budget_exceeded):
+    """
+    Worker loop which expands the owned states and serves parent requests after it is stopped
+    """
+    heuristic = puzzle.heuristic
+    move_generator = puzzle.move_generator
+    final_state_set = puzzle.encoded_final_state_set
+    inbox = inboxes[worker_index]
+
+    # Best g value and parent of each owned state
+    records = {}
+    # Open states as (f value, insertion order, g value, state, heuristic components)
+    open_heap = []
+    insertion_order = itertools.count()
+    # Children buffered for each worker
+    outgoing_children = [[] for _ in range(workers)]
+    best_final_state, best_g_value = None, float('inf')
+    stopped = False
+    # Local copies of the incumbent and the expansion count of all workers, which are refreshed from the shared
+    # memory every flush interval or when messages arrive, so the hot loop neither locks nor sums the shared array
+    shared_incumbent = incumbent.get_obj()
+    incumbent_value, expansion_total = float('inf'), 0
+
+    def refresh_shared_values():
+        nonlocal incumbent_value, expansion_total
+        incumbent_value = shared_incumbent.value
+        expansion_total = sum(expansion_counts)
+
+    def receive_children(children: list):
+        for state, g_value, components, parent_state in children:
+            record = records.get(state)
+            if record is not None and record[0] <= g_value:
+                continue
+            records[state] = (g_value, parent_state)
+            heapq.heappush(open_heap, (g_value + heuristic.value(components), next(insertion_order), g_value, state,
+                                       components))
+
+    def send_children(owner: int):
+        sent_counts[worker_index] += 1
+        inboxes[owner].put((CHILDREN_MESSAGE, outgoing_children[owner]))
+        outgoing_children[owner] = []
+
+    def flush_children():
+        for owner in range(workers):
+            if outgoing_children[owner]:
+                send_children(owner)
+
+    def handle_message(message: tuple) -> bool:
+        nonlocal stopped
+        if message[0] == CHILDREN_MESSAGE:
+            # Received messages are counted after the worker is marked as busy
+            idle_flags[worker_index] = 0
+            received_counts[worker_index] += 1
+            if not stopped:
+                receive_children(message[1])
+        elif message[0] == STOP_MESSAGE:
+            stopped = True
+            results.put((STOPPED_MESSAGE, best_final_state, best_g_value))
+        elif message[0] == PARENT_MESSAGE:
+            results.put((PARENT_MESSAGE, records[message[1]][1]))
+        elif message[0] == EXIT_MESSAGE:
+            return False
+        return True
+
+    expansions_since_flush = 0
+    while True:
+        # Drain all available messages
+        message_count = 0
+        try:
+            while True:
+                if not handle_message(inbox.get_nowait()):
+                    return
+                message_count += 1
+        except queue.Empty:
+            pass
+        if message_count:
+            refresh_shared_values()
+
+        # Skip outdated entries and entries which cannot improve the incumbent
+        while open_heap and (records[open_heap[0][3]][0] != open_heap[0][2] or
+                             open_heap[0][0] >= incumbent_value):
+            heapq.heappop(open_heap)
+
+        if stopped or not open_heap:
+            flush_children()
+            idle_flags[worker_index] = 1
+            try:
+                message = inbox.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if not handle_message(message):
+                return
+            continue
+
+        # Expansions of other workers since the last refresh are missed, so the budget may be exceeded slightly
+        if node_budget is not None and expansion_total >= node_budget:
+            budget_exceeded.value = 1
+            stopped = True
+            continue
+
+        f_value, _, g_value, state, components = heapq.heappop(open_heap)
+        expansion_counts[worker_index] += 1
+        expansion_total += 1
+        if state in final_state_set:
+            # Only the compare and set of the shared incumbent needs the lock
+            with incumbent.get_lock():
+                if g_value < shared_incumbent.value:
+                    shared_incumbent.value = g_value
+                incumbent_value = shared_incumbent.value
+            if g_value < best_g_value:
+                best_final_state, best_g_value = state, g_value
+            continue
+
+        child_g_value = g_value + 1
+        for child_state, move in move_generator.successors(state):
+            child_components = heuristic.update(components, move.block, state.find(move.block),
+                                                child_state.find(move.block))
+            # Children which cannot improve the incumbent are not sent
+            if child_g_value + heuristic.value(child_components) >= incumbent_value:
+                continue
+            owner = find_owner(child_state, workers)
+            if owner == worker_index:
+                receive_children([(child_state, child_g_value, child_components, state)])
+            else:
+                outgoing_children[owner].append((child_state, child_g_value, child_components, state))
+                if len(outgoing_children[owner]) >= MESSAGE_BATCH_SIZE:
+                    send_children(owner)
+
+        expansions_since_flush += 1
+        if expansions_since_flush >= FLUSH_INTERVAL:
+            flush_children()
+            refresh_shared_values()
+            expansions_since_flush = 0
@@ -0,0 +1,242 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from collections import deque
+from typing import List, Optional
+
+import src as common
+import src.heuristic_functions as hf
+import src.state_transitions as st
+
+"""
+Pattern database heuristic on a subset of blocks
+
+Blocks out of the pattern are removed from the board, which can only make the puzzle
+easier, and a retrograde breadth first search from the final states computes the exact
+distance of every placement of the pattern blocks in this abstract puzzle. These distances
+are admissible for the original puzzle since each solution of it is also a solution of the
+abstract puzzle. A placement is indexed with the anchors of the pattern blocks, i.e. their
+most UPPER-LEFT cells, and its distance is kept in a single byte. Tables are saved to disk
+with a fingerprint of the board, the pattern and the abstract final states in their names
+and they are loaded through mmap, so repeated solves of the same board family do not build
+them again and worker processes share the same pages.
+"""
+
+# Distance of placements which cannot reach any final state
+UNREACHED_DISTANCE = 255
+# Maximum entry count of a table which limits the number of pattern blocks
+MAXIMUM_TABLE_SIZE = 1 << 20
+# Maximum number of pattern blocks
+MAXIMUM_PATTERN_SIZE = 6
+
+FILE_EXTENSION = '.pdb'
+FILE_MAGIC = b'SBPD'
+# Magic, version, rows, columns, pattern size and fingerprint of the table
+FILE_HEADER = struct.Struct('<4sBHHB20s')
+FILE_VERSION = 1
+
+
+class PatternDatabase(object):
+    """
+    Distance table of the placements of pattern blocks
+    """
+
+    def __init__(self, rows: int, columns: int, pattern_blocks: List[int], fingerprint: bytes, table,
+                 path: Optional[str] = None):
+        self.rows = rows
+        self.columns = columns
+        self.pattern_blocks = pattern_blocks
+        self.fingerprint = fingerprint
+        self.table = table
+        self.path = path
+        # Index weight of each pattern block where the index of a placement is the weighted sum of anchors
+        cell_count = rows * columns
+        self.block_weights = {block: cell_count ** position for position, block in enumerate(pattern_blocks)}
+        # Projection which removes the blocks out of the pattern
+        self.projection = bytes(block if block in self.block_weights else common.EMPTY_CELL_BLOCK
+                                for block in range(256))
+
+    def __getstate__(self):
+        # File backed tables are mapped again by the receiving process instead of being copied
+        state = dict(self.__dict__)
+        state['table'] = None if self.path is not None else bytes(self.table)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.path is not None:
+            self.table = PatternDatabase.load(self.path).table
+
+    def index(self, state: bytes) -> int:
+        """
+        Table index of the placement of pattern blocks in the given state
+        :param state: Encoded board state
+        :return: Index of the placement
+        """
+        return sum(state.find(block) * weight for block, weight in self.block_weights.items())
+
+    def distance(self, index: int) -> float:
+        """
+        Distance of the placement with the given index to the closest final state
+        :param index: Index of the placement
+        :return: Distance which is infinite if no final state can be reached
+        """
+        distance = self.table[index]
+        return float('inf') if distance == UNREACHED_DISTANCE else distance
+
+    @staticmethod
+    def build(rows: int, columns: int, block_count: int, final_states: List[bytes],
+              pattern_blocks: Optional[List[int]] = None, directory: Optional[str] = None) -> 'PatternDatabase':
+        """
+        Build the pattern database of the given final states or load it if it is already saved in the directory
+        :param rows: Row count of the board
+        :param columns: Column count of the board
+        :param block_count: Block count of the puzzle
+        :param final_states: Encoded final states
+        :param pattern_blocks: Blocks of the pattern where the largest blocks are selected if it is not given
+        :param directory: Directory where tables are saved and loaded, tables are only kept in memory if it is None
+        :return: Pattern database
+        """
+        if pattern_blocks is None:
+            pattern_blocks = PatternDatabase._select_pattern_blocks(rows * columns, block_count, final_states)
+        for block in pattern_blocks:
+            if any(final_state.find(block) < 0 for final_state in final_states):
+                raise ValueError("Pattern block " + str(block) + " does not exist in all final states.")
+        if (rows * columns) ** len(pattern_blocks) > MAXIMUM_TABLE_SIZE:
+            raise ValueError("Pattern " + str(pattern_blocks) + " is too large for the board.")
+
+        pattern_database = PatternDatabase(rows, columns, list(pattern_blocks), b'', None)
+        abstract_final_states = sorted({final_state.translate(pattern_database.projection)
+                                        for final_state in final_states})
+        pattern_database.fingerprint = PatternDatabase._compute_fingerprint(rows, columns, pattern_blocks,
+                                                                            abstract_final_states)
+
+        path = None
+        if directory is not None:
+            path = os.path.join(directory, pattern_database.fingerprint.hex() + FILE_EXTENSION)
+            if os.path.exists(path):
+                return PatternDatabase.load(path)
+
+        pattern_database.table = PatternDatabase._retrograde_breadth_first_search(
+            pattern_database, block_count, abstract_final_states)
+        if path is not None:
+            pattern_database.save(path)
+            return PatternDatabase.load(path)
+        return pattern_database
+
+    @staticmethod
+    def _select_pattern_blocks(cell_count: int, block_count: int, final_states: List[bytes]) -> List[int]:
+        """
+        Select the largest blocks which exist in all final states as long as the table fits into its maximum size
+        """
+        reference_state = final_states[0]
+        candidate_blocks = [block for block in range(1, block_count + 1)
+                            if all(final_state.find(block) >= 0 for final_state in final_states)]
+        candidate_blocks.sort(key=lambda block: (-reference_state.count(block), block))
+
+        pattern_size = 0
+        while pattern_size < min(len(candidate_blocks), MAXIMUM_PATTERN_SIZE) and \
+                cell_count ** (pattern_size + 1) <= MAXIMUM_TABLE_SIZE:
+            pattern_size += 1
+        return sorted(candidate_blocks[:pattern_size])
+
+    @staticmethod
+    def _compute_fingerprint(rows: int, columns: int, pattern_blocks: List[int],
+                             abstract_final_states: List[bytes]) -> bytes:
+        digest = hashlib.sha1(struct.pack('<HH', rows, columns) + bytes(pattern_blocks))
+        for abstract_final_state in abstract_final_states:
+            digest.update(abstract_final_state)
+        return digest.digest()
+
+    @staticmethod
+    def _retrograde_breadth_first_search(pattern_database: 'PatternDatabase', block_count: int,
+                                         abstract_final_states: List[bytes]) -> bytearray:
+        """
+        Breadth first search from all abstract final states where moves are reversible, so the same transitions are
+        used to step backward
+        """
+        move_generator = st.MoveGenerator(abstract_final_states[0], pattern_database.rows, pattern_database.columns,
+                                          block_count)
+        table = bytearray([UNREACHED_DISTANCE]) * ((pattern_database.rows * pattern_database.columns) **
+                                                   len(pattern_database.pattern_blocks))
+        queue = deque()
+        for abstract_final_state in abstract_final_states:
+            table[pattern_database.index(abstract_final_state)] = 0
+            queue.append(abstract_final_state)
+
+        while queue:
+            abstract_state = queue.popleft()
+            # Distances which do not fit into a byte are capped which keeps them admissible
+            child_distance = min(table[pattern_database.index(abstract_state)] + 1, UNREACHED_DISTANCE - 1)
+            for abstract_child_state, _ in move_generator.successors(abstract_state):
+                child_index = pattern_database.index(abstract_child_state)
+                if table[child_index] == UNREACHED_DISTANCE:
+                    table[child_index] = child_distance
+                    queue.append(abstract_child_state)
+        return table
+
+    def save(self, path: str):
+        """
+        Save the table into the given path where the file is replaced atomically
+        :param path: File path of the table
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=FILE_EXTENSION)
+        with os.fdopen(file_descriptor, 'wb') as f:
+            f.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, self.rows, self.columns, len(self.pattern_blocks),
+                                     self.fingerprint))
+            f.write(bytes(self.pattern_blocks))
+            f.write(self.table)
+        # Tables are shared by other processes which only read them
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def load(path: str) -> 'PatternDatabase':
+        """
+        Load the table from the given path through a read only memory map
+        :param path: File path of the table
+        :return: Pattern database whose table is backed by the file
+        """
+        with open(path, 'rb') as f:
+            mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, columns, pattern_size, fingerprint = FILE_HEADER.unpack_from(mapped_file)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError("File " + path + " is not a pattern database.")
+        pattern_blocks = list(mapped_file[FILE_HEADER.size:FILE_HEADER.size + pattern_size])
+        table = memoryview(mapped_file)[FILE_HEADER.size + pattern_size:]
+        if len(table) != (rows * columns) ** pattern_size:
+            raise ValueError("Pattern database " + path + " is truncated.")
+        return PatternDatabase(rows, columns, pattern_blocks, fingerprint, table, path)
+
+
+class PatternDatabaseHeuristic(object):
+    """
+    Incremental heuristic evaluator which takes the maximum of the pattern database distance and Manhattan distance,
+    where both of them are admissible. Components of a state are the components of Manhattan distance together with
+    the table index of the state, and the index is updated by the weighted displacement of a moved pattern block.
+    """
+
+    def __init__(self, rows: int, columns: int, block_count: int, final_states: List[bytes],
+                 pattern_blocks: Optional[List[int]] = None, directory: Optional[str] = None):
+        self.pattern_database = PatternDatabase.build(rows, columns, block_count, final_states, pattern_blocks,
+                                                      directory)
+        self.base_heuristic = hf.find_incremental_heuristic(hf.Heuristics.MANHATTAN_DISTANCE.value, rows, columns,
+                                                            final_states)
+
+    def evaluate(self, state: bytes) -> tuple:
+        return self.base_heuristic.evaluate(state), self.pattern_database.index(state)
+
+    def update(self, components: tuple, block: int, previous_anchor: int, anchor: int) -> tuple:
+        base_components, index = components
+        weight = self.pattern_database.block_weights.get(block)
+        if weight is not None:
+            index += (anchor - previous_anchor) * weight
+        return self.base_heuristic.update(base_components, block, previous_anchor, anchor), index
+
+    def value(self, components: tuple) -> float:
+        base_components, index = components
+        return max(self.base_heuristic.value(base_components), self.pattern_database.distance(index))
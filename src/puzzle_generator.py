@@ -0,0 +1,140 @@
+import argparse
+import json
+import random
+import sys
+from typing import Iterator, List
+
+import src as common
+from src.file_parser import PuzzleInputParser
+import src.state_encoding as se
+import src.state_transitions as st
+
+"""
+Seeded generation of solvable puzzles by random walks from final states
+
+Blocks of random rectangular shapes are placed onto an empty board to form the first final state,
+and other final states are random walks from it, so all final states have the same blocks. The
+initial state is a random walk from one of the final states. Every move can be reverted, so the
+walk backwards is a solution and each generated puzzle is solvable. The same seed always gives
+the same puzzles.
+"""
+
+# Heights and widths of block shapes where unit blocks are the most common ones
+BLOCK_SHAPES = [(1, 1), (1, 1), (1, 1), (1, 2), (2, 1), (2, 2)]
+# Number of random placements tried for a block before a unit block is placed instead
+PLACEMENT_TRIES = 20
+# Number of walks in a row which may end on known final states before the final state count is given up
+FINAL_STATE_TRIES = 100
+
+
+def generate_puzzle(rows: int, columns: int, block_count: int, final_state_count: int = 1, walk_length: int = 50,
+                    heuristic: int = 0, rng: random.Random = None) -> dict:
+    """
+    Generate a solvable puzzle in the dictionary like input format
+    :param rows: Row count of the board
+    :param columns: Column count of the board
+    :param block_count: Number of blocks on the board
+    :param final_state_count: Number of final states
+    :param walk_length: Number of random moves from a final state to the initial state
+    :param heuristic: Heuristic function of the puzzle
+    :param rng: Random number generator where None means an unseeded one
+    :return: Puzzle dictionary which can be parsed by PuzzleInputParser
+    """
+    if not 0 < block_count < rows * columns:
+        raise ValueError("Block count should be positive and leave at least one empty cell.")
+    if final_state_count <= 0:
+        raise ValueError("Final state count should be positive.")
+    rng = rng or random.Random()
+
+    first_final_state = _place_blocks(rows, columns, block_count, rng)
+    move_generator = st.MoveGenerator(first_final_state, rows, columns, block_count)
+    final_states = [first_final_state]
+    failed_walk_count = 0
+    while len(final_states) < final_state_count:
+        final_state = _random_walk(move_generator, first_final_state, walk_length, rng)
+        # Final states are distinct, but a walk may return to the same state on crowded boards, and a board may not
+        # have as many states as requested at all
+        if final_state not in final_states:
+            final_states.append(final_state)
+            failed_walk_count = 0
+        else:
+            failed_walk_count += 1
+            if walk_length == 0 or failed_walk_count >= FINAL_STATE_TRIES:
+                raise ValueError("{0} distinct final states cannot be generated, only {1} are found.".format(
+                    final_state_count, len(final_states)))
+    initial_state = _random_walk(move_generator, rng.choice(final_states), walk_length, rng)
+
+    return {
+        PuzzleInputParser.HEURISTIC_LABEL: heuristic,
+        PuzzleInputParser.ROW_LABEL: rows,
+        PuzzleInputParser.COLUMN_LABEL: columns,
+        PuzzleInputParser.BLOCKS_LABEL: block_count,
+        PuzzleInputParser.INITIAL_STATE_LABEL: se.decode_state(initial_state, rows, columns),
+        PuzzleInputParser.FINAL_STATES_LABEL: [se.decode_state(final_state, rows, columns)
+                                               for final_state in final_states]
+    }
+
+
+def generate_puzzles(count: int, seed: int, **generation_options) -> Iterator[dict]:
+    """
+    Generate the given number of puzzles with a generator seeded by the given seed, see generate_puzzle
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield generate_puzzle(rng=rng, **generation_options)
+
+
+def _place_blocks(rows: int, columns: int, block_count: int, rng: random.Random) -> bytes:
+    """
+    Place blocks of random shapes onto random empty positions of the board
+    """
+    state = bytearray(rows * columns)
+    for block in range(1, block_count + 1):
+        # Keep enough empty cells for the remaining unit blocks and one empty cell
+        free_cell_count = state.count(common.EMPTY_CELL_BLOCK) - (block_count - block) - 1
+        for _ in range(PLACEMENT_TRIES):
+            height, width = rng.choice(BLOCK_SHAPES)
+            if height * width > free_cell_count or height > rows or width > columns:
+                continue
+            top, left = rng.randrange(rows - height + 1), rng.randrange(columns - width + 1)
+            cells = [(top + row) * columns + left + column for row in range(height) for column in range(width)]
+            if all(state[cell] == common.EMPTY_CELL_BLOCK for cell in cells):
+                break
+        else:
+            cells = [rng.choice([cell for cell, cell_block in enumerate(state) if cell_block == common.EMPTY_CELL_BLOCK])]
+        for cell in cells:
+            state[cell] = block
+    return bytes(state)
+
+
+def _random_walk(move_generator: st.MoveGenerator, state: bytes, walk_length: int, rng: random.Random) -> bytes:
+    """
+    Apply the given number of random moves where the previous state is not visited again unless it is the only option
+    """
+    previous_state = None
+    for _ in range(walk_length):
+        child_states = [child_state for child_state, _ in move_generator.successors(state)]
+        if not child_states:
+            break
+        forward_states = [child_state for child_state in child_states if child_state != previous_state]
+        previous_state, state = state, rng.choice(forward_states or child_states)
+    return state
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate solvable puzzles as JSON lines by random walks')
+    parser.add_argument('--rows', help='Row count of the board', type=int, required=True)
+    parser.add_argument('--columns', help='Column count of the board', type=int, required=True)
+    parser.add_argument('--blocks', help='Number of blocks on the board', type=int, required=True)
+    parser.add_argument('--final-states', help='Number of final states', type=int, default=1)
+    parser.add_argument('--walk-length', help='Number of random moves from a final state to the initial state',
+                        type=int, default=50)
+    parser.add_argument('--heuristic', help='Heuristic function of the puzzles', type=int, default=0)
+    parser.add_argument('-n', '--count', help='Number of puzzles', type=int, default=1)
+    parser.add_argument('--seed', help='Seed of the random number generator', type=int, default=0)
+    args = parser.parse_args()
+
+    for generated_puzzle in generate_puzzles(args.count, args.seed, rows=args.rows, columns=args.columns,
+                                             block_count=args.blocks, final_state_count=args.final_states,
+                                             walk_length=args.walk_length, heuristic=args.heuristic):
+        sys.stdout.write(json.dumps(generated_puzzle) + '\n')
@@ -0,0 +1,134 @@
+import json
+import time
+from typing import Callable, Iterator, Optional
+
+"""
+Instrumentation of a search which counts its work and measures where its time goes
+
+A search only touches the statistics object if one is given, so an uninstrumented search pays a
+single None check per expansion and per generated child. Heuristic and transition times are
+measured with a monotonic high resolution clock around each call, which slows an instrumented
+search down noticeably but leaves the counters exact.
+"""
+
+# Number of expansions between two calls of the progress callback
+DEFAULT_PROGRESS_INTERVAL = 10000
+
+
+class SearchStatistics(object):
+    """
+    Counters of a search which can be dumped as JSON at the end or reported periodically through a progress callback
+    Expansions = Number of expanded nodes
+    Generated = Number of generated children
+    Duplicates = Number of generated children whose states are already open or closed
+    Reopenings = Number of closed nodes which are opened again since a cheaper path to them is found
+    Peak Open Size = Maximum number of open nodes
+    Peak Closed Size = Maximum number of closed nodes
+    Maximum F Value = Largest f value among expanded nodes which is a lower bound of the optimal cost as long as the
+    heuristic is consistent and not weighted
+    Heuristic Calls = Number of heuristic evaluations and incremental updates
+    Heuristic Time = Duration of heuristic calls in seconds
+    Transition Time = Duration of successor generation in seconds
+    """
+
+    def __init__(self, progress_callback: Callable[['SearchStatistics'], None] = None,
+                 progress_interval: int = DEFAULT_PROGRESS_INTERVAL):
+        """
+        :param progress_callback: Function called with the statistics every progress interval expansions where an
+        exception raised by it stops the search
+        :param progress_interval: Number of expansions between two calls of the progress callback
+        """
+        if progress_interval <= 0:
+            raise ValueError("Progress interval should be positive.")
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.expansion_count = 0
+        self.generated_count = 0
+        self.duplicate_count = 0
+        self.reopening_count = 0
+        self.peak_open_size = 0
+        self.peak_closed_size = 0
+        self.maximum_f_value = None
+        self.heuristic_call_count = 0
+        self.heuristic_time = 0.0
+        self.transition_time = 0.0
+        self.start_time = None
+        self.end_time = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    def stop(self):
+        self.end_time = time.perf_counter()
+
+    @property
+    def elapsed_time(self) -> float:
+        """
+        Duration of the search in seconds which keeps growing until the search stops
+        """
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time if self.end_time is not None else time.perf_counter()) - self.start_time
+
+    @property
+    def expansions_per_second(self) -> float:
+        elapsed_time = self.elapsed_time
+        return self.expansion_count / elapsed_time if elapsed_time > 0 else 0.0
+
+    def record_expansion(self, open_size: int, closed_size: int, f_value: float = None):
+        """
+        Count one more expansion together with the current sizes of open and closed nodes and the f value of the node
+        """
+        self.expansion_count += 1
+        if f_value is not None and (self.maximum_f_value is None or f_value > self.maximum_f_value):
+            self.maximum_f_value = f_value
+        if open_size > self.peak_open_size:
+            self.peak_open_size = open_size
+        if closed_size > self.peak_closed_size:
+            self.peak_closed_size = closed_size
+        if self.progress_callback is not None and self.expansion_count % self.progress_interval == 0:
+            self.progress_callback(self)
+
+    def time_heuristic(self, heuristic_call: Callable, *args):
+        """
+        Call the given heuristic function with the given arguments while counting and timing it
+        """
+        self.heuristic_call_count += 1
+        start_time = time.perf_counter()
+        result = heuristic_call(*args)
+        self.heuristic_time += time.perf_counter() - start_time
+        return result
+
+    def time_successors(self, successors: Iterator) -> Iterator:
+        """
+        Wrap the given lazy successor iterator so that the time spent to generate each successor is measured
+        """
+        perf_counter = time.perf_counter
+        while True:
+            start_time = perf_counter()
+            successor = next(successors, None)
+            self.transition_time += perf_counter() - start_time
+            if successor is None:
+                return
+            self.generated_count += 1
+            yield successor
+
+    def to_dict(self) -> dict:
+        return {
+            'expansions': self.expansion_count,
+            'generated': self.generated_count,
+            'duplicates': self.duplicate_count,
+            'reopenings': self.reopening_count,
+            'peak_open_size': self.peak_open_size,
+            'peak_closed_size': self.peak_closed_size,
+            'maximum_f_value': self.maximum_f_value,
+            'heuristic_calls': self.heuristic_call_count,
+            'heuristic_time': self.heuristic_time,
+            'transition_time': self.transition_time,
+            'elapsed_time': self.elapsed_time,
+            'expansions_per_second': self.expansions_per_second
+        }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
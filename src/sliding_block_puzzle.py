@@ -1,41 +1,156 @@
-import argparse
-from typing import List, Tuple, Union
+from collections import OrderedDict
+from enum import Enum
+import functools
+import heapq
+import itertools
+import math
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional
 
+import src.feasibility as fe
 import src.heuristic_functions as hf
-import src.file_parser as fp
+import src.state_encoding as se
 import src.state_transitions as st
 
+# Modules which are only needed by some solves are imported by them, so a short solve does not pay their import time
+if TYPE_CHECKING:
+    from src.goal_context import GoalContext
+    from src.search_statistics import SearchStatistics
+    from src.solution_cache import SolutionCache
+
+
+class SearchStrategies(Enum):
+    A_STAR = 'astar'
+    ANYTIME_A_STAR = 'arastar'
+    IDA_STAR = 'idastar'
+    BIDIRECTIONAL = 'bidirectional'
+    PARALLEL_A_STAR = 'hdastar'
+    BREADTH_FIRST = 'bfs'
+    BEAM = 'beam'
+    EXTERNAL = 'external'
+
+
+class SearchLimitExceeded(Exception):
+    """
+    Raised when a search exceeds its node budget or time limit before it decides whether a solution exists
+    """
+
+
+class SearchLimits(object):
+    """
+    Node budget and time limit of a search which are checked at each node expansion
+    Node Budget = Maximum number of node expansions where None means no limit
+    Time Limit = Maximum duration of the search in seconds where None means no limit
+    """
+
+    def __init__(self, node_budget: int = None, time_limit: float = None):
+        self.node_budget = node_budget
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.expansion_count = 0
+
+    def expand(self):
+        """
+        Count one more node expansion and raise SearchLimitExceeded if any of the limits is exceeded
+        """
+        self.expansion_count += 1
+        if self.node_budget is not None and self.expansion_count > self.node_budget:
+            raise SearchLimitExceeded("Node budget of {0} expansions is exceeded".format(self.node_budget))
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SearchLimitExceeded("Time limit is exceeded after {0} expansions".format(self.expansion_count))
+
+    @staticmethod
+    def create(node_budget: int = None, time_limit: float = None) -> Optional['SearchLimits']:
+        """
+        Create limits of a search where None is returned if there is no limit so that searches skip the checks
+        """
+        if node_budget is None and time_limit is None:
+            return None
+        return SearchLimits(node_budget, time_limit)
+
 
 class Node(object):
     """
     Node structure of a state at a specific instant
-    State = Board state of the node
+    State = Encoded board state of the node
     Parent = Parent state of the node where the current node is expanded
     G Value = Accumulated cost of the current node starting from the initial node
     F Value = The expected cost with respect to heuristic function and G value
+    Heuristic Components = Heuristic values of the node against each final state which are kept by the heuristic
+    until the node is expanded
+    Move = Move which transforms the state of the parent node into the state of the node where it is None for the start
+    node
     """
 
-    def __init__(self, state: List[List[int]], parent, g_value: int, f_value: int):
+    __slots__ = ['state', 'parent', 'g_value', 'f_value', 'heuristic_components', 'move']
+
+    def __init__(self, state: bytes, parent, g_value: int, f_value: int, heuristic_components: tuple = None,
+                 move=None):
         self.state = state
         self.parent = parent
         self.g_value = g_value
         self.f_value = f_value
+        self.heuristic_components = heuristic_components
+        self.move = move
 
 
 class Puzzle(object):
 
     INITIAL_G_VALUE = 0
+    # Initial heuristic weight and its decrease after each iteration of Anytime Repairing A* Search
+    DEFAULT_ANYTIME_WEIGHT = 3
+    DEFAULT_WEIGHT_DECREMENT = 0.5
+    # Strategies whose solutions are optimal, so every suffix of their solution paths can be cached
+    OPTIMAL_STRATEGIES = frozenset([SearchStrategies.A_STAR.value, SearchStrategies.IDA_STAR.value,
+                                    SearchStrategies.BIDIRECTIONAL.value, SearchStrategies.PARALLEL_A_STAR.value,
+                                    SearchStrategies.BREADTH_FIRST.value, SearchStrategies.EXTERNAL.value])
 
     def __init__(self, heuristic, row_count: int, column_count: int, block_count: int,
-                 initial_state: List[List[int]], final_states: List[List[List[int]]]):
-        self.heuristic_function = hf.find_heuristic_function(heuristic)
+                 initial_state: List[List[int]], final_states: List[List[List[int]]],
+                 pattern_database_directory: str = None, canonicalize: bool = False,
+                 transition_mode: str = st.TransitionModes.SINGLE.value, move_cost: str = st.MoveCosts.PER_CELL.value,
+                 goal_context: 'GoalContext' = None):
+        if transition_mode != st.TransitionModes.SINGLE.value and move_cost == st.MoveCosts.PER_MOVE.value:
+            # Distances count cells, so only the number of misplaced blocks never overestimates when any slide costs one
+            heuristic = hf.Heuristics.MISPLACED_BLOCKS.value
+        self.heuristic_function = heuristic
         self.row_count = row_count
         self.column_count = column_count
         self.block_count = block_count
         self.initial_state = initial_state
         self.final_states = final_states
+        # States are encoded once and the solver works on encoded states only
+        self.encoded_initial_state = se.encode_state(initial_state)
+        self.encoded_final_states = [se.encode_state(final_state) for final_state in final_states]
+        self.move_generator = st.find_move_generator(self.encoded_initial_state, row_count, column_count, block_count,
+                                                     transition_mode, move_cost)
+        # Final states breaking an invariant of the initial state are unreachable, so they are neither goals nor
+        # heuristic targets, and a puzzle without any reachable final state fails before searching
+        self.feasibility_checker = fe.FeasibilityChecker(self.move_generator, self.encoded_initial_state)
+        self.reachable_final_states = self.feasibility_checker.find_feasible_final_states(self.encoded_final_states)
+        # Hashed goal index for the membership test of final states
+        self.encoded_final_state_set = frozenset(self.reachable_final_states)
+        # Goal positions of blocks in each final state are precomputed once by the heuristic
+        self.heuristic = hf.find_incremental_heuristic(heuristic, row_count, column_count,
+                                                       self.reachable_final_states or self.encoded_final_states,
+                                                       block_count, pattern_database_directory)
+        # Symmetric states share a key for duplicate detection if canonicalization is enabled and any symmetry exists
+        self.canonicalizer = None
+        if canonicalize:
+            import src.symmetry as sym
+
+            canonicalizer = sym.StateCanonicalizer(self.encoded_initial_state, row_count, column_count,
+                                                   self.encoded_final_states)
+            if not canonicalizer.is_trivial:
+                self.canonicalizer = canonicalizer
+        # Exact distances to the final states which are shared by puzzles of the same board and final states
+        if goal_context is not None and not goal_context.matches(self):
+            raise ValueError("Goal context does not belong to the board, moves and final states of the puzzle")
+        self.goal_context = goal_context
 
-    def solve(self):
+    def solve(self, node_budget: int = None, time_limit: float = None, statistics: 'SearchStatistics' = None,
+              weight: float = 1):
         """
         A* Search Pseudo Algorithm
         ==========================
@@ -55,161 +170,829 @@ class Puzzle(object):
             * If node' not in OPEN and node' not in CLOSED, then insert node' into OPEN setting its parent node
             * Else, if it is in OPEN, then check and update g value. Otherwise, it is in CLOSED, then do the same checks
             for g value and reopen it by removing from CLOSED state and putting it into OPEN
+
+        If canonicalization is enabled, open and closed nodes are indexed by canonical keys, so only one of symmetric
+        states is kept and the concrete solution path is rebuilt from the initial state at the end.
+
+        Weighted A* Search is run if the weight is greater than one where f_value = g_value + weight * h_value. It
+        expands fewer nodes while the cost of its solution is at most weight times the optimal cost.
+
+        If the puzzle has a goal context, exact distances of mapped states are their heuristic values and the search
+        stops once a mapped node is selected, where the rest of the path is read from the goal context.
+
+        SearchLimitExceeded is raised if the search exceeds the given node budget or time limit
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
+        :param statistics: Statistics filled by the search where None means the search is not instrumented
+        :param weight: Weight of heuristic values which should be at least one
         """
+        if weight < 1:
+            raise ValueError("Heuristic weight should be at least one.")
+        # Final states are checked to be reachable in advance, so unsolvable puzzles fail without searching
+        if not self.encoded_final_state_set:
+            return False, None
+        if statistics is not None:
+            statistics.start()
+            try:
+                return self._solve_a_star(node_budget, time_limit, statistics, weight)
+            finally:
+                statistics.stop()
+        return self._solve_a_star(node_budget, time_limit, None, weight)
+
+    def _solve_a_star(self, node_budget: Optional[int], time_limit: Optional[float],
+                      statistics: Optional['SearchStatistics'], weight: float):
+        limits = SearchLimits.create(node_budget, time_limit)
+        canonicalize = self.canonicalizer.canonicalize if self.canonicalizer is not None else None
+        # Heuristic calls are counted and timed only if the search is instrumented
+        update_heuristic = self.heuristic.update if statistics is None else \
+            functools.partial(statistics.time_heuristic, self.heuristic.update)
         # Initial start node
-        start_node = Node(self.initial_state, None, self.INITIAL_G_VALUE,
-                          self._find_minimum_heuristic_among_final_states(self.initial_state))
-        # Open and closed lists
-        open_list = [start_node]
-        closed_list = []
-
-        # Loop until open_list gets empty
-        while open_list:
-            current_node_index = Puzzle._find_minimum_f_valued_node(open_list)
-            current_node = open_list.pop(current_node_index)
-
-            # If it does not exist in closed_list, then put it there
-            if not Puzzle._check_is_node_in_node_list(current_node.state, closed_list)[0]:
-                closed_list.append(current_node)
-
-            # If one of the final nodes is reached, then return solution
-            if Puzzle._check_is_node_in_target_state_list(current_node.state, self.final_states):
+        start_heuristic_components = self.heuristic.evaluate(self.encoded_initial_state) if statistics is None else \
+            statistics.time_heuristic(self.heuristic.evaluate, self.encoded_initial_state)
+        start_heuristic_value = self.heuristic.value(start_heuristic_components)
+        goal_context = self.goal_context
+        if goal_context is not None:
+            start_heuristic_value = goal_context.estimate(self.encoded_initial_state, start_heuristic_value)
+            # A complete context maps every state which can reach a final state
+            if math.isinf(start_heuristic_value):
+                return False, None
+        start_node = Node(self.encoded_initial_state, None, self.INITIAL_G_VALUE,
+                          self.INITIAL_G_VALUE + weight * start_heuristic_value, start_heuristic_components)
+        # Open list is a binary heap of (f value, insertion order, node) entries where stale entries are skipped
+        # lazily, while open and closed nodes are indexed by their encoded states
+        insertion_order = itertools.count()
+        open_heap = [(start_node.f_value, next(insertion_order), start_node)]
+        open_nodes = {start_node.state if canonicalize is None else canonicalize(start_node.state): start_node}
+        closed_nodes = {}
+
+        # Loop until open nodes get empty
+        while open_heap:
+            f_value, _, current_node = heapq.heappop(open_heap)
+            current_state_key = current_node.state if canonicalize is None else canonicalize(current_node.state)
+
+            # Skip the entry if the node is already closed or the entry is outdated by an update
+            if open_nodes.get(current_state_key) is not current_node or f_value != current_node.f_value:
+                continue
+
+            # Move the node from open nodes to closed nodes
+            del open_nodes[current_state_key]
+            closed_nodes[current_state_key] = current_node
+
+            # If one of the final nodes is reached, then return solution where the exact distance of a state mapped by
+            # the goal context completes an optimal solution since it is the heuristic value of the selected node
+            if current_node.state in self.encoded_final_state_set or \
+                    (goal_context is not None and goal_context.distance(current_node.state) is not None):
+                for state, move in goal_context.find_path(current_node.state) if goal_context is not None else []:
+                    current_node = Node(state, current_node, current_node.g_value + 1, current_node.f_value,
+                                        move=move)
                 solution_path_to_initial_node = Puzzle._get_solution_path(current_node)
-                return True, solution_path_to_initial_node
+                if canonicalize is not None:
+                    solution_path_to_initial_node = self._rebuild_concrete_solution_path(solution_path_to_initial_node)
+                return True, self._decode_solution_path(solution_path_to_initial_node)
             else:
-                # Step g value since we cannot find final node and need to apply one more iteration
-                current_g_value = current_node.g_value + 1
-                # Expand children nodes
-                expanded_children = Puzzle._expand_node(current_node, self.block_count,
-                                                        self.row_count, self.column_count)
-
-                # Iterate over each children
-                for child_state in expanded_children:
-                    is_in_open_list, open_node = Puzzle._check_is_node_in_node_list(child_state, open_list)
-                    is_in_closed_list, closed_node = Puzzle._check_is_node_in_node_list(child_state, closed_list)
-
-                    if not is_in_open_list and not is_in_closed_list:
-                        open_list.append(
-                            Node(child_state, current_node, current_g_value,
-                                 self._find_minimum_heuristic_among_final_states(child_state) + current_g_value)
-                        )
+                if limits is not None:
+                    limits.expand()
+                successors = self.move_generator.weighted_successors(current_node.state)
+                if statistics is not None:
+                    statistics.record_expansion(len(open_nodes), len(closed_nodes), current_node.f_value)
+                    successors = statistics.time_successors(successors)
+                # Expand children nodes lazily and iterate over each children where the move cost is added to g value
+                for child_state, move, move_cost in successors:
+                    current_g_value = current_node.g_value + move_cost
+                    child_state_key = child_state if canonicalize is None else canonicalize(child_state)
+                    open_node = open_nodes.get(child_state_key)
+                    closed_node = closed_nodes.get(child_state_key)
+
+                    if open_node is None and closed_node is None:
+                        # Heuristic components are updated from the parent by the displacement of the moved block
+                        child_heuristic_components = update_heuristic(
+                            current_node.heuristic_components, move.block,
+                            current_node.state.find(move.block), child_state.find(move.block))
+                        child_heuristic_value = self.heuristic.value(child_heuristic_components)
+                        if goal_context is not None:
+                            child_heuristic_value = goal_context.estimate(child_state, child_heuristic_value)
+                        child_node = Node(child_state, current_node, current_g_value,
+                                          weight * child_heuristic_value + current_g_value,
+                                          child_heuristic_components, move)
+                        open_nodes[child_state_key] = child_node
+                        heapq.heappush(open_heap, (child_node.f_value, next(insertion_order), child_node))
+                    elif open_node is not None:
+                        if statistics is not None:
+                            statistics.duplicate_count += 1
+                        if open_node.g_value > current_g_value:
+                            Puzzle._update_node(open_node, current_node, current_g_value, move)
+                            # Decreased key is pushed again and the previous entry becomes stale
+                            heapq.heappush(open_heap, (open_node.f_value, next(insertion_order), open_node))
                     else:
-                        if is_in_open_list:
-                            if open_node.g_value > current_g_value:
-                                Puzzle._update_node(open_node, current_node, current_g_value)
-                        elif is_in_closed_list:
-                            if closed_node.g_value > current_g_value:
-                                Puzzle._update_node(closed_node, current_node, current_g_value)
-                                closed_list.remove(closed_node)
-                                open_list.append(closed_node)
-                        else:
-                            print("Error: A node should not be found in both open and closed list")
+                        if statistics is not None:
+                            statistics.duplicate_count += 1
+                        if closed_node.g_value <= current_g_value:
+                            continue
+                        if statistics is not None:
+                            statistics.reopening_count += 1
+                        # Reopen the closed node since a cheaper path to it is found where its heuristic components are
+                        # computed again since they are dropped after expansion
+                        Puzzle._update_node(closed_node, current_node, current_g_value, move)
+                        closed_node.state = child_state
+                        closed_node.heuristic_components = update_heuristic(
+                            current_node.heuristic_components, move.block,
+                            current_node.state.find(move.block), child_state.find(move.block))
+                        del closed_nodes[child_state_key]
+                        open_nodes[child_state_key] = closed_node
+                        heapq.heappush(open_heap, (closed_node.f_value, next(insertion_order), closed_node))
+                # Closed nodes only keep what the solution path needs, i.e. their parents and moves
+                current_node.heuristic_components = None
 
         # If this point is reached, then return None representing FAILURE
         return False, None
 
-    def _find_minimum_heuristic_among_final_states(self, state: List[List[int]]) -> int:
+    def solve_anytime(self, weight: float = None, weight_decrement: float = None, node_budget: int = None,
+                      time_limit: float = None, solution_callback: Callable[[List[Node]], None] = None):
         """
-        Minimum heuristic finding procedure among final states where the minimum distance of the current state
-        to all final states are computed with respect to assigned heuristic function
+        Anytime Repairing A* Search (ARA*) Pseudo Algorithm
+        ===================================================
+        Symbols: OPEN, CLOSED and G are the same as the ones of A* Search, INCONS: Inconsistent states,
+                 f_value = g_value + weight * h_value, INCUMBENT: Best final node found so far
+
+        1) Initialize OPEN <- {S}, CLOSED <- EMPTY_SET and INCONS <- EMPTY_SET with the initial weight
+        2) Improve the path until the g value of INCUMBENT is not greater than the minimum f value of OPEN
+            * Pop the minimum f-valued node of OPEN into CLOSED, and update INCUMBENT if it is in G
+            * For each successor whose g value decreases, update its parent and g value, and insert it into OPEN if
+            it is not in CLOSED; otherwise, insert it into INCONS instead of reopening it
+        3) Publish INCUMBENT if it is improved
+        4) If the weight is one, then return INCUMBENT
+        5) Decrease the weight, move INCONS into OPEN, recompute f values of OPEN, clear CLOSED and go to step 2
+
+        The first solution is found as fast as Weighted A* Search with the initial weight, and later iterations reuse
+        the g values of earlier ones, so each better solution is found without searching from scratch. The cost of
+        each solution is at most weight times the optimal cost, and the last one is optimal.
+
+        If the node budget or time limit is exceeded, the best solution found so far is returned, while
+        SearchLimitExceeded is raised if no solution is found yet
+        :param weight: Initial weight of heuristic values where None means DEFAULT_ANYTIME_WEIGHT
+        :param weight_decrement: Decrease of the weight after each iteration where None means DEFAULT_WEIGHT_DECREMENT
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
+        :param solution_callback: Function called with each better solution path as soon as it is found
+        :return: Whether a solution exists and the best solution path
         """
-        heuristic_value_list = []
-        for final_state in self.final_states:
-            heuristic_value_list.append(self.heuristic_function(state, final_state))
-        return min(heuristic_value_list)
+        weight = self.DEFAULT_ANYTIME_WEIGHT if weight is None else weight
+        weight_decrement = self.DEFAULT_WEIGHT_DECREMENT if weight_decrement is None else weight_decrement
+        if weight < 1:
+            raise ValueError("Heuristic weight should be at least one.")
+        if weight_decrement <= 0:
+            raise ValueError("Weight decrement should be positive.")
+        # Final states are checked to be reachable in advance, so unsolvable puzzles fail without searching
+        if not self.encoded_final_state_set:
+            return False, None
+        limits = SearchLimits.create(node_budget, time_limit)
+        canonicalize = self.canonicalizer.canonicalize if self.canonicalizer is not None else None
 
-    @staticmethod
-    def _find_minimum_f_valued_node(open_list: List[Node]) -> int:
+        start_heuristic_components = self.heuristic.evaluate(self.encoded_initial_state)
+        start_node = Node(self.encoded_initial_state, None, self.INITIAL_G_VALUE,
+                          self.INITIAL_G_VALUE + weight * self.heuristic.value(start_heuristic_components),
+                          start_heuristic_components)
+        # All generated nodes are kept since g values of earlier iterations are reused
+        nodes = {start_node.state if canonicalize is None else canonicalize(start_node.state): start_node}
+        insertion_order = itertools.count()
+        open_heap = [(start_node.f_value, next(insertion_order), start_node)]
+        open_nodes = {start_node}
+        closed_nodes = set()
+        inconsistent_nodes = set()
+        incumbent_node = None
+        best_solution_path = None
+
+        try:
+            while True:
+                # Improve the path with the current weight
+                while open_heap and (incumbent_node is None or incumbent_node.g_value > open_heap[0][0]):
+                    f_value, _, current_node = heapq.heappop(open_heap)
+                    # Skip the entry if the node is already closed or the entry is outdated by an update
+                    if current_node not in open_nodes or f_value != current_node.f_value:
+                        continue
+                    open_nodes.remove(current_node)
+                    closed_nodes.add(current_node)
+
+                    if current_node.state in self.encoded_final_state_set:
+                        if incumbent_node is None or current_node.g_value < incumbent_node.g_value:
+                            incumbent_node = current_node
+                        continue
+                    if limits is not None:
+                        limits.expand()
+                    for child_state, move, move_cost in self.move_generator.weighted_successors(current_node.state):
+                        current_g_value = current_node.g_value + move_cost
+                        child_state_key = child_state if canonicalize is None else canonicalize(child_state)
+                        child_node = nodes.get(child_state_key)
+                        if child_node is None:
+                            child_heuristic_components = self.heuristic.update(
+                                current_node.heuristic_components, move.block,
+                                current_node.state.find(move.block), child_state.find(move.block))
+                            child_node = Node(child_state, current_node, current_g_value,
+                                              current_g_value + weight * self.heuristic.value(child_heuristic_components),
+                                              child_heuristic_components, move)
+                            nodes[child_state_key] = child_node
+                        elif child_node.g_value > current_g_value:
+                            Puzzle._update_node(child_node, current_node, current_g_value, move)
+                        else:
+                            continue
+                        # Closed nodes wait for the next iteration instead of being reopened
+                        if child_node in closed_nodes:
+                            inconsistent_nodes.add(child_node)
+                        else:
+                            open_nodes.add(child_node)
+                            heapq.heappush(open_heap, (child_node.f_value, next(insertion_order), child_node))
+
+                if incumbent_node is None:
+                    # Open nodes are exhausted without reaching any final state
+                    return False, None
+                if best_solution_path is None or incumbent_node.g_value < best_solution_path[-1].g_value:
+                    best_solution_path = self._copy_solution_path(incumbent_node, canonicalize is not None)
+                    if solution_callback is not None:
+                        solution_callback(best_solution_path)
+                if weight == 1:
+                    return True, best_solution_path
+
+                # Decrease the weight and rebuild open nodes from open and inconsistent nodes
+                weight = max(1, weight - weight_decrement)
+                open_nodes |= inconsistent_nodes
+                inconsistent_nodes = set()
+                closed_nodes = set()
+                for node in open_nodes:
+                    node.f_value = node.g_value + weight * self.heuristic.value(node.heuristic_components)
+                open_heap = [(node.f_value, next(insertion_order), node) for node in open_nodes]
+                heapq.heapify(open_heap)
+        except SearchLimitExceeded:
+            if best_solution_path is None:
+                raise
+            return True, best_solution_path
+
+    def _copy_solution_path(self, final_node: Node, canonicalized: bool) -> List[Node]:
         """
-        Finding minimum f-valued state in open states
+        Copying the solution path of the given final node with decoded states so that later updates of the search
+        nodes do not change it
         """
-        minimum_index = 0
-        minimum_f_value = open_list[0].f_value
-        for index, open_node_from_list in enumerate(open_list):
-            if open_node_from_list.f_value < minimum_f_value:
-                minimum_index = index
-                minimum_f_value = open_node_from_list.f_value
-        return minimum_index
+        solution_path = Puzzle._get_solution_path(final_node)
+        if canonicalized:
+            solution_path = self._rebuild_concrete_solution_path(solution_path)
+        copied_solution_path = []
+        for node in solution_path:
+            copied_solution_path.append(Node(node.state, copied_solution_path[-1] if copied_solution_path else None,
+                                             node.g_value, node.g_value + self._find_minimum_heuristic_among_final_states(
+                                                 node.state), move=node.move))
+        return self._decode_solution_path(copied_solution_path)
 
-    @staticmethod
-    def _check_is_node_in_node_list(state: List[List[int]], closed_state_list: List[Node])\
-            -> Union[Tuple[bool, Node], Tuple[bool, None]]:
+    def solve_ida_star(self, transposition_table_size: int = None, node_budget: int = None, time_limit: float = None):
+        """
+        Iterative Deepening A* Search Pseudo Algorithm
+        ==============================================
+        Symbols: S: Start state, G: Goal states, BOUND: Cost bound of the current iteration,
+                 f_value = h_value + g_value as in A* Search
+
+        1) Initialize BOUND <- f_value(S)
+        2) Apply depth first search from S where nodes on the current path are not revisited
+            * If f_value(node) > BOUND, then prune node and remember the minimum pruned f value
+            * If node in G, then return the solution path which is the current path
+        3) If no node is pruned, then return FAILURE
+        4) Otherwise, BOUND <- minimum pruned f value and go to step 2
+
+        Since every move costs one, the cost of a solution is an integer and heuristic values are rounded up, which
+        keeps them admissible while real valued heuristics do not produce a new bound for each distinct f value.
+        Only the current path is stored, so memory is linear in the solution depth. Optionally, a bounded transposition
+        table keeps the lowest g values of recently visited states in the current iteration so that a state reached
+        again with no lower g value is not searched twice.
+        :param transposition_table_size: Maximum number of states kept in the transposition table where None disables
+        the table
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
+        """
+        self._check_single_cell_moves()
+        if transposition_table_size is not None and transposition_table_size <= 0:
+            raise ValueError("Transposition table size should be positive.")
+        # Final states are checked to be reachable in advance, so unsolvable puzzles fail without searching
+        if not self.encoded_final_state_set:
+            return False, None
+        limits = SearchLimits.create(node_budget, time_limit)
+
+        bound = Puzzle._round_up_heuristic(self._find_minimum_heuristic_among_final_states(self.encoded_initial_state))
+        while True:
+            transposition_table = OrderedDict() if transposition_table_size is not None else None
+            solution_states, bound = self._bounded_depth_first_search(bound, transposition_table,
+                                                                      transposition_table_size, limits)
+            if solution_states is not None:
+                return True, self._decode_solution_path(self._build_solution_path(solution_states))
+            # If there is no pruned node, then the whole reachable space is searched
+            if bound is None:
+                return False, None
+
+    def _bounded_depth_first_search(self, bound: float, transposition_table: Optional[OrderedDict],
+                                    transposition_table_size: Optional[int], limits: Optional[SearchLimits]):
+        """
+        Single iteration of Iterative Deepening A* Search which is implemented with an explicit stack of successor
+        iterators instead of recursion
+        :return: States of the solution path if it is found; otherwise, None and the minimum pruned f value which is
+        None if no node is pruned
+        """
+        start_state = self.encoded_initial_state
+        if start_state in self.encoded_final_state_set:
+            return [start_state], bound
+
+        next_bound = None
+        # Current path with g values, heuristic components and successor iterators of each state
+        path_states = [start_state]
+        path_state_set = {start_state}
+        path_heuristic_components = [self.heuristic.evaluate(start_state)]
+        successor_iterators = [self.move_generator.successors(start_state)]
+
+        while successor_iterators:
+            child_state, move = next(successor_iterators[-1], (None, None))
+            # All successors are searched, then backtrack
+            if child_state is None:
+                successor_iterators.pop()
+                path_state_set.remove(path_states.pop())
+                path_heuristic_components.pop()
+                continue
+            # Nodes on the current path are not revisited
+            if child_state in path_state_set:
+                continue
+
+            current_state = path_states[-1]
+            child_g_value = len(path_states)
+            child_heuristic_components = self.heuristic.update(path_heuristic_components[-1], move.block,
+                                                               current_state.find(move.block),
+                                                               child_state.find(move.block))
+            child_f_value = child_g_value + Puzzle._round_up_heuristic(
+                self.heuristic.value(child_heuristic_components))
+            if child_f_value > bound:
+                if next_bound is None or child_f_value < next_bound:
+                    next_bound = child_f_value
+                continue
+
+            if child_state in self.encoded_final_state_set:
+                return path_states + [child_state], bound
+
+            if transposition_table is not None:
+                # Skip the state if it is already reached with no higher g value in this iteration
+                seen_g_value = transposition_table.get(child_state)
+                if seen_g_value is not None and seen_g_value <= child_g_value:
+                    continue
+                transposition_table[child_state] = child_g_value
+                transposition_table.move_to_end(child_state)
+                # Evict the least recently updated state
+                if len(transposition_table) > transposition_table_size:
+                    transposition_table.popitem(last=False)
+
+            if limits is not None:
+                limits.expand()
+            path_states.append(child_state)
+            path_state_set.add(child_state)
+            path_heuristic_components.append(child_heuristic_components)
+            successor_iterators.append(self.move_generator.successors(child_state))
+
+        return None, next_bound
+
+    def solve_bidirectional(self, node_budget: int = None, time_limit: float = None):
         """
-        Check whether the given node is in the closed states
+        Bidirectional Breadth First Search Pseudo Algorithm
+        ===================================================
+        Symbols: S: Start state, G: Goal states, FORWARD: States reached from S, BACKWARD: States reached from G
+
+        1) Initialize FORWARD <- {S} and BACKWARD <- G, their frontiers are S and G respectively
+        2) If one of the frontiers is empty, then return FAILURE
+        3) Expand each state of the smaller frontier by one move into a new frontier
+            * States which are already reached by the same direction are skipped
+            * If a new state is reached by the other direction, then return the path through that state
+        4) Go to step 2
+
+        Since every move costs one and can be reverted, the backward search uses the same transitions. Frontiers are
+        expanded layer by layer, so the first state reached by both directions lies on an optimal path. Heuristic
+        values are only used to fill f values of the solution path nodes.
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
         """
-        for closed_node in closed_state_list:
-            if state == closed_node.state:
-                return True, closed_node
+        self._check_single_cell_moves()
+        # Final states are checked to be reachable in advance, so unsolvable puzzles fail without searching
+        if not self.encoded_final_state_set:
+            return False, None
+        limits = SearchLimits.create(node_budget, time_limit)
+        start_state = self.encoded_initial_state
+        if start_state in self.encoded_final_state_set:
+            return True, self._decode_solution_path(self._build_solution_path([start_state]))
+
+        # Parent of each reached state through the corresponding direction
+        forward_parents = {start_state: None}
+        backward_parents = dict.fromkeys(self.encoded_final_state_set)
+        forward_frontier = [start_state]
+        backward_frontier = list(self.encoded_final_state_set)
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting_state = self._expand_frontier(forward_frontier, forward_parents,
+                                                                        backward_parents, limits)
+            else:
+                backward_frontier, meeting_state = self._expand_frontier(backward_frontier, backward_parents,
+                                                                         forward_parents, limits)
+
+            if meeting_state is not None:
+                # Follow parents from the meeting state to the start state and to one of the final states
+                solution_states = []
+                state = meeting_state
+                while state is not None:
+                    solution_states.append(state)
+                    state = forward_parents[state]
+                solution_states.reverse()
+                state = backward_parents[meeting_state]
+                while state is not None:
+                    solution_states.append(state)
+                    state = backward_parents[state]
+                return True, self._decode_solution_path(self._build_solution_path(solution_states))
+
+        # If this point is reached, then return None representing FAILURE
         return False, None
 
-    @staticmethod
-    def _check_is_node_in_target_state_list(state: List[List[int]], target_state_list: List[List[List[int]]]) -> bool:
+    def _expand_frontier(self, frontier: List[bytes], parents: dict, other_parents: dict,
+                         limits: Optional[SearchLimits]):
         """
-        Check whether the given node is in the final state list
+        Expanding the given frontier of a bidirectional search by one layer
+        :return: Next frontier and the first state reached by both directions which is None if there is not any
         """
-        for target_state in target_state_list:
-            if state == target_state:
-                return True
-        return False
+        next_frontier = []
+        for state in frontier:
+            if limits is not None:
+                limits.expand()
+            for child_state, _ in self.move_generator.successors(state):
+                if child_state in parents:
+                    continue
+                parents[child_state] = state
+                if child_state in other_parents:
+                    return next_frontier, child_state
+                next_frontier.append(child_state)
+        return next_frontier, None
+
+    def solve_parallel(self, workers: int = None, node_budget: int = None, time_limit: float = None):
+        """
+        Solve the puzzle with Hash Distributed A* Search whose states are distributed over worker processes
+        :param workers: Number of worker processes where None means the number of processors
+        :param node_budget: Maximum number of node expansions of all workers where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
+        """
+        self._check_single_cell_moves()
+        # Final states are checked to be reachable in advance, so unsolvable puzzles fail without searching
+        if not self.encoded_final_state_set:
+            return False, None
+        # Import here since the parallel search module needs this module for the search limits
+        import src.parallel_search as ps
+
+        solution_exists, solution_states = ps.solve_parallel(self, workers or os.cpu_count() or 1, node_budget,
+                                                             time_limit)
+        if not solution_exists:
+            return False, None
+        return True, self._decode_solution_path(self._build_solution_path(solution_states))
+
+    def solve_breadth_first(self, node_budget: int = None, time_limit: float = None):
+        """
+        Solve the puzzle with Breadth First Search whose layers are expanded as NumPy batches, the solution is optimal
+        since every move costs one
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
+        """
+        self._check_single_cell_moves()
+        # Final states are checked to be reachable in advance, so unsolvable puzzles fail without searching
+        if not self.encoded_final_state_set:
+            return False, None
+        # Import here since NumPy is only needed by the vectorized searches
+        import src.vectorized_search as vs
+
+        solution_exists, solution_states = vs.solve_breadth_first(self, node_budget, time_limit)
+        if not solution_exists:
+            return False, None
+        return True, self._decode_solution_path(self._build_solution_path(solution_states))
+
+    def solve_beam(self, beam_width: int = None, node_budget: int = None, time_limit: float = None):
+        """
+        Solve the puzzle with Beam Search whose layers are expanded and scored as NumPy batches, the solution is not
+        necessarily optimal and a solution may be missed if the beam is too narrow
+        :param beam_width: Maximum number of states kept in each layer where None means the default width
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
+        """
+        self._check_single_cell_moves()
+        # Final states are checked to be reachable in advance, so unsolvable puzzles fail without searching
+        if not self.encoded_final_state_set:
+            return False, None
+        # Import here since NumPy is only needed by the vectorized searches
+        import src.vectorized_search as vs
+
+        solution_exists, solution_states = vs.solve_beam(self, beam_width or vs.DEFAULT_BEAM_WIDTH, node_budget,
+                                                         time_limit)
+        if not solution_exists:
+            return False, None
+        return True, self._decode_solution_path(self._build_solution_path(solution_states))
+
+    def solve_external(self, directory: str = None, run_size: int = None, node_budget: int = None,
+                       time_limit: float = None):
+        """
+        Solve the puzzle with Breadth First Iterative Deepening A* Search whose layers are kept in sorted files on disk
+        and whose duplicates are detected by merging them, so memory usage is bounded by the run size
+        :param directory: Directory where layer files are created where None means the default temporary directory
+        :param run_size: Maximum number of states buffered in memory before they are written as a sorted run where
+        None means the default size
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
+        """
+        self._check_single_cell_moves()
+        # Final states are checked to be reachable in advance, so unsolvable puzzles fail without searching
+        if not self.encoded_final_state_set:
+            return False, None
+        # Import here since the external search module needs this module for the search limits
+        import src.external_search as es
+
+        solution_exists, solution_states = es.solve_external(self, directory, run_size or es.DEFAULT_RUN_SIZE,
+                                                             node_budget, time_limit)
+        if not solution_exists:
+            return False, None
+        return True, self._decode_solution_path(self._build_solution_path(solution_states))
+
+    def _build_solution_path(self, solution_states: List[bytes]) -> List[Node]:
+        """
+        Building solution path nodes of the given states starting from the initial state
+        """
+        solution_path_to_initial_node = []
+        for g_value, state in enumerate(solution_states):
+            parent = solution_path_to_initial_node[-1] if solution_path_to_initial_node else None
+            move = None if parent is None else next(move for child_state, move in
+                                                    self.move_generator.successors(parent.state) if child_state == state)
+            solution_path_to_initial_node.append(
+                Node(state, parent, g_value, g_value + self._find_minimum_heuristic_among_final_states(state),
+                     move=move))
+        return solution_path_to_initial_node
+
+    def _check_single_cell_moves(self):
+        """
+        Raise ValueError unless moves slide a block by one cell since only A* Search supports other transition modes
+        """
+        if not isinstance(self.move_generator, st.MoveGenerator):
+            raise ValueError("Only A* search supports moves sliding blocks by many cells")
 
     @staticmethod
-    def _expand_node(node_to_expand: Node, pieces: int, row_count: int, column_count: int) -> List[List[List[int]]]:
-        """
-        Expand the given node by applying state transitions
-        """
-        current_state = node_to_expand.state
-        children = []
-        for block_to_slide in range(1, pieces + 1):
-            # Functions to be applied where all the direction of sliding exist
-            functions_to_be_applied = [st.slide_block_up, st.slide_block_down,
-                                       st.slide_block_left, st.slide_block_right]
-            for function in functions_to_be_applied:
-                expanded_node = function(current_state, row_count, column_count, block_to_slide)
-                if expanded_node is not None:
-                    children.append(expanded_node)
-        return children
+    def _round_up_heuristic(heuristic_value: float) -> int:
+        """
+        Rounding up the given heuristic value to an integer where a small tolerance absorbs floating point errors
+        """
+        if math.isinf(heuristic_value):
+            return heuristic_value
+        return math.ceil(heuristic_value - 1e-9)
+
+    def solve_with_strategy(self, strategy: str = SearchStrategies.A_STAR.value, transposition_table_size: int = None,
+                            node_budget: int = None, time_limit: float = None, workers: int = None,
+                            beam_width: int = None, statistics: 'SearchStatistics' = None, weight: float = None,
+                            solution_callback: Callable[[List[Node]], None] = None,
+                            solution_cache: 'SolutionCache' = None, external_directory: str = None):
+        """
+        Solve the puzzle with the given search strategy
+
+        If a solution cache is given, a cached solution of the initial state is returned without searching, and
+        results of strategies which find optimal solutions are stored in the cache together with every suffix of
+        the solution path.
+        :param strategy: Value of the search strategy which can be reached from SearchStrategies enumeration
+        :param transposition_table_size: Maximum number of states kept in the transposition table of IDA* Search
+        :param workers: Number of worker processes of Hash Distributed A* Search where None means the number of
+        processors
+        :param beam_width: Maximum number of states kept in each layer of Beam Search where None means the default width
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration of the search in seconds where None means no limit
+        :param statistics: Statistics filled by A* Search where None means the search is not instrumented
+        :param weight: Weight of heuristic values of A* Search or the initial one of Anytime Repairing A* Search where
+        None means the default one
+        :param solution_callback: Function called with each better solution path of Anytime Repairing A* Search
+        :param solution_cache: Cache of optimal solutions where None means every solve searches
+        :param external_directory: Directory where External Search creates its layer files where None means the
+        default temporary directory
+        :return: Whether a solution exists and the solution path
+        """
+        if statistics is not None and strategy != SearchStrategies.A_STAR.value:
+            raise ValueError("Only A* search supports search statistics")
+        if weight is not None and strategy not in [SearchStrategies.A_STAR.value, SearchStrategies.ANYTIME_A_STAR.value]:
+            raise ValueError("Only A* and anytime A* searches support heuristic weights")
+        if strategy not in {search_strategy.value for search_strategy in SearchStrategies}:
+            raise ValueError("Unknown search strategy {0}".format(strategy))
+        if solution_cache is None:
+            return self._solve_with_strategy(strategy, transposition_table_size, node_budget, time_limit, workers,
+                                             beam_width, statistics, weight, solution_callback, external_directory)
+
+        cached_solution = solution_cache.get(self)
+        if cached_solution is not None:
+            return self._restore_cached_solution(*cached_solution)
+        solution_exists, solution_path = self._solve_with_strategy(
+            strategy, transposition_table_size, node_budget, time_limit, workers, beam_width, statistics, weight,
+            solution_callback, external_directory)
+        # Anytime solutions may be cut short by limits, and weighted and beam solutions are not optimal
+        if strategy in self.OPTIMAL_STRATEGIES and weight in [None, 1]:
+            if solution_exists:
+                solution_cache.put(self, [se.encode_state(node.state) for node in solution_path],
+                                   [node.g_value for node in solution_path])
+            else:
+                solution_cache.put(self, None, None)
+        return solution_exists, solution_path
+
+    def _solve_with_strategy(self, strategy: str, transposition_table_size: Optional[int], node_budget: Optional[int],
+                             time_limit: Optional[float], workers: Optional[int], beam_width: Optional[int],
+                             statistics: Optional['SearchStatistics'], weight: Optional[float],
+                             solution_callback: Optional[Callable[[List[Node]], None]],
+                             external_directory: Optional[str]):
+        if strategy == SearchStrategies.A_STAR.value:
+            return self.solve(node_budget, time_limit, statistics, 1 if weight is None else weight)
+        elif strategy == SearchStrategies.ANYTIME_A_STAR.value:
+            return self.solve_anytime(weight, node_budget=node_budget, time_limit=time_limit,
+                                      solution_callback=solution_callback)
+        elif strategy == SearchStrategies.IDA_STAR.value:
+            return self.solve_ida_star(transposition_table_size, node_budget, time_limit)
+        elif strategy == SearchStrategies.BIDIRECTIONAL.value:
+            return self.solve_bidirectional(node_budget, time_limit)
+        elif strategy == SearchStrategies.PARALLEL_A_STAR.value:
+            return self.solve_parallel(workers, node_budget, time_limit)
+        elif strategy == SearchStrategies.BREADTH_FIRST.value:
+            return self.solve_breadth_first(node_budget, time_limit)
+        elif strategy == SearchStrategies.BEAM.value:
+            return self.solve_beam(beam_width, node_budget, time_limit)
+        else:
+            return self.solve_external(external_directory, node_budget=node_budget, time_limit=time_limit)
+
+    def _restore_cached_solution(self, solution_states: Optional[List[bytes]], solution_costs: Optional[List[int]]):
+        """
+        Building the solution path of the given cached states whose costs are kept since moves may slide many cells
+        """
+        if solution_states is None:
+            return False, None
+        solution_path = self._build_solution_path(solution_states)
+        for node, g_value in zip(solution_path, solution_costs):
+            node.f_value += g_value - node.g_value
+            node.g_value = g_value
+        return True, self._decode_solution_path(solution_path)
+
+    def _rebuild_concrete_solution_path(self, solution_path: List[Node]) -> List[Node]:
+        """
+        Rebuilding a solution path whose consecutive states are connected by moves since a node found through
+        canonical keys may keep a symmetric state of the one reached from its parent
+        """
+        solution_states = [self.encoded_initial_state]
+        for node in solution_path[1:]:
+            solution_states.append(self.canonicalizer.find_symmetric_successor(
+                self.move_generator.successors(solution_states[-1]), self.canonicalizer.canonicalize(node.state)))
+        concrete_solution_path = self._build_solution_path(solution_states)
+        # Symmetric states have the same costs, which also keeps costs of moves sliding blocks by many cells
+        for concrete_node, node in zip(concrete_solution_path, solution_path):
+            concrete_node.g_value, concrete_node.f_value = node.g_value, node.f_value
+        return concrete_solution_path
+
+    def _find_minimum_heuristic_among_final_states(self, state: bytes) -> int:
+        """
+        Minimum heuristic finding procedure among final states where the minimum distance of the current state
+        to all final states are computed with respect to assigned heuristic function
+        """
+        return self.heuristic.value(self.heuristic.evaluate(state))
 
     @staticmethod
-    def _update_node(node_to_be_updated: Node, parent_node: Node, current_g_value: int):
+    def _update_node(node_to_be_updated: Node, parent_node: Node, current_g_value: int, move):
         """
-        Updating the given solution by changing its g value, parent node and f value
+        Updating the given solution by changing its g value, parent node, move and f value
         """
         g_value_difference = node_to_be_updated.g_value - current_g_value
         node_to_be_updated.parent = parent_node
+        node_to_be_updated.move = move
         node_to_be_updated.g_value = current_g_value
         node_to_be_updated.f_value -= g_value_difference
 
     @staticmethod
     def _get_solution_path(final_node: Node) -> List[Node]:
         """
-        Finding solution path via iterating parents until the start node
+        Finding solution path via iterating parents until the start node and reversing them
         """
         solution_path_to_initial_node = []
-        while final_node.parent is not None:
-            solution_path_to_initial_node.insert(0, final_node)
+        while final_node is not None:
+            solution_path_to_initial_node.append(final_node)
             final_node = final_node.parent
-        solution_path_to_initial_node.insert(0, final_node)
+        solution_path_to_initial_node.reverse()
         return solution_path_to_initial_node
 
+    @staticmethod
+    def get_solution_moves(solution_path: List[Node]) -> list:
+        """
+        Finding moves of the given solution path which are recorded while nodes are generated
+        :param solution_path: Solution path starting from the initial state
+        :return: Moves transforming each state of the path into the next one
+        """
+        return [node.move for node in solution_path[1:]]
+
+    def _decode_solution_path(self, solution_path: List[Node]) -> List[Node]:
+        """
+        Converting encoded states of the solution path nodes back to two dimensional states
+        """
+        for node in solution_path:
+            node.state = se.decode_state(node.state, self.row_count, self.column_count)
+        return solution_path
+
 
 if __name__ == '__main__':
+    import argparse
+
+    import src.file_parser as fp
+    from src.search_statistics import SearchStatistics
+
     parser = argparse.ArgumentParser()
     parser.add_argument('-f', '--file', help='File name to parse and create puzzle',
                         type=argparse.FileType('r'), required=True)
+    parser.add_argument('-s', '--strategy', help='Search strategy to solve puzzle',
+                        choices=[strategy.value for strategy in SearchStrategies],
+                        default=SearchStrategies.A_STAR.value)
+    parser.add_argument('--transposition-table-size', help='Maximum number of states kept by IDA* transposition table',
+                        type=int, default=None)
+    parser.add_argument('--workers', help='Number of worker processes of parallel A* search', type=int, default=None)
+    parser.add_argument('--beam-width', help='Maximum number of states kept in each layer of beam search', type=int,
+                        default=None)
+    parser.add_argument('--transitions', help='Transition mode of moves which is only supported by A* and anytime A* searches',
+                        choices=[mode.value for mode in st.TransitionModes], default=st.TransitionModes.SINGLE.value)
+    parser.add_argument('--move-cost', help='Cost model of moves sliding blocks by many cells',
+                        choices=[cost.value for cost in st.MoveCosts], default=st.MoveCosts.PER_CELL.value)
+    parser.add_argument('--canonicalize', help='Merge symmetric states during A* search', action='store_true')
+    parser.add_argument('-o', '--output', help='Print boards of all states or only the moves of the solution',
+                        choices=['boards', 'moves'], default='boards')
+    parser.add_argument('--weight', help='Weight of heuristic values of A* search or the initial one of anytime A* '
+                                         'search', type=float, default=None)
+    parser.add_argument('--time-limit', help='Maximum duration of the search in seconds where anytime A* search '
+                                             'prints the best solution found so far', type=float, default=None)
+    parser.add_argument('--node-budget', help='Maximum number of node expansions', type=int, default=None)
+    parser.add_argument('--statistics', help='Print statistics of A* search as JSON to the standard error at the end',
+                        action='store_true')
+    parser.add_argument('--progress-interval', help='Print statistics of A* search as JSON lines to the standard error '
+                                                    'every given number of expansions', type=int, default=None)
+    parser.add_argument('--pattern-database-directory', help='Directory where pattern databases are saved and loaded',
+                        default=None)
+    parser.add_argument('--solution-cache', help='SQLite database file where optimal solutions are cached',
+                        default=None)
+    parser.add_argument('--external-directory', help='Directory where external search creates its layer files',
+                        default=None)
     args = parser.parse_args()
 
+    # Options which the strategy does not support are rejected before the puzzle is parsed
+    if (args.statistics or args.progress_interval is not None) and args.strategy != SearchStrategies.A_STAR.value:
+        parser.error("--statistics and --progress-interval are only supported by the {0} strategy".format(
+            SearchStrategies.A_STAR.value))
+    weighted_strategies = [SearchStrategies.A_STAR.value, SearchStrategies.ANYTIME_A_STAR.value]
+    if args.weight is not None and args.strategy not in weighted_strategies:
+        parser.error("--weight is only supported by the {0} strategies".format(' and '.join(weighted_strategies)))
+    if args.weight is not None and not args.weight >= 1:
+        parser.error("--weight should be at least one")
+    # Only the strategies expanding weighted successors slide blocks by many cells
+    if args.transitions != st.TransitionModes.SINGLE.value and args.strategy not in weighted_strategies:
+        parser.error("--transitions {0} is only supported by the {1} strategies".format(
+            args.transitions, ' and '.join(weighted_strategies)))
+
     # Get filename
     _file = args.file
 
     # Parse puzzle
-    puzzle = fp.PuzzleInputParser.parse_dict_formatted_file(_file)
+    puzzle = fp.PuzzleInputParser.parse_dict_formatted_file(
+        _file, pattern_database_directory=args.pattern_database_directory, canonicalize=args.canonicalize,
+        transition_mode=args.transitions, move_cost=args.move_cost)
+
+    # Instrument the search only if statistics are requested
+    search_statistics = None
+    if args.progress_interval is not None:
+        search_statistics = SearchStatistics(lambda reported: print(reported.to_json(), file=sys.stderr, flush=True),
+                                             args.progress_interval)
+    elif args.statistics:
+        search_statistics = SearchStatistics()
+
+    # Only the database tier of the cache outlives a single solve
+    solution_cache = None
+    if args.solution_cache is not None:
+        from src.solution_cache import SolutionCache
+
+        solution_cache = SolutionCache(database_path=args.solution_cache)
 
-    # Solve puzzle
-    solution_exists, solution_path = puzzle.solve()
-    if solution_exists:
+    # Solve puzzle where anytime A* search reports each better solution as soon as it is found
+    try:
+        solution_exists, solution_path = puzzle.solve_with_strategy(
+            args.strategy, args.transposition_table_size, args.node_budget, args.time_limit, workers=args.workers,
+            beam_width=args.beam_width, statistics=search_statistics, weight=args.weight,
+            solution_callback=lambda path: print("Solution of cost {0} is found.".format(path[-1].g_value),
+                                                 file=sys.stderr, flush=True),
+            solution_cache=solution_cache, external_directory=args.external_directory)
+    except SearchLimitExceeded as e:
+        print("Search is stopped: {0}.".format(e))
+        sys.exit(1)
+    finally:
+        if args.statistics:
+            print(search_statistics.to_json(), file=sys.stderr)
+        if solution_cache is not None:
+            solution_cache.close()
+    if solution_exists and args.output == 'moves':
+        for move in Puzzle.get_solution_moves(solution_path):
+            print(st.format_move(move))
+    elif solution_exists:
         for node in solution_path:
             for row in node.state:
                 print(row)
             print()
     else:
-        print("Solution does not exist.")
\ No newline at end of file
+        print("Solution does not exist.")
@@ -0,0 +1,223 @@
+import array
+from collections import OrderedDict
+import hashlib
+import struct
+import sys
+import threading
+from typing import List, Optional, Tuple
+
+import src.state_transitions as st
+
+"""
+Cache of optimal solve results keyed by canonical fingerprints of puzzles
+
+A fingerprint is the SHA-256 digest of the board dimensions, block count, heuristic function, transition
+mode, move cost model, the sorted set of final states and the start state, so puzzles which only list their
+final states in another order share the same key. Every suffix of an optimal solution path is an optimal
+solution of the puzzle starting from the first state of that suffix, so a solved path is stored once and each
+of its states is a key referring to its offset in the path. Unsolvable puzzles are cached as well.
+
+Entries are kept in an in memory tier with least recently used eviction, and optionally in an SQLite database
+which keeps them across processes and runs. A hit of the database tier is promoted into the memory tier.
+"""
+
+# Maximum number of states kept in the memory tier
+DEFAULT_CAPACITY = 100000
+
+# Fingerprint header: row count, column count, block count, heuristic, transition mode, move cost, final state count
+FINGERPRINT_HEADER = struct.Struct('<HHHBBBI')
+
+# Transition mode and move cost codes of fingerprints
+SINGLE_TRANSITION_CODE = 0
+STRAIGHT_TRANSITION_CODE = 1
+FREE_TRANSITION_CODE = 2
+PER_CELL_COST_CODE = 0
+PER_MOVE_COST_CODE = 1
+
+# Solution path record: encoded states of the path and their accumulated costs from its first state
+SolutionRecord = Tuple[Tuple[bytes, ...], Tuple[int, ...]]
+
+DATABASE_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS solution_paths (id INTEGER PRIMARY KEY, states BLOB NOT NULL, costs BLOB NOT NULL)',
+    # Path id is NULL for unsolvable puzzles
+    'CREATE TABLE IF NOT EXISTS solution_entries (fingerprint BLOB PRIMARY KEY, path_id INTEGER, path_offset INTEGER) '
+    'WITHOUT ROWID'
+]
+
+
+def find_fingerprint(puzzle, state: bytes = None) -> bytes:
+    """
+    Find the canonical fingerprint of the given puzzle
+    :param puzzle: Puzzle whose dimensions, final states and heuristic are fingerprinted
+    :param state: Encoded start state where None means the initial state of the puzzle
+    :return: SHA-256 digest of the puzzle
+    """
+    digest = _find_goal_digest(puzzle)
+    digest.update(puzzle.encoded_initial_state if state is None else state)
+    return digest.digest()
+
+
+def _find_goal_digest(puzzle):
+    """
+    Digest of everything in a fingerprint except the start state which can be copied for each start state
+    """
+    move_generator = puzzle.move_generator
+    if isinstance(move_generator, st.MacroMoveGenerator):
+        transition_code = FREE_TRANSITION_CODE if move_generator.turns_corners else STRAIGHT_TRANSITION_CODE
+        cost_code = PER_CELL_COST_CODE if move_generator.costs_per_cell else PER_MOVE_COST_CODE
+    else:
+        transition_code, cost_code = SINGLE_TRANSITION_CODE, PER_CELL_COST_CODE
+    final_states = sorted(set(puzzle.encoded_final_states))
+    digest = hashlib.sha256(FINGERPRINT_HEADER.pack(puzzle.row_count, puzzle.column_count, puzzle.block_count,
+                                                    puzzle.heuristic_function, transition_code, cost_code,
+                                                    len(final_states)))
+    for final_state in final_states:
+        digest.update(final_state)
+    return digest
+
+
+class SolutionCache(object):
+    """
+    Two tier cache of optimal solution paths whose memory tier is bounded and whose database tier is optional
+    Capacity = Maximum number of states kept in the memory tier
+    Database Path = SQLite database file of the persistent tier where None means memory only
+    Hit Count = Number of lookups which are answered by any tier
+    Miss Count = Number of lookups which are answered by none of the tiers
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, database_path: str = None):
+        if capacity <= 0:
+            raise ValueError("Capacity of the solution cache should be positive.")
+        self.capacity = capacity
+        # Fingerprint -> (solution record, offset of the start state) where the record is None for unsolvable puzzles
+        self.entries = OrderedDict()
+        self.hit_count = 0
+        self.miss_count = 0
+        # Searches may run on other threads, so each tier is guarded by the same lock
+        self.lock = threading.Lock()
+        self.connection = None
+        if database_path is not None:
+            # Import here since memory only caches do not need the database module
+            import sqlite3
+
+            self.connection = sqlite3.connect(database_path, check_same_thread=False)
+            with self.connection:
+                for statement in DATABASE_SCHEMA:
+                    self.connection.execute(statement)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, puzzle) -> Optional[Tuple[Optional[List[bytes]], Optional[List[int]]]]:
+        """
+        Look up the optimal solution of the given puzzle from its initial state
+        :param puzzle: Puzzle to look up
+        :return: Encoded states of the solution path and their costs from the initial state where both are None if
+        the puzzle is unsolvable; otherwise, None if the puzzle is not cached
+        """
+        fingerprint = find_fingerprint(puzzle)
+        with self.lock:
+            entry = self.entries.get(fingerprint)
+            if entry is not None:
+                self.entries.move_to_end(fingerprint)
+            elif self.connection is not None:
+                entry = self._load_entry(fingerprint, len(puzzle.encoded_initial_state))
+                if entry is not None:
+                    self._add_entry(fingerprint, entry)
+            if entry is None:
+                self.miss_count += 1
+                return None
+            self.hit_count += 1
+        solution_record, offset = entry
+        if solution_record is None:
+            return None, None
+        states, costs = solution_record
+        return list(states[offset:]), [cost - costs[offset] for cost in costs[offset:]]
+
+    def put(self, puzzle, solution_states: Optional[List[bytes]], solution_costs: Optional[List[int]]):
+        """
+        Store the optimal solution of the given puzzle for its initial state and every later state of the path
+        :param puzzle: Solved puzzle
+        :param solution_states: Encoded states of an optimal solution path where None means the puzzle is unsolvable
+        :param solution_costs: Accumulated costs of the states from the initial state
+        """
+        goal_digest = _find_goal_digest(puzzle)
+        if solution_states is None:
+            digest = goal_digest.copy()
+            digest.update(puzzle.encoded_initial_state)
+            fingerprints = [digest.digest()]
+            solution_record = None
+        else:
+            fingerprints = []
+            for state in solution_states:
+                digest = goal_digest.copy()
+                digest.update(state)
+                fingerprints.append(digest.digest())
+            solution_record = (tuple(solution_states), tuple(solution_costs))
+        with self.lock:
+            # Shorter suffixes are added first, so the longest one is the last to be evicted
+            for offset in reversed(range(len(fingerprints))):
+                self._add_entry(fingerprints[offset], (solution_record, offset))
+            if self.connection is not None:
+                self._store_entries(fingerprints, solution_record)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _add_entry(self, fingerprint: bytes, entry: Tuple[Optional[SolutionRecord], int]):
+        """
+        Add the given entry into the memory tier evicting the least recently used entries beyond the capacity
+        """
+        self.entries[fingerprint] = entry
+        self.entries.move_to_end(fingerprint)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def _load_entry(self, fingerprint: bytes, state_size: int) -> Optional[Tuple[Optional[SolutionRecord], int]]:
+        """
+        Load the entry of the given fingerprint from the database tier
+        """
+        row = self.connection.execute('SELECT path_id, path_offset FROM solution_entries WHERE fingerprint = ?',
+                                      (fingerprint,)).fetchone()
+        if row is None:
+            return None
+        path_id, offset = row
+        if path_id is None:
+            return None, 0
+        states, costs = self.connection.execute('SELECT states, costs FROM solution_paths WHERE id = ?',
+                                                (path_id,)).fetchone()
+        cost_array = array.array('Q')
+        cost_array.frombytes(costs)
+        if sys.byteorder != 'little':
+            cost_array.byteswap()
+        return (tuple(states[index:index + state_size] for index in range(0, len(states), state_size)),
+                tuple(cost_array)), offset
+
+    def _store_entries(self, fingerprints: List[bytes], solution_record: Optional[SolutionRecord]):
+        """
+        Store the given path once and an entry referring to it for each of its states into the database tier
+        """
+        with self.connection:
+            # A path whose first state is already stored adds nothing but another copy
+            if self.connection.execute('SELECT 1 FROM solution_entries WHERE fingerprint = ?',
+                                       (fingerprints[0],)).fetchone() is not None:
+                return
+            path_id = None
+            if solution_record is not None:
+                states, costs = solution_record
+                cost_array = array.array('Q', costs)
+                if sys.byteorder != 'little':
+                    cost_array.byteswap()
+                path_id = self.connection.execute('INSERT INTO solution_paths (states, costs) VALUES (?, ?)',
+                                                  (b''.join(states), cost_array.tobytes())).lastrowid
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO solution_entries (fingerprint, path_id, path_offset) VALUES (?, ?, ?)',
+                [(fingerprint, path_id, offset) for offset, fingerprint in enumerate(fingerprints)])
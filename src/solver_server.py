@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from typing import Optional, TextIO
+
+from src.batch_solver import ERROR_STATUS, LIMIT_EXCEEDED_STATUS, SOLVED_STATUS, UNSOLVABLE_STATUS
+import src.file_parser as fp
+from src.sliding_block_puzzle import Puzzle, SearchLimitExceeded, SearchStrategies
+from src.solution_cache import SolutionCache
+from src.solver_service import DEFAULT_MAX_CONCURRENCY, SolverService
+import src.state_transitions as st
+
+"""
+Long living solver process which answers puzzles read as JSON lines from the standard input or a socket
+
+A short solve through the command line pays for starting the interpreter and importing the solver
+on every call, which takes longer than searching small puzzles. The server pays it once and then
+answers each request from the same warm process, where repeated puzzles and later states of solved
+ones are answered by the memory tier of a shared solution cache.
+
+Each request is a dictionary like formatted puzzle in a single JSON line, which may also have an id
+that is copied to its response, a node budget, a time limit and a heuristic weight. Each response
+is a JSON line with the id, the status, the moves of the solution path formatted as block ids
+followed by directions, the solution cost, the elapsed time and the error message. Requests read
+from the standard input are answered one after another in their order. Requests read from a socket
+are solved concurrently by a solver service, so their responses are written as soon as they complete
+and are matched to requests by their ids. Solves of a connection which is lost are cancelled.
+"""
+
+# Request keys besides the ones of the dictionary like input format
+ID_KEY = 'id'
+NODE_BUDGET_KEY = 'node_budget'
+TIME_LIMIT_KEY = 'time_limit'
+WEIGHT_KEY = 'weight'
+
+DEFAULT_HOST = '127.0.0.1'
+# Maximum length of a request line read from a socket
+MAXIMUM_REQUEST_SIZE = 1 << 20
+
+
+def _parse_request(request_line: str, response: dict):
+    """
+    Parse the puzzle and the search options of the given request line where the id is copied to the response
+    :return: Puzzle, node budget, time limit and weight of the request
+    """
+    request = json.loads(request_line)
+    if not isinstance(request, dict):
+        raise ValueError("Request should be a JSON object.")
+    response[ID_KEY] = request.get(ID_KEY)
+    # Options are checked before solving, so a bad request fails the same way whether its puzzle is cached or not
+    node_budget = _read_number(request, NODE_BUDGET_KEY, None, 0, integer=True)
+    time_limit = _read_number(request, TIME_LIMIT_KEY, None, 0)
+    weight = _read_number(request, WEIGHT_KEY, 1, 1)
+    return fp.PuzzleInputParser.parse_dict(request), node_budget, time_limit, weight
+
+
+def _read_number(request: dict, key: str, default: Optional[float], minimum: float, integer: bool = False):
+    """
+    Read the given optional finite number of the request which should be at least the given minimum
+    """
+    value = request.get(key)
+    if value is None:
+        return default
+    # JSON booleans are integers in Python, but they are not numbers of a request
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)) or \
+            not minimum <= value < math.inf:
+        raise ValueError("{0} should be {1} of at least {2}, not {3}.".format(
+            key, 'an integer' if integer else 'a number', minimum, json.dumps(value)))
+    return value
+
+
+def _new_response() -> dict:
+    return {ID_KEY: None, 'status': ERROR_STATUS, 'moves': None, 'cost': None, 'time': None, 'error': None}
+
+
+def _complete_response(response: dict, solution_exists: bool, solution_path: Optional[list]):
+    if solution_exists:
+        response['status'] = SOLVED_STATUS
+        response['moves'] = [st.format_move(move) for move in Puzzle.get_solution_moves(solution_path)]
+        response['cost'] = solution_path[-1].g_value
+    else:
+        response['status'] = UNSOLVABLE_STATUS
+
+
+def _fail_response(response: dict, error: Exception):
+    if isinstance(error, SearchLimitExceeded):
+        response['status'] = LIMIT_EXCEEDED_STATUS
+        response['error'] = str(error)
+    else:
+        response['error'] = '{0}: {1}'.format(type(error).__name__, error)
+
+
+def answer_request(request_line: str, solution_cache: SolutionCache = None) -> dict:
+    """
+    Solve the puzzle of the given request line with A* Search where errors are reported in the response
+    :param request_line: Dictionary like formatted puzzle in JSON with optional id, node budget, time limit and weight
+    :param solution_cache: Cache of optimal solutions shared by the requests where None means every request searches
+    :return: Response dictionary with id, status, moves, cost, elapsed time and error message
+    """
+    response = _new_response()
+    start_time = time.monotonic()
+    try:
+        puzzle, node_budget, time_limit, weight = _parse_request(request_line, response)
+        _complete_response(response, *puzzle.solve_with_strategy(
+            SearchStrategies.A_STAR.value, node_budget=node_budget, time_limit=time_limit, weight=weight,
+            solution_cache=solution_cache))
+    except Exception as e:
+        _fail_response(response, e)
+    response['time'] = time.monotonic() - start_time
+    return response
+
+
+async def answer_request_async(service: SolverService, request_line: str) -> dict:
+    """
+    Solve the puzzle of the given request line through the given service, see answer_request
+    """
+    response = _new_response()
+    start_time = time.monotonic()
+    try:
+        # Puzzles are created on a worker thread since building a pattern database may take a while
+        puzzle, node_budget, time_limit, weight = await asyncio.get_running_loop().run_in_executor(
+            None, _parse_request, request_line, response)
+        _complete_response(response, *await service.solve(puzzle, node_budget, time_limit, weight))
+    except Exception as e:
+        _fail_response(response, e)
+    response['time'] = time.monotonic() - start_time
+    return response
+
+
+def serve_stream(input_file: TextIO, output_file: TextIO, solution_cache: SolutionCache = None) -> int:
+    """
+    Answer request lines of the given input file in their order until it ends where empty lines are skipped
+    :return: Number of answered requests
+    """
+    request_count = 0
+    # Lines are read one at a time, so each response is written before the next request arrives
+    for request_line in iter(input_file.readline, ''):
+        if not request_line.strip():
+            continue
+        output_file.write(json.dumps(answer_request(request_line, solution_cache)) + '\n')
+        output_file.flush()
+        request_count += 1
+    return request_count
+
+
+async def _serve_connection(service: SolverService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """
+    Answer request lines of a connection concurrently until the client stops sending them
+    """
+    async def answer(request_line: str):
+        response = await answer_request_async(service, request_line)
+        try:
+            writer.write((json.dumps(response) + '\n').encode())
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    pending_tasks = set()
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            if not request_line.strip():
+                continue
+            task = asyncio.create_task(answer(request_line.decode()))
+            pending_tasks.add(task)
+            task.add_done_callback(pending_tasks.discard)
+        # Clients may close their side once every request is sent, so requests in flight are still answered
+        if pending_tasks:
+            await asyncio.wait(pending_tasks)
+    except (ConnectionError, ValueError):
+        # Connection is lost or a request line is longer than the limit
+        pass
+    finally:
+        # Solves which nobody can receive any more are cancelled
+        for task in list(pending_tasks):
+            task.cancel()
+        writer.close()
+
+
+async def start_socket_server(service: SolverService, host: str = DEFAULT_HOST,
+                              port: int = 0) -> asyncio.AbstractServer:
+    """
+    Start accepting connections whose request lines are answered by the given service
+    :param service: Solver service shared by all connections
+    :param host: Host name or address to listen on
+    :param port: Port to listen on where zero means any free port
+    :return: Server whose sockets have the address it listens on
+    """
+    return await asyncio.start_server(lambda reader, writer: _serve_connection(service, reader, writer), host, port,
+                                      limit=MAXIMUM_REQUEST_SIZE)
+
+
+async def serve_socket(host: str, port: int, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                       solution_cache: SolutionCache = None):
+    """
+    Answer requests of socket connections until the process is stopped
+    """
+    async with SolverService(max_concurrency, solution_cache=solution_cache) as service:
+        server = await start_socket_server(service, host, port)
+        async with server:
+            for server_socket in server.sockets:
+                print("Listening on {0}:{1}".format(*server_socket.getsockname()[:2]), file=sys.stderr, flush=True)
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Answer puzzles read as JSON lines from one warm process')
+    parser.add_argument('--port', help='Port to listen on where requests are read from the standard input if it is '
+                                       'not given and zero means any free port', type=int, default=None)
+    parser.add_argument('--host', help='Host name or address to listen on', default=DEFAULT_HOST)
+    parser.add_argument('--max-concurrency', help='Maximum number of solves running at the same time of a socket '
+                                                  'server', type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument('--solution-cache', help='SQLite database keeping solutions across runs', default=None)
+    args = parser.parse_args()
+
+    with SolutionCache(database_path=args.solution_cache) as server_solution_cache:
+        if args.port is None:
+            serve_stream(sys.stdin, sys.stdout, server_solution_cache)
+        else:
+            try:
+                asyncio.run(serve_socket(args.host, args.port, args.max_concurrency, server_solution_cache))
+            except KeyboardInterrupt:
+                pass
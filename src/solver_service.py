@@ -0,0 +1,222 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import AsyncIterator, List, Optional
+
+from src.search_statistics import SearchStatistics
+from src.sliding_block_puzzle import SearchLimitExceeded, SearchStrategies
+from src.solution_cache import SolutionCache, find_fingerprint
+
+"""
+Asyncio interface of the solver which keeps the event loop responsive while puzzles are solved
+
+Solves run on a pool of worker threads while a semaphore bounds the number of solves which are
+running at the same time, so waiting requests hold no thread and can be cancelled for free. Since
+searches are pure Python and hold the GIL, the threads only keep the event loop responsive and add
+no CPU parallelism, so the pool is small by default. Each
+solve is an instrumented A* search whose progress callback is called every progress interval
+expansions. The callback sends a snapshot of the statistics to the event loop, and it raises
+SolveCancelled once nobody waits for the result any more, which stops the search inside its loop.
+Deadlines and node budgets are the search limits of the solve, where the time spent waiting for a
+worker counts towards the deadline.
+
+Requests for the same puzzle fingerprint with the same weight and limits which arrive while one
+of them is in flight share a single solve, and every request receives the same result.
+"""
+
+# Maximum number of solves running at the same time where a second one lets a short solve pass a long one, but more
+# threads would only share the GIL
+DEFAULT_MAX_CONCURRENCY = 2
+# Number of expansions between two progress snapshots which is also the latency of cancellation
+DEFAULT_PROGRESS_INTERVAL = 1000
+# Maximum number of snapshots kept for a request where the oldest one is dropped for a new one
+PROGRESS_QUEUE_SIZE = 16
+
+
+class SolveCancelled(Exception):
+    """
+    Raised inside a search whose requests are all cancelled so that its worker is released
+    """
+
+
+class _SolveJob(object):
+    """
+    Solve shared by the requests of the same key
+    Key = Fingerprint of the puzzle together with the weight and the limits
+    Task = Task of the solve whose result is the result of all requests
+    Cancel Event = Set once every request is cancelled, which is checked by the search in the worker thread
+    Waiter Count = Number of requests which are not cancelled
+    Progress Queues = Snapshot queue of each request where None marks the end of the solve
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.task = None
+        self.cancel_event = threading.Event()
+        self.waiter_count = 0
+        self.progress_queues = []
+
+    def publish(self, snapshot: Optional[dict]):
+        for progress_queue in self.progress_queues:
+            if progress_queue.full():
+                progress_queue.get_nowait()
+            progress_queue.put_nowait(snapshot)
+
+
+class SolveRequest(object):
+    """
+    Request of a solve which is awaited for the result and iterated asynchronously for progress snapshots
+    """
+
+    def __init__(self, service: 'SolverService', job: _SolveJob, progress_queue: asyncio.Queue):
+        self.service = service
+        self.job = job
+        self.progress_queue = progress_queue
+        self.cancelled = False
+
+    def __await__(self):
+        return self._wait().__await__()
+
+    async def _wait(self):
+        try:
+            # Shielded since the solve is shared, cancelling one waiter only drops its interest
+            return await asyncio.shield(self.job.task)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+    def cancel(self):
+        """
+        Drop the interest of this request where the search is stopped if no other request waits for it
+        """
+        if not self.cancelled:
+            self.cancelled = True
+            self.service._release(self.job)
+
+    def __aiter__(self) -> AsyncIterator[dict]:
+        return self._iterate_progress()
+
+    async def _iterate_progress(self) -> AsyncIterator[dict]:
+        while True:
+            snapshot = await self.progress_queue.get()
+            if snapshot is None:
+                return
+            yield snapshot
+
+
+class SolverService(object):
+    """
+    Pool of worker threads which solve puzzles for coroutines, where the threads keep the event loop responsive but
+    add no CPU parallelism since searches hold the GIL
+    Max Concurrency = Maximum number of solves running at the same time
+    Progress Interval = Number of expansions between two progress snapshots
+    Solution Cache = Cache of optimal solutions shared by all solves where None means every solve searches
+    Coalesced Count = Number of requests which joined a solve in flight
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 progress_interval: int = DEFAULT_PROGRESS_INTERVAL, solution_cache: SolutionCache = None):
+        if max_concurrency <= 0:
+            raise ValueError("Maximum concurrency should be positive.")
+        self.max_concurrency = max_concurrency
+        self.progress_interval = progress_interval
+        self.solution_cache = solution_cache
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_concurrency, thread_name_prefix='solver')
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.jobs = {}
+        self.coalesced_count = 0
+
+    def submit(self, puzzle, node_budget: int = None, time_limit: float = None, weight: float = 1) -> SolveRequest:
+        """
+        Submit a solve of the given puzzle with A* Search which should be called from a coroutine
+        :param puzzle: Puzzle to solve
+        :param node_budget: Maximum number of node expansions where None means no limit
+        :param time_limit: Maximum duration in seconds from the submission where None means no limit
+        :param weight: Weight of heuristic values which should be at least one
+        :return: Request which is awaited for whether a solution exists and the solution path, where SearchLimitExceeded
+        is raised if a limit is exceeded
+        """
+        loop = asyncio.get_running_loop()
+        key = (find_fingerprint(puzzle), weight, node_budget, time_limit)
+        job = self.jobs.get(key)
+        if job is None:
+            job = _SolveJob(key)
+            self.jobs[key] = job
+            deadline = None if time_limit is None else loop.time() + time_limit
+            job.task = loop.create_task(self._run(job, puzzle, node_budget, deadline, weight))
+            job.task.add_done_callback(lambda _: self._finish(job))
+        else:
+            self.coalesced_count += 1
+        progress_queue = asyncio.Queue(PROGRESS_QUEUE_SIZE)
+        job.progress_queues.append(progress_queue)
+        job.waiter_count += 1
+        return SolveRequest(self, job, progress_queue)
+
+    async def solve(self, puzzle, node_budget: int = None, time_limit: float = None, weight: float = 1):
+        """
+        Solve the given puzzle without blocking the event loop, see submit
+        """
+        return await self.submit(puzzle, node_budget, time_limit, weight)
+
+    async def _run(self, job: _SolveJob, puzzle, node_budget: Optional[int], deadline: Optional[float],
+                   weight: float):
+        loop = asyncio.get_running_loop()
+        async with self.semaphore:
+            if job.cancel_event.is_set():
+                raise SolveCancelled("Solve is cancelled before it starts")
+            time_limit = None
+            if deadline is not None:
+                time_limit = deadline - loop.time()
+                if time_limit <= 0:
+                    raise SearchLimitExceeded("Time limit is exceeded before the search starts")
+            return await loop.run_in_executor(self.executor, self._solve, job, loop, puzzle, node_budget, time_limit,
+                                              weight)
+
+    def _solve(self, job: _SolveJob, loop: asyncio.AbstractEventLoop, puzzle, node_budget: Optional[int],
+               time_limit: Optional[float], weight: float):
+        """
+        Solve the puzzle on a worker thread where snapshots are handed over to the event loop
+        """
+        def report_progress(statistics: SearchStatistics):
+            if job.cancel_event.is_set():
+                raise SolveCancelled("Solve is cancelled after {0} expansions".format(statistics.expansion_count))
+            loop.call_soon_threadsafe(job.publish, statistics.to_dict())
+
+        return puzzle.solve_with_strategy(SearchStrategies.A_STAR.value, node_budget=node_budget,
+                                          time_limit=time_limit,
+                                          statistics=SearchStatistics(report_progress, self.progress_interval),
+                                          weight=weight, solution_cache=self.solution_cache)
+
+    def _release(self, job: _SolveJob):
+        """
+        Drop a waiter of the given job where the job is cancelled and forgotten once no waiter is left
+        """
+        job.waiter_count -= 1
+        if job.waiter_count == 0:
+            job.cancel_event.set()
+            # Later requests of the same key start a new solve instead of joining a cancelled one
+            if self.jobs.get(job.key) is job:
+                del self.jobs[job.key]
+
+    def _finish(self, job: _SolveJob):
+        if self.jobs.get(job.key) is job:
+            del self.jobs[job.key]
+        job.publish(None)
+        # Failures of solves which nobody waits for are retrieved so that they are not reported as unhandled
+        if not job.task.cancelled():
+            job.task.exception()
+
+    def close(self):
+        """
+        Stop all solves in flight and the worker threads
+        """
+        for job in list(self.jobs.values()):
+            job.cancel_event.set()
+        self.jobs.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,37 @@
+from typing import List
+
+"""
+Compact immutable encoding of board states
+
+A board state is flattened row by row into a bytes object where each byte keeps
+the block id of the corresponding cell. Encoded states are hashable, their hash
+values are cached by the interpreter and they take one byte per cell, so they are
+used as the state representation throughout the solver. Nested lists are only
+produced back at the output boundary.
+"""
+
+MAXIMUM_BLOCK_ID = 255
+
+
+def encode_state(state: List[List[int]]) -> bytes:
+    """
+    Flatten the given two dimensional state into its compact encoding
+    :param state: Board state as list of rows
+    :return: Encoded state where cell (i, j) is placed at index i * column count + j
+    """
+    try:
+        return bytes(block for row in state for block in row)
+    except ValueError:
+        raise ValueError("Block ids of state " + str(state) + " must be in range [0, " +
+                         str(MAXIMUM_BLOCK_ID) + "].")
+
+
+def decode_state(state: bytes, rows: int, columns: int) -> List[List[int]]:
+    """
+    Convert the given encoded state back to its two dimensional form
+    :param state: Encoded board state
+    :param rows: Row count of the board
+    :param columns: Column count of the board
+    :return: Board state as list of rows
+    """
+    return [list(state[i * columns:(i + 1) * columns]) for i in range(rows)]
@@ -1,5 +1,6 @@
-from typing import List, Union
-import unittest
+from collections import deque, namedtuple
+from enum import Enum
+from typing import Iterator, List, Optional, Tuple, Union
 
 import src as common
 
@@ -108,119 +109,356 @@ def slide_block_right(current_state: List[List[int]], rows: int, columns: int, b
     return updated_state
 
 
-class StateTransition(unittest.TestCase):
+def slide_encoded_block_up(current_state: bytes, rows: int, columns: int, block_to_slide: int) -> Optional[bytes]:
+    return _slide_encoded_block(current_state, rows, columns, block_to_slide, -1, 0)
+
+
+def slide_encoded_block_down(current_state: bytes, rows: int, columns: int, block_to_slide: int) -> Optional[bytes]:
+    return _slide_encoded_block(current_state, rows, columns, block_to_slide, 1, 0)
+
 
-    # Block ids which will be used through all the test cases
-    TARGET_BLOCK_ID = 1
-    OBSTACLE_BLOCK_ID = 2
+def slide_encoded_block_left(current_state: bytes, rows: int, columns: int, block_to_slide: int) -> Optional[bytes]:
+    return _slide_encoded_block(current_state, rows, columns, block_to_slide, 0, -1)
+
+
+def slide_encoded_block_right(current_state: bytes, rows: int, columns: int, block_to_slide: int) -> Optional[bytes]:
+    return _slide_encoded_block(current_state, rows, columns, block_to_slide, 0, 1)
 
-    # Test state
-    state = [
-        [0, 0, 0],
-        [0, 0, 0],
-        [0, 0, 0],
-        [0, 0, 0]
-    ]
 
-    row = len(state)
-    column = len(state[0])
-
-    def test_normal_up_transitions(self):
-        for row_index in range(self.row - 1, -1, -1):
-            input_state = [x[:] for x in self.state]
-            input_state[row_index][1] = self.TARGET_BLOCK_ID
-
-            # Get output state
-            output_state = slide_block_up(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
-            if row_index - 1 >= 0:
-                expected_state = [x[:] for x in self.state]
-                expected_state[row_index - 1][1] = self.TARGET_BLOCK_ID
-                self.assertListEqual(expected_state, output_state)
-            else:
-                self.assertIsNone(output_state)
-
-    def test_normal_down_transitions(self):
-        for row_index in range(0, self.row):
-            input_state = [x[:] for x in self.state]
-            input_state[row_index][1] = self.TARGET_BLOCK_ID
-
-            # Get output state
-            output_state = slide_block_down(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
-            if row_index + 1 < self.row:
-                expected_state = [x[:] for x in self.state]
-                expected_state[row_index + 1][1] = self.TARGET_BLOCK_ID
-                self.assertListEqual(expected_state, output_state)
-            else:
-                self.assertIsNone(output_state)
-
-    def test_normal_left_transitions(self):
-        for column_index in range(self.column - 1, -1, -1):
-            input_state = [x[:] for x in self.state]
-            input_state[2][column_index] = self.TARGET_BLOCK_ID
-
-            # Get output state
-            output_state = slide_block_left(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
-            if column_index - 1 >= 0:
-                expected_state = [x[:] for x in self.state]
-                expected_state[2][column_index - 1] = self.TARGET_BLOCK_ID
-                self.assertListEqual(expected_state, output_state)
-            else:
-                self.assertIsNone(output_state)
-
-    def test_normal_right_transitions(self):
-        for column_index in range(0, self.column):
-            input_state = [x[:] for x in self.state]
-            input_state[2][column_index] = self.TARGET_BLOCK_ID
-
-            # Get output state
-            output_state = slide_block_right(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
-            if column_index + 1 < self.column:
-                expected_state = [x[:] for x in self.state]
-                expected_state[2][column_index + 1] = self.TARGET_BLOCK_ID
-                self.assertListEqual(expected_state, output_state)
+def _slide_encoded_block(current_state: bytes, rows: int, columns: int, block_to_slide: int,
+                         row_step: int, column_step: int) -> Optional[bytes]:
+    """
+    Slide the given block of an encoded state one cell towards the given row and column steps
+    :param current_state: Encoded board state
+    :param rows: Row count of the board
+    :param columns: Column count of the board
+    :param block_to_slide: Id of the block to slide
+    :param row_step: Row offset of the slide which is one of -1, 0 and 1
+    :param column_step: Column offset of the slide which is one of -1, 0 and 1
+    :return: Encoded state after the slide if it is possible; otherwise, None
+    """
+    block_cells = [index for index, block in enumerate(current_state) if block == block_to_slide]
+    # Block does not exist on the board, then there is nothing to slide
+    if not block_cells:
+        return None
+
+    target_cells = []
+    for cell in block_cells:
+        row_index, column_index = divmod(cell, columns)
+        row_index += row_step
+        column_index += column_step
+        # No space left in the slide direction, then return None
+        if not (0 <= row_index < rows and 0 <= column_index < columns):
+            return None
+        target_cell = row_index * columns + column_index
+        # If the target cell is occupied by another block then return None
+        if current_state[target_cell] != common.EMPTY_CELL_BLOCK and current_state[target_cell] != block_to_slide:
+            return None
+        target_cells.append(target_cell)
+
+    # Otherwise make previous cells empty and place the block onto the target cells
+    updated_state = bytearray(current_state)
+    for cell in block_cells:
+        updated_state[cell] = common.EMPTY_CELL_BLOCK
+    for cell in target_cells:
+        updated_state[cell] = block_to_slide
+    return bytes(updated_state)
+
+
+class Directions(Enum):
+    UP = 0
+    DOWN = 1
+    LEFT = 2
+    RIGHT = 3
+
+
+# Row and column steps of each direction
+DIRECTION_STEPS = {
+    Directions.UP: (-1, 0),
+    Directions.DOWN: (1, 0),
+    Directions.LEFT: (0, -1),
+    Directions.RIGHT: (0, 1)
+}
+
+# Move which slides the block one cell through the direction
+Move = namedtuple('Move', ['block', 'direction'])
+# Move which slides the block through one cell for each of the directions at once
+MacroMove = namedtuple('MacroMove', ['block', 'directions'])
+
+
+def encode_move(move: Move) -> int:
+    """
+    Compact integer code of the given single cell move which fits into 16 bits
+    """
+    return move.block << 2 | move.direction.value
+
+
+def decode_move(move_code: int) -> Move:
+    """
+    Single cell move of the given integer code, see encode_move
+    """
+    return Move(move_code >> 2, Directions(move_code & 3))
+
+
+def format_move(move: Union[Move, MacroMove]) -> str:
+    """
+    Readable form of the given move as the block id followed by the names of its directions
+    """
+    directions = move.directions if isinstance(move, MacroMove) else (move.direction,)
+    return ' '.join([str(move.block)] + [direction.name for direction in directions])
+
+
+class TransitionModes(Enum):
+    # A move slides a block by one cell
+    SINGLE = 'single'
+    # A move slides a block by any number of cells through one direction
+    STRAIGHT = 'straight'
+    # A move slides a block by any number of cells turning corners through empty cells
+    FREE = 'free'
+
+
+class MoveCosts(Enum):
+    # Cost of a move is the number of cells it slides the block by
+    PER_CELL = 'cell'
+    # Every move costs one
+    PER_MOVE = 'move'
+
+
+def find_move_generator(initial_state: bytes, rows: int, columns: int, block_count: int,
+                        transition_mode: str = TransitionModes.SINGLE.value, move_cost: str = MoveCosts.PER_CELL.value):
+    """
+    Move generator match function
+    :param initial_state: Encoded initial state whose blocks are slided
+    :param rows: Row count of the board
+    :param columns: Column count of the board
+    :param block_count: Block count of the puzzle
+    :param transition_mode: Value of the transition mode which can be reached from TransitionModes enumeration
+    :param move_cost: Value of the move cost model which can be reached from MoveCosts enumeration
+    :return: Move generator of the given parameters; otherwise, exception is raised
+    """
+    if move_cost not in {cost.value for cost in MoveCosts}:
+        raise ValueError("Unknown move cost model {0}".format(move_cost))
+    move_generator = MoveGenerator(initial_state, rows, columns, block_count)
+    if transition_mode == TransitionModes.SINGLE.value:
+        return move_generator
+    elif transition_mode == TransitionModes.STRAIGHT.value:
+        return MacroMoveGenerator(move_generator, False, move_cost)
+    elif transition_mode == TransitionModes.FREE.value:
+        return MacroMoveGenerator(move_generator, True, move_cost)
+    else:
+        raise ValueError("Unknown transition mode {0}".format(transition_mode))
+
+
+class MoveGenerator(object):
+    """
+    Successor generator of encoded states which avoids rescanning the board for each block and direction
+
+    Blocks never change their shapes while sliding, so the footprint of each block is computed once from the initial
+    state as offsets relative to its most UPPER-LEFT cell, i.e. its anchor. For each direction, the cells which the
+    block will enter (leading edge) and leave (trailing edge) are precomputed together with the anchor positions from
+    which the slide stays on the board. Then, a slide only needs the anchor of the block and the emptiness check of
+    its leading edge cells.
+    """
+
+    def __init__(self, initial_state: bytes, rows: int, columns: int, block_count: int):
+        self.rows = rows
+        self.columns = columns
+        # Block to list of (direction, movable anchors, entered cell offsets, left cell offsets) mapping
+        self.block_slides = {}
+        for block in range(1, block_count + 1):
+            anchor = initial_state.find(block)
+            # Blocks which do not exist on the board cannot be slided
+            if anchor < 0:
+                continue
+            anchor_row, anchor_column = divmod(anchor, columns)
+            footprint = {(index // columns - anchor_row, index % columns - anchor_column)
+                         for index, cell_block in enumerate(initial_state) if cell_block == block}
+            slides = [(direction,) + self._compute_slide(footprint, row_step, column_step)
+                      for direction, (row_step, column_step) in DIRECTION_STEPS.items()]
+            self.block_slides[block] = slides
+
+    def _compute_slide(self, footprint: set, row_step: int, column_step: int) -> Tuple[bytearray, tuple, tuple]:
+        """
+        Precompute the slide of a block footprint through the given row and column steps
+        :param footprint: Cell offsets of the block relative to its anchor
+        :param row_step: Row offset of the slide
+        :param column_step: Column offset of the slide
+        :return: Flags of anchor positions from which the slide stays on the board, flat offsets of cells entered by the
+        block and flat offsets of cells left empty by the block
+        """
+        moved_footprint = {(row + row_step, column + column_step) for row, column in footprint}
+        entered_cells = tuple(row * self.columns + column for row, column in moved_footprint - footprint)
+        left_cells = tuple(row * self.columns + column for row, column in footprint - moved_footprint)
+
+        # The slide stays on the board if the extreme cells of the moved footprint do
+        rows = [row for row, _ in moved_footprint]
+        columns = [column for _, column in moved_footprint]
+        movable_columns = range(max(0, -min(columns)), min(self.columns, self.columns - max(columns)))
+        movable_anchors = bytearray(self.rows * self.columns)
+        for anchor_row in range(max(0, -min(rows)), min(self.rows, self.rows - max(rows))):
+            for anchor_column in movable_columns:
+                movable_anchors[anchor_row * self.columns + anchor_column] = 1
+        return movable_anchors, entered_cells, left_cells
+
+    def successors(self, state: bytes) -> Iterator[Tuple[bytes, Move]]:
+        """
+        Lazily generate successors of the given state
+        :param state: Encoded board state
+        :return: Iterator of successor states together with the move producing them
+        """
+        for block, slides in self.block_slides.items():
+            anchor = state.find(block)
+            for direction, movable_anchors, entered_cells, left_cells in slides:
+                # No space left in the slide direction
+                if not movable_anchors[anchor]:
+                    continue
+                # Only the cells entered by the block should be checked for emptiness
+                if any(state[anchor + cell] != common.EMPTY_CELL_BLOCK for cell in entered_cells):
+                    continue
+                yield MoveGenerator._slide(state, block, anchor, entered_cells, left_cells), Move(block, direction)
+
+    def weighted_successors(self, state: bytes) -> Iterator[Tuple[bytes, Move, int]]:
+        """
+        Lazily generate successors of the given state together with their move costs, which are always one
+        """
+        for child_state, move in self.successors(state):
+            yield child_state, move, 1
+
+    def apply_move(self, state: bytes, move: Move) -> Optional[bytes]:
+        """
+        Apply the given move onto the given state
+        :param state: Encoded board state
+        :param move: Move to apply
+        :return: Encoded state after the move if it is possible; otherwise, None
+        """
+        if move.block not in self.block_slides:
+            return None
+        anchor = state.find(move.block)
+        _, movable_anchors, entered_cells, left_cells = self.block_slides[move.block][move.direction.value]
+        if not movable_anchors[anchor]:
+            return None
+        if any(state[anchor + cell] != common.EMPTY_CELL_BLOCK for cell in entered_cells):
+            return None
+        return MoveGenerator._slide(state, move.block, anchor, entered_cells, left_cells)
+
+    @staticmethod
+    def _slide(state: bytes, block: int, anchor: int, entered_cells: tuple, left_cells: tuple) -> bytes:
+        updated_state = bytearray(state)
+        for cell in left_cells:
+            updated_state[anchor + cell] = common.EMPTY_CELL_BLOCK
+        for cell in entered_cells:
+            updated_state[anchor + cell] = block
+        return bytes(updated_state)
+
+
+class MacroMoveGenerator(object):
+    """
+    Successor generator whose moves slide a block by many cells at once
+
+    Each move of a block is a sequence of single cell slides of that block while the other blocks stay where they are,
+    so the precomputed slides of a MoveGenerator are chained. Straight moves continue through one direction until the
+    block is blocked, while free moves search all cells the block can reach through empty cells in breadth first order.
+    Every distinct position of the block is one successor whose cells are counted by the shortest slide sequence.
+    """
+
+    def __init__(self, move_generator: MoveGenerator, turns_corners: bool, move_cost: str = MoveCosts.PER_CELL.value):
+        self.move_generator = move_generator
+        self.rows = move_generator.rows
+        self.columns = move_generator.columns
+        self.block_slides = move_generator.block_slides
+        self.turns_corners = turns_corners
+        self.costs_per_cell = move_cost == MoveCosts.PER_CELL.value
+        # Flat offset of the anchor for each direction
+        self.anchor_steps = {direction: row_step * self.columns + column_step
+                             for direction, (row_step, column_step) in DIRECTION_STEPS.items()}
+
+    def successors(self, state: bytes) -> Iterator[Tuple[bytes, MacroMove]]:
+        """
+        Lazily generate successors of the given state
+        :param state: Encoded board state
+        :return: Iterator of successor states together with the move producing them
+        """
+        for child_state, move, _ in self.weighted_successors(state):
+            yield child_state, move
+
+    def weighted_successors(self, state: bytes) -> Iterator[Tuple[bytes, MacroMove, int]]:
+        """
+        Lazily generate successors of the given state together with their move costs
+        :param state: Encoded board state
+        :return: Iterator of successor states together with the move producing them and its cost
+        """
+        for block, slides in self.block_slides.items():
+            anchor = state.find(block)
+            if self.turns_corners:
+                reached_anchors = {anchor}
+                slide_queue = deque([(state, anchor, ())])
+                while slide_queue:
+                    slided_state, slided_anchor, directions = slide_queue.popleft()
+                    for child_state, child_anchor, direction in self._slide_once(slided_state, block, slided_anchor,
+                                                                                  slides):
+                        if child_anchor in reached_anchors:
+                            continue
+                        reached_anchors.add(child_anchor)
+                        child_directions = directions + (direction,)
+                        slide_queue.append((child_state, child_anchor, child_directions))
+                        yield child_state, MacroMove(block, child_directions), self._find_cost(child_directions)
             else:
-                self.assertIsNone(output_state)
-
-    def test_obstacled_up_transitions(self):
-        input_state = [x[:] for x in self.state]
-        input_state[3][1] = self.TARGET_BLOCK_ID
-        input_state[2][1] = self.TARGET_BLOCK_ID
-        input_state[1][1] = self.OBSTACLE_BLOCK_ID
-
-        # Get output state
-        output_state = slide_block_up(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
-        self.assertIsNone(output_state)
-
-    def test_obstacled_down_transitions(self):
-        input_state = [x[:] for x in self.state]
-        input_state[1][1] = self.TARGET_BLOCK_ID
-        input_state[2][1] = self.TARGET_BLOCK_ID
-        input_state[3][1] = self.OBSTACLE_BLOCK_ID
-
-        # Get output state
-        output_state = slide_block_down(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
-        self.assertIsNone(output_state)
-
-    def test_obstacled_left_transitions(self):
-        input_state = [x[:] for x in self.state]
-        input_state[1][2] = self.TARGET_BLOCK_ID
-        input_state[1][1] = self.TARGET_BLOCK_ID
-        input_state[1][0] = self.OBSTACLE_BLOCK_ID
-
-        # Get output state
-        output_state = slide_block_left(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
-        self.assertIsNone(output_state)
-
-    def test_obstacled_right_transitions(self):
-        input_state = [x[:] for x in self.state]
-        input_state[1][0] = self.TARGET_BLOCK_ID
-        input_state[1][1] = self.TARGET_BLOCK_ID
-        input_state[1][2] = self.OBSTACLE_BLOCK_ID
-
-        # Get output state
-        output_state = slide_block_right(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
-        self.assertIsNone(output_state)
-
-
-if __name__ == '__main__':
-    unittest.main()
+                for slide in slides:
+                    slided_state, slided_anchor, directions = state, anchor, ()
+                    while True:
+                        slided = next(self._slide_once(slided_state, block, slided_anchor, [slide]), None)
+                        if slided is None:
+                            break
+                        slided_state, slided_anchor, direction = slided
+                        directions += (direction,)
+                        yield slided_state, MacroMove(block, directions), self._find_cost(directions)
+
+    def _slide_once(self, state: bytes, block: int, anchor: int, slides: list) \
+            -> Iterator[Tuple[bytes, int, Directions]]:
+        """
+        Slide the given block by one cell through each of the given precomputed slides where it is possible
+        """
+        for direction, movable_anchors, entered_cells, left_cells in slides:
+            if not movable_anchors[anchor]:
+                continue
+            if any(state[anchor + cell] != common.EMPTY_CELL_BLOCK for cell in entered_cells):
+                continue
+            yield (MoveGenerator._slide(state, block, anchor, entered_cells, left_cells),
+                   anchor + self.anchor_steps[direction], direction)
+
+    def _find_cost(self, directions: tuple) -> int:
+        return len(directions) if self.costs_per_cell else 1
+
+    def apply_move(self, state: bytes, move: MacroMove) -> Optional[bytes]:
+        """
+        Apply the given move onto the given state
+        :param state: Encoded board state
+        :param move: Move to apply
+        :return: Encoded state after the move if it is possible; otherwise, None
+        """
+        for direction in move.directions:
+            state = self.move_generator.apply_move(state, Move(move.block, direction))
+            if state is None:
+                return None
+        return state
+
+
+def find_moves(move_generator: Union[MoveGenerator, MacroMoveGenerator], states: List[bytes]) -> List[Move]:
+    """
+    Find single cell moves which transform each of the given states into the next one where a slide by many cells is
+    split into its shortest sequence of single cell moves
+    :param move_generator: Move generator of the puzzle
+    :param states: Encoded states of a solution path
+    :return: Single cell moves of the path
+    """
+    if isinstance(move_generator, MacroMoveGenerator):
+        move_generator = move_generator.move_generator
+    free_move_generator = MacroMoveGenerator(move_generator, True)
+    moves = []
+    for state, next_state in zip(states, states[1:]):
+        macro_move = next((move for child_state, move in free_move_generator.successors(state)
+                           if child_state == next_state), None)
+        if macro_move is None:
+            raise ValueError("States are not connected by a slide of a single block.")
+        moves.extend(Move(macro_move.block, direction) for direction in macro_move.directions)
+    return moves
@@ -0,0 +1,127 @@
+import operator
+from typing import List, Optional
+
+import src as common
+
+"""
+Canonical state keys which merge symmetric states into one representative
+
+Two kinds of symmetries are detected from the initial state and the final states:
+
+1) Interchangeable blocks: Blocks having the same shape can be swapped if swapping them in any
+   final state gives another final state. Such blocks are relabeled in the order of their most
+   UPPER-LEFT cells, so states differing only by the labels of those blocks get the same key.
+2) Board reflections: A horizontal, vertical or point reflection of the board is folded if every
+   block keeps its shape under it and the reflection of any final state is another final state,
+   up to interchangeable blocks. The key is the smallest relabeled reflection.
+
+Under these conditions, symmetric states have the same distance to the final states, so a search
+can keep one representative per key. Moves commute with symmetries, so a concrete path is rebuilt
+by following keys of the representative path from the initial state.
+"""
+
+
+class StateCanonicalizer(object):
+
+    def __init__(self, initial_state: bytes, rows: int, columns: int, final_states: List[bytes]):
+        self.rows = rows
+        self.columns = columns
+        final_state_set = set(final_states)
+        footprints = {block: StateCanonicalizer._find_footprint(initial_state, block, columns)
+                      for block in set(initial_state) if block != common.EMPTY_CELL_BLOCK}
+
+        # Interchangeable block groups are kept as sorted block lists
+        shape_groups = {}
+        for block in sorted(footprints):
+            shape_groups.setdefault(footprints[block], []).append(block)
+        self.block_groups = [blocks for blocks in shape_groups.values()
+                             if len(blocks) > 1 and StateCanonicalizer._is_closed_under_swaps(blocks, final_state_set)]
+
+        # Cell permutations of the folded reflections
+        canonical_final_states = {self.relabel(final_state) for final_state in final_states}
+        self.reflections = []
+        for row_reflected, column_reflected in [(False, True), (True, False), (True, True)]:
+            permutation = [(rows - 1 - row if row_reflected else row) * columns +
+                           (columns - 1 - column if column_reflected else column)
+                           for row in range(rows) for column in range(columns)]
+            reflect = operator.itemgetter(*permutation)
+            if all(StateCanonicalizer._reflect_footprint(footprint, row_reflected, column_reflected) == footprint
+                   for footprint in footprints.values()) and \
+                    all(self.relabel(bytes(reflect(final_state))) in canonical_final_states
+                        for final_state in final_states):
+                self.reflections.append(reflect)
+
+    @property
+    def is_trivial(self) -> bool:
+        """
+        Whether no symmetry is found so that keys are the states themselves
+        """
+        return not self.block_groups and not self.reflections
+
+    def relabel(self, state: bytes) -> bytes:
+        """
+        Relabel interchangeable blocks of the given state in the order of their most UPPER-LEFT cells
+        """
+        if not self.block_groups:
+            return state
+        translation = bytearray(range(256))
+        for blocks in self.block_groups:
+            for block, label in zip(sorted(blocks, key=state.find), blocks):
+                translation[block] = label
+        return state.translate(translation)
+
+    def canonicalize(self, state: bytes) -> bytes:
+        """
+        Find the key of the given state which is the same for all of its symmetric states
+        :param state: Encoded board state
+        :return: Smallest relabeled reflection of the state
+        """
+        key = self.relabel(state)
+        for reflect in self.reflections:
+            reflected_key = self.relabel(bytes(reflect(state)))
+            if reflected_key < key:
+                key = reflected_key
+        return key
+
+    def find_symmetric_successor(self, successors, key: bytes) -> Optional[bytes]:
+        """
+        Find the successor whose key is the given key
+        :param successors: Iterator of (successor state, move) pairs
+        :param key: Key of the next state of a representative path
+        :return: Concrete successor state if there is any
+        """
+        for child_state, _ in successors:
+            if self.canonicalize(child_state) == key:
+                return child_state
+        return None
+
+    @staticmethod
+    def _find_footprint(state: bytes, block: int, columns: int) -> frozenset:
+        """
+        Cell offsets of the given block relative to its most UPPER-LEFT cell
+        """
+        anchor_row, anchor_column = divmod(state.find(block), columns)
+        return frozenset((index // columns - anchor_row, index % columns - anchor_column)
+                         for index, cell_block in enumerate(state) if cell_block == block)
+
+    @staticmethod
+    def _reflect_footprint(footprint: frozenset, row_reflected: bool, column_reflected: bool) -> frozenset:
+        """
+        Reflect the given footprint and move it back so that its most UPPER-LEFT cell is the origin again
+        """
+        cells = [(-row if row_reflected else row, -column if column_reflected else column) for row, column in footprint]
+        anchor_row, anchor_column = min(cells)
+        return frozenset((row - anchor_row, column - anchor_column) for row, column in cells)
+
+    @staticmethod
+    def _is_closed_under_swaps(blocks: List[int], final_state_set: set) -> bool:
+        """
+        Whether swapping any two of the given blocks in any final state gives another final state where swaps of
+        consecutive blocks are enough since they generate all permutations
+        """
+        for first_block, second_block in zip(blocks, blocks[1:]):
+            translation = bytearray(range(256))
+            translation[first_block], translation[second_block] = second_block, first_block
+            if any(final_state.translate(translation) not in final_state_set for final_state in final_state_set):
+                return False
+        return True
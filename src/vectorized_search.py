@@ -0,0 +1,394 @@
+import time
+from typing import List, Optional, Tuple
+
+import src as common
+import src.heuristic_functions as hf
+import src.state_transitions as st
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""
+Batched search engine which processes whole layers of states with NumPy
+
+A layer of states is kept as a 2-D uint8 array whose rows are encoded states. Successors of
+all states are generated block by block and direction by direction with vectorized gathers:
+anchors of a block are found for every row at once, rows whose slide stays on the board and
+whose entered cells are empty are selected, and the slide is applied to all selected rows
+together. Heuristic values of a whole batch are computed against all final states in one pass
+from precomputed distance tables which have the same definition as the incremental heuristics.
+
+Duplicate detection works on rows packed into a few 64-bit integers, so a single sort finds
+both duplicates within a batch and states which were already seen. Since every move costs one and
+can be reverted, neighbours of a breadth first layer can only be in the previous, the same or
+the next layer, which is why only the last two layers are needed for duplicate detection.
+
+NumPy is an optional dependency, it is only needed when this engine is used.
+"""
+
+# Maximum number of distance values kept in memory while scoring a batch against all final states
+MAXIMUM_SCORE_CHUNK_SIZE = 1 << 22
+DEFAULT_BEAM_WIDTH = 1024
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Vectorized search requires NumPy which can be installed with 'pip install numpy'")
+
+
+class BatchedMoveGenerator(object):
+    """
+    Successor generator of 2-D state arrays which uses the precomputed slides of a MoveGenerator
+    """
+
+    def __init__(self, move_generator: st.MoveGenerator):
+        _require_numpy()
+        self.columns = move_generator.columns
+        self.cell_count = move_generator.rows * move_generator.columns
+        # List of (block, direction, movable anchors, entered cell offsets, left cell offsets)
+        self.slides = [(block, direction, np.frombuffer(bytes(movable_anchors), dtype=np.uint8).astype(bool),
+                        np.array(entered_cells, dtype=np.intp), np.array(left_cells, dtype=np.intp))
+                       for block, slides in move_generator.block_slides.items()
+                       for direction, movable_anchors, entered_cells, left_cells in slides]
+        self.blocks = list(move_generator.block_slides)
+
+    def find_anchors(self, states) -> dict:
+        """
+        Find the most UPPER-LEFT cell of each block in each state
+        :param states: 2-D uint8 array of encoded states
+        :return: Block to anchor array mapping
+        """
+        return {block: np.argmax(states == block, axis=1) for block in self.blocks}
+
+    def expand(self, states, anchors: dict = None):
+        """
+        Generate successors of all the given states
+        :param states: 2-D uint8 array of encoded states
+        :param anchors: Anchors of the states which are found if they are not given
+        :return: 2-D array of successor states, row indices of their parents and their moves as block << 2 | direction
+        """
+        if anchors is None:
+            anchors = self.find_anchors(states)
+        children, parent_indices, moves = [], [], []
+        for block, direction, movable_anchors, entered_cells, left_cells in self.slides:
+            block_anchors = anchors[block]
+            candidates = np.flatnonzero(movable_anchors[block_anchors])
+            if candidates.size == 0:
+                continue
+            candidate_anchors = block_anchors[candidates][:, None]
+            entered_indices = candidate_anchors + entered_cells
+            # Only the cells entered by the block should be checked for emptiness
+            empty = (states[candidates[:, None], entered_indices] == common.EMPTY_CELL_BLOCK).all(axis=1)
+            candidates, candidate_anchors, entered_indices = (candidates[empty], candidate_anchors[empty],
+                                                              entered_indices[empty])
+            if candidates.size == 0:
+                continue
+            slided_states = states[candidates]
+            rows = np.arange(candidates.size)[:, None]
+            slided_states[rows, candidate_anchors + left_cells] = common.EMPTY_CELL_BLOCK
+            slided_states[rows, entered_indices] = block
+            children.append(slided_states)
+            parent_indices.append(candidates)
+            moves.append(np.full(candidates.size, block << 2 | direction.value, dtype=np.uint16))
+        if not children:
+            return (np.empty((0, self.cell_count), dtype=np.uint8), np.empty(0, dtype=np.intp),
+                    np.empty(0, dtype=np.uint16))
+        return np.concatenate(children), np.concatenate(parent_indices), np.concatenate(moves)
+
+
+class BatchedHeuristic(object):
+    """
+    Heuristic evaluator of 2-D state arrays against all final states which uses the same block distances as
+    IncrementalHeuristic, the value of a state is the minimum of its values against each final state
+    """
+
+    def __init__(self, heuristic_function: int, rows: int, columns: int, final_states: List[bytes]):
+        _require_numpy()
+        incremental_heuristic = hf.IncrementalHeuristic(heuristic_function, rows, columns, final_states)
+        self.final_state_count = len(final_states)
+        # Block to (cell count, final state count) distance table mapping
+        self.block_distances = {block: np.array(distances, dtype=np.float64)
+                                for block, distances in incremental_heuristic.block_distances.items()}
+
+    def score(self, states, anchors: dict):
+        """
+        Compute heuristic values of all the given states
+        :param states: 2-D uint8 array of encoded states
+        :param anchors: Block to anchor array mapping of the states
+        :return: Array of heuristic values
+        """
+        values = np.empty(len(states), dtype=np.float64)
+        chunk_size = max(1, MAXIMUM_SCORE_CHUNK_SIZE // max(1, self.final_state_count))
+        for start in range(0, len(states), chunk_size):
+            end = min(start + chunk_size, len(states))
+            components = np.zeros((end - start, self.final_state_count), dtype=np.float64)
+            for block, distances in self.block_distances.items():
+                # Blocks which do not exist on the board add nothing
+                if block in anchors:
+                    components += distances[anchors[block][start:end]]
+            values[start:end] = components.min(axis=1)
+        return values
+
+
+class StateKeyPacker(object):
+    """
+    Packer of 2-D state arrays into unsigned 64-bit keys which are sorted and compared instead of byte strings
+
+    Blocks never change their shapes while sliding, so a state is determined by the anchors of its blocks and its key
+    is a single integer whose digits are the anchors if they fit into 64 bits. Then, the key of a child is the key of
+    its parent plus a constant of the move, and anchors are decoded back from keys without scanning boards. Otherwise,
+    cells themselves are packed into as many words as needed.
+    """
+
+    def __init__(self, move_generator: BatchedMoveGenerator, initial_state: bytes):
+        self.move_generator = move_generator
+        self.cell_count = len(initial_state)
+        self.packs_anchors = self.cell_count ** len(move_generator.blocks) <= 1 << 64
+        # Enough bits to keep any cell since blocks are only moved
+        self.cell_bits = max(1, max(initial_state).bit_length())
+        # Key difference of each move code where negative differences wrap around as unsigned integers
+        self.move_key_deltas = np.zeros((max(move_generator.blocks, default=0) << 2) + 4, dtype=np.int64)
+        for block_index, block in enumerate(move_generator.blocks):
+            weight = self.cell_count ** (len(move_generator.blocks) - 1 - block_index) if self.packs_anchors else 0
+            for direction, (row_step, column_step) in st.DIRECTION_STEPS.items():
+                self.move_key_deltas[block << 2 | direction.value] = \
+                    (row_step * move_generator.columns + column_step) * weight
+        self.move_key_deltas = self.move_key_deltas.view(np.uint64)
+
+    def pack(self, states, anchors: dict = None):
+        """
+        Pack the given states into keys
+        :param states: 2-D uint8 array of encoded states
+        :param anchors: Anchors of the states which are found if they are not given and needed
+        :return: 2-D array of keys whose rows are the packed words of the states
+        """
+        if self.packs_anchors:
+            if anchors is None:
+                anchors = self.move_generator.find_anchors(states)
+            keys = np.zeros(len(states), dtype=np.uint64)
+            for block in self.move_generator.blocks:
+                keys = keys * np.uint64(self.cell_count) + anchors[block].astype(np.uint64)
+            return keys[:, None]
+
+        cells_per_word = 64 // self.cell_bits
+        words = []
+        for start in range(0, states.shape[1], cells_per_word):
+            cells = states[:, start:start + cells_per_word].astype(np.uint64)
+            shifts = np.arange(cells.shape[1], dtype=np.uint64) * np.uint64(self.cell_bits)
+            # Cells occupy disjoint bits so their sum is the same as their bitwise or
+            words.append((cells << shifts).sum(axis=1, dtype=np.uint64))
+        return np.stack(words, axis=1)
+
+    def pack_children(self, children, keys, parent_indices, moves):
+        """
+        Pack successors which are generated from the states of the given keys
+        :param children: 2-D uint8 array of successor states
+        :param keys: Keys of the parent states
+        :param parent_indices: Row indices of the parents of the successors
+        :param moves: Move codes of the successors
+        :return: 2-D array of keys of the successors
+        """
+        if self.packs_anchors:
+            return (keys[parent_indices, 0] + self.move_key_deltas[moves])[:, None]
+        return self.pack(children)
+
+    def find_anchors(self, states, keys) -> dict:
+        """
+        Find the anchors of the given states from their keys if keys keep anchors
+        :return: Block to anchor array mapping
+        """
+        if not self.packs_anchors:
+            return self.move_generator.find_anchors(states)
+        anchors = {}
+        keys = keys[:, 0]
+        for block in reversed(self.move_generator.blocks):
+            keys, block_anchors = np.divmod(keys, np.uint64(self.cell_count))
+            anchors[block] = block_anchors.astype(np.intp)
+        return anchors
+
+
+def _find_group_leaders(keys):
+    """
+    Stably sort the given keys and find the first original index of each group of equal keys
+    :return: Sorting order and the original index of the group leader of each sorted key
+    """
+    if keys.shape[1] == 1:
+        order = np.argsort(keys[:, 0], kind='stable')
+    else:
+        # Last key is the primary one for lexsort which is stable as well
+        order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+    group_starts = np.ones(len(keys), dtype=bool)
+    group_starts[1:] = (sorted_keys[1:] != sorted_keys[:-1]).any(axis=1)
+    return order, order[group_starts][np.cumsum(group_starts) - 1]
+
+
+def _find_known(known_keys, candidate_keys):
+    """
+    Find which candidate keys are among the known keys
+    :return: Boolean mask of the candidate keys
+    """
+    known_count = len(known_keys)
+    known = np.zeros(len(candidate_keys), dtype=bool)
+    if known_count == 0 or len(candidate_keys) == 0:
+        return known
+    order, leaders = _find_group_leaders(np.concatenate([known_keys, candidate_keys]))
+    # Known keys come first, so a candidate is known if the leader of its group is a known key
+    is_candidate = order >= known_count
+    known[order[is_candidate] - known_count] = leaders[is_candidate] < known_count
+    return known
+
+
+def _find_new(known_keys, candidate_keys):
+    """
+    Find indices of candidate keys which are not among the known keys where only the first of duplicate candidates is
+    kept
+    """
+    known_count = len(known_keys)
+    if len(candidate_keys) == 0:
+        return np.empty(0, dtype=np.intp)
+    order, leaders = _find_group_leaders(np.concatenate([known_keys, candidate_keys]))
+    new_indices = order[(order >= known_count) & (leaders == order)] - known_count
+    new_indices.sort()
+    return new_indices
+
+
+class _LayerLimits(object):
+    """
+    Node budget and time limit of a layered search where a whole layer is counted at once
+    """
+
+    def __init__(self, node_budget: Optional[int], time_limit: Optional[float]):
+        self.node_budget = node_budget
+        self.deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.expansion_count = 0
+
+    def expand(self, layer_size: int):
+        # Import here since the puzzle module imports this module lazily
+        from src.sliding_block_puzzle import SearchLimitExceeded
+
+        self.expansion_count += layer_size
+        if self.node_budget is not None and self.expansion_count > self.node_budget:
+            raise SearchLimitExceeded("Node budget of {0} expansions is exceeded".format(self.node_budget))
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SearchLimitExceeded("Time limit is exceeded after {0} expansions".format(self.expansion_count))
+
+
+def _find_final_index(states, keys, final_keys, final_state_set: frozenset) -> Optional[int]:
+    """
+    Find the row index of a final state among the given states where key matches are confirmed on boards since keys of
+    anchors cannot tell final states whose blocks have different shapes
+    """
+    for index in np.flatnonzero(_find_known(final_keys, keys)):
+        if states[index].tobytes() in final_state_set:
+            return index
+    return None
+
+
+def _trace_layers(layers: list, parent_indices: list, layer_index: int, row_index: int) -> List[bytes]:
+    """
+    Follow parent row indices from the given row back to the first layer
+    :return: Encoded states starting from the initial state
+    """
+    solution_states = []
+    while layer_index >= 0:
+        solution_states.append(layers[layer_index][row_index].tobytes())
+        row_index = parent_indices[layer_index][row_index]
+        layer_index -= 1
+    solution_states.reverse()
+    return solution_states
+
+
+def solve_breadth_first(puzzle, node_budget: int = None, time_limit: float = None) -> Tuple[bool, Optional[list]]:
+    """
+    Solve the given puzzle with layered Breadth First Search whose layers are expanded as batches, the solution is
+    optimal since every move costs one
+    :param puzzle: Puzzle to solve
+    :param node_budget: Maximum number of node expansions where None means no limit
+    :param time_limit: Maximum duration of the search in seconds where None means no limit
+    :return: Whether a solution exists and the solution states starting from the initial state
+    """
+    move_generator = BatchedMoveGenerator(puzzle.move_generator)
+    limits = _LayerLimits(node_budget, time_limit)
+    key_packer = StateKeyPacker(move_generator, puzzle.encoded_initial_state)
+    final_keys = key_packer.pack(np.array([list(state) for state in puzzle.encoded_final_state_set], dtype=np.uint8))
+
+    layer = np.frombuffer(puzzle.encoded_initial_state, dtype=np.uint8)[None, :].copy()
+    layers, parent_indices = [layer], [np.array([-1], dtype=np.intp)]
+    layer_keys = key_packer.pack(layer)
+    previous_keys = layer_keys[:0]
+    while layer.size:
+        final_index = _find_final_index(layer, layer_keys, final_keys, puzzle.encoded_final_state_set)
+        if final_index is not None:
+            return True, _trace_layers(layers, parent_indices, len(layers) - 1, final_index)
+
+        limits.expand(len(layer))
+        children, parents, moves = move_generator.expand(layer, key_packer.find_anchors(layer, layer_keys))
+        children_keys = key_packer.pack_children(children, layer_keys, parents, moves)
+        new_indices = _find_new(np.concatenate([previous_keys, layer_keys]), children_keys)
+        previous_keys = layer_keys
+        layer_keys = children_keys[new_indices]
+        layer = children[new_indices]
+        layers.append(layer)
+        parent_indices.append(parents[new_indices])
+
+    # If this point is reached, then there is no solution
+    return False, None
+
+
+def solve_beam(puzzle, beam_width: int = DEFAULT_BEAM_WIDTH, node_budget: int = None,
+               time_limit: float = None) -> Tuple[bool, Optional[list]]:
+    """
+    Solve the given puzzle with Beam Search which keeps the given number of states with the lowest heuristic values in
+    each layer, the solution is not necessarily optimal and a solution may be missed
+    :param puzzle: Puzzle to solve
+    :param beam_width: Maximum number of states kept in each layer
+    :param node_budget: Maximum number of node expansions where None means no limit
+    :param time_limit: Maximum duration of the search in seconds where None means no limit
+    :return: Whether a solution is found and the solution states starting from the initial state
+    """
+    if beam_width <= 0:
+        raise ValueError("Beam width should be positive.")
+    move_generator = BatchedMoveGenerator(puzzle.move_generator)
+    heuristic_function = puzzle.heuristic_function
+    if heuristic_function == hf.Heuristics.PATTERN_DATABASE.value:
+        # Pattern databases look up single states, so beams are scored by the Manhattan distance they are based on
+        heuristic_function = hf.Heuristics.MANHATTAN_DISTANCE.value
+    heuristic = BatchedHeuristic(heuristic_function, puzzle.row_count, puzzle.column_count,
+                                 puzzle.reachable_final_states)
+    limits = _LayerLimits(node_budget, time_limit)
+    key_packer = StateKeyPacker(move_generator, puzzle.encoded_initial_state)
+    final_keys = key_packer.pack(np.array([list(state) for state in puzzle.encoded_final_state_set], dtype=np.uint8))
+
+    if puzzle.encoded_initial_state in puzzle.encoded_final_state_set:
+        return True, [puzzle.encoded_initial_state]
+    layer = np.frombuffer(puzzle.encoded_initial_state, dtype=np.uint8)[None, :].copy()
+    layers, parent_indices = [layer], [np.array([-1], dtype=np.intp)]
+    # Every state kept so far, beams are narrow so that keeping all of them prevents cycles cheaply
+    layer_keys = seen_keys = key_packer.pack(layer)
+    while layer.size:
+        limits.expand(len(layer))
+        children, parents, moves = move_generator.expand(layer, key_packer.find_anchors(layer, layer_keys))
+        children_keys = key_packer.pack_children(children, layer_keys, parents, moves)
+        new_indices = _find_new(seen_keys, children_keys)
+        children, parents, children_keys = children[new_indices], parents[new_indices], children_keys[new_indices]
+
+        final_index = _find_final_index(children, children_keys, final_keys, puzzle.encoded_final_state_set)
+        if final_index is not None:
+            layers.append(children)
+            parent_indices.append(parents)
+            return True, _trace_layers(layers, parent_indices, len(layers) - 1, final_index)
+
+        if len(children) > beam_width:
+            values = heuristic.score(children, key_packer.find_anchors(children, children_keys))
+            kept_indices = np.sort(np.argsort(values, kind='stable')[:beam_width])
+            children, parents, children_keys = children[kept_indices], parents[kept_indices], children_keys[kept_indices]
+        layer, layer_keys = children, children_keys
+        layers.append(layer)
+        parent_indices.append(parents)
+        seen_keys = np.concatenate([seen_keys, children_keys])
+
+    # If this point is reached, then the beam is exhausted without a solution
+    return False, None
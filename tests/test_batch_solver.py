@@ -0,0 +1,38 @@
+import os
+import unittest
+
+from src.batch_solver import (
+    ERROR_STATUS, LIMIT_EXCEEDED_STATUS, SOLVED_STATUS, UNSOLVABLE_STATUS, collect_puzzle_files, solve_batch)
+
+
+class BatchSolverUnittest(unittest.TestCase):
+    SAMPLE_INPUTS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                           'sample_inputs')
+
+    def test_collect_puzzle_files(self):
+        directory = os.path.join(self.SAMPLE_INPUTS_DIRECTORY, 'plain_formatted_inputs')
+        puzzle_files = collect_puzzle_files(directory=directory)
+        self.assertEqual(3, len(puzzle_files))
+        self.assertListEqual(puzzle_files, collect_puzzle_files(pattern=os.path.join(directory, '*.inp')))
+        self.assertEqual(7, len(collect_puzzle_files(pattern=os.path.join(self.SAMPLE_INPUTS_DIRECTORY, '**',
+                                                                          '*.inp'))))
+
+    def test_solve_batch(self):
+        puzzle_files = [os.path.join(self.SAMPLE_INPUTS_DIRECTORY, 'dict_formatted_inputs', file_name)
+                        for file_name in ['input1.inp', 'input2.inp', 'input3.inp', 'input4.inp']]
+        puzzle_files.append(os.path.join(self.SAMPLE_INPUTS_DIRECTORY, 'plain_formatted_inputs', 'input2.inp'))
+        puzzle_files.append(os.path.join(self.SAMPLE_INPUTS_DIRECTORY, 'missing.inp'))
+
+        results = {result['file']: result for result in solve_batch(puzzle_files, workers=2, node_budget=2000)}
+
+        self.assertEqual(len(puzzle_files), len(results))
+        self.assertEqual(LIMIT_EXCEEDED_STATUS, results[puzzle_files[0]]['status'])
+        self.assertEqual((SOLVED_STATUS, 7), (results[puzzle_files[1]]['status'], results[puzzle_files[1]]['moves']))
+        self.assertEqual(SOLVED_STATUS, results[puzzle_files[2]]['status'])
+        self.assertEqual(UNSOLVABLE_STATUS, results[puzzle_files[3]]['status'])
+        self.assertEqual((SOLVED_STATUS, 7), (results[puzzle_files[4]]['status'], results[puzzle_files[4]]['moves']))
+        self.assertEqual(ERROR_STATUS, results[puzzle_files[5]]['status'])
+
+
+if __name__ == '__main__':
+    unittest.main()
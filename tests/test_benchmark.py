@@ -0,0 +1,46 @@
+import unittest
+
+from src.benchmark import SOLVED_STATUS, find_regressions, run_benchmark, run_startup_benchmark, summarize
+from src.sliding_block_puzzle import SearchStrategies
+
+
+class BenchmarkUnittest(unittest.TestCase):
+    family = {'name': 'tiny', 'rows': 3, 'columns': 3, 'block_count': 3, 'final_state_count': 2, 'walk_length': 8}
+
+    def test_run_benchmark(self):
+        results = list(run_benchmark([self.family], [SearchStrategies.A_STAR.value, SearchStrategies.IDA_STAR.value],
+                                     [0], instances=2, seed=5))
+        self.assertEqual(4, len(results))
+        for result in results:
+            self.assertEqual(SOLVED_STATUS, result['status'])
+            self.assertGreaterEqual(result['time'], 0)
+            self.assertEqual(result['strategy'] == SearchStrategies.A_STAR.value, result['expansions'] is not None)
+        # Both strategies are optimal
+        self.assertEqual(results[0]['path_length'], results[1]['path_length'])
+
+        summary = summarize(results)
+        self.assertSetEqual({'tiny/astar/0', 'tiny/idastar/0'}, set(summary))
+        self.assertEqual(2, summary['tiny/astar/0']['solved'])
+        self.assertListEqual([], find_regressions(summary, summary))
+
+    def test_find_regressions(self):
+        baseline = {'family/astar/0': {'cases': 2, 'solved': 2, 'time': 1.0, 'expansions_per_second': 1000.0,
+                                       'peak_memory': 1000, 'path_length': 10}}
+        summary = {'family/astar/0': dict(baseline['family/astar/0'], time=1.1, peak_memory=2000,
+                                          expansions_per_second=500.0, path_length=12),
+                   'family/idastar/0': dict(baseline['family/astar/0'], time=100.0)}
+        regressions = find_regressions(summary, baseline, tolerance=0.25)
+        self.assertListEqual(['path_length', 'expansions_per_second', 'peak_memory'],
+                             [regression['metric'] for regression in regressions])
+        self.assertEqual(2000, regressions[-1]['current'])
+
+    def test_run_startup_benchmark(self):
+        timings = run_startup_benchmark(self.family, instances=1, seed=5)
+        self.assertSetEqual({'interpreter', 'import', 'command_line', 'server', 'search'}, set(timings))
+        # Every command line solve starts an interpreter and imports the solver before searching
+        self.assertGreater(timings['command_line'], timings['interpreter'])
+        self.assertGreater(timings['command_line'], timings['search'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from src.external_search import DEFAULT_RUN_SIZE, _contains, _read_states, _subtract, _unique, _write_run
+from src.sliding_block_puzzle import Puzzle
+
+
+class ExternalSearchUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    def test_sorted_streams(self):
+        states = [bytes([value]) for value in [1, 1, 2, 4, 4, 5, 7]]
+        known_states = [bytes([value]) for value in [0, 2, 3, 4, 8]]
+        self.assertListEqual([bytes([1]), bytes([5]), bytes([7])],
+                             list(_subtract(_unique(iter(states)), iter(known_states))))
+        with tempfile.TemporaryDirectory() as directory:
+            path = _write_run(directory, 0, 0, set(known_states))
+            self.assertListEqual(known_states, list(_read_states(path, 1)))
+            with open(path, 'rb') as f:
+                for value in range(10):
+                    self.assertEqual(bytes([value]) in known_states, _contains(f, bytes([value]), 1))
+
+    def test_external_solution(self):
+        for heuristic in [0, 1]:
+            puzzle = Puzzle(heuristic, 4, 3, 3, self.initial_state, [self.final_state])
+            # Tiny runs force many runs to be merged for each layer
+            for run_size in [1, 7, DEFAULT_RUN_SIZE]:
+                with tempfile.TemporaryDirectory() as directory:
+                    solution_exists, solution_path = puzzle.solve_external(directory, run_size)
+                    # Layer files are removed after the search
+                    self.assertListEqual([], os.listdir(directory))
+                self.assertTrue(solution_exists)
+                self.assertEqual(8, len(solution_path))
+                self.assertListEqual(self.initial_state, solution_path[0].state)
+                self.assertListEqual(self.final_state, solution_path[-1].state)
+                self.assertEqual(7, solution_path[-1].g_value)
+
+    def test_external_unsolvable_puzzle(self):
+        # Block 1 can never pass the full width block 2
+        puzzle = Puzzle(0, 3, 3, 2, [[0, 0, 0], [2, 2, 2], [0, 1, 0]], [[[0, 1, 0], [2, 2, 2], [0, 0, 0]]])
+        self.assertTupleEqual((False, None), puzzle.solve_external(run_size=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+from typing import List
+import unittest
+
+from src.feasibility import FeasibilityChecker
+import src.file_parser as fp
+from src.sliding_block_puzzle import Puzzle
+import src.state_transitions as st
+
+
+class FeasibilityCheckerUnittest(unittest.TestCase):
+    @staticmethod
+    def _create_checker(initial_state: List[List[int]]) -> FeasibilityChecker:
+        encoded_initial_state = bytes(sum(initial_state, []))
+        move_generator = st.MoveGenerator(encoded_initial_state, len(initial_state), len(initial_state[0]),
+                                          max(encoded_initial_state))
+        return FeasibilityChecker(move_generator, encoded_initial_state)
+
+    def test_block_shapes(self):
+        checker = self._create_checker([[1, 1, 0], [0, 0, 0], [0, 2, 0]])
+        self.assertIsNone(checker.find_infeasibility(bytes([0, 0, 0, 0, 1, 1, 2, 0, 0])))
+        self.assertIsNotNone(checker.find_infeasibility(bytes([0, 1, 0, 0, 1, 0, 2, 0, 0])))
+        self.assertIsNotNone(checker.find_infeasibility(bytes([0, 0, 0, 0, 1, 1, 0, 0, 0])))
+
+    def test_frozen_blocks(self):
+        # Each bar of the pinwheel is blocked by the next one although the center is empty
+        checker = self._create_checker([[1, 1, 2],
+                                        [3, 0, 2],
+                                        [3, 4, 4]])
+        self.assertSetEqual({1, 2, 3, 4}, checker.frozen_blocks)
+        self.assertIsNone(checker.find_infeasibility(bytes([1, 1, 2, 3, 0, 2, 3, 4, 4])))
+        self.assertIsNotNone(checker.find_infeasibility(bytes([0, 1, 1, 3, 0, 2, 3, 4, 4])))
+        self.assertSetEqual(set(), self._create_checker([[1, 1, 2], [3, 0, 2], [3, 0, 4]]).frozen_blocks)
+
+    def test_block_reachability(self):
+        # Block 9 is locked inside the left one of two pinwheels
+        checker = self._create_checker([[1, 1, 1, 2, 5, 5, 5, 6],
+                                        [3, 0, 0, 2, 7, 0, 0, 6],
+                                        [3, 9, 0, 2, 7, 0, 0, 6],
+                                        [3, 4, 4, 4, 7, 8, 8, 8]])
+        self.assertSetEqual(set(range(1, 9)), checker.frozen_blocks)
+        self.assertSetEqual({9, 10, 17, 18}, checker.reachable_anchors[9])
+        final_state = bytearray(checker.initial_state)
+        final_state[17], final_state[18] = 0, 9
+        self.assertIsNone(checker.find_infeasibility(bytes(final_state)))
+        final_state[18], final_state[13] = 0, 9
+        self.assertIsNotNone(checker.find_infeasibility(bytes(final_state)))
+
+    def test_parity(self):
+        checker = self._create_checker([[1, 2, 3], [4, 5, 6], [7, 8, 0]])
+        self.assertTrue(checker.has_parity_invariant)
+        self.assertIsNone(checker.find_infeasibility(bytes([1, 2, 3, 4, 5, 6, 7, 0, 8])))
+        self.assertIsNone(checker.find_infeasibility(bytes([1, 2, 3, 4, 0, 6, 7, 5, 8])))
+        # Swapping two blocks is the famous unsolvable 15 puzzle configuration
+        self.assertIsNotNone(checker.find_infeasibility(bytes([2, 1, 3, 4, 5, 6, 7, 8, 0])))
+
+    def test_separators(self):
+        # Block 3 covers the middle column, so blocks 1 and 2 stay on its left and block 4 on its right
+        checker = self._create_checker([[1, 3, 0],
+                                        [2, 3, 0],
+                                        [0, 3, 4]])
+        self.assertListEqual([(3, False)], checker.separators)
+        self.assertIsNone(checker.find_infeasibility(bytes([0, 3, 4, 1, 3, 0, 2, 3, 0])))
+        self.assertIsNotNone(checker.find_infeasibility(bytes([1, 3, 4, 0, 3, 2, 0, 3, 0])))
+
+    def test_separated_sample_input_is_rejected(self):
+        # Block 1 of the sample should pass the bar which covers a whole row
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_inputs',
+                            'dict_formatted_inputs', 'input4.inp')
+        with open(path) as f:
+            puzzle = fp.PuzzleInputParser.parse_file(f)
+        self.assertIsNotNone(puzzle.feasibility_checker.find_infeasibility(puzzle.encoded_final_states[0]))
+        self.assertTupleEqual((False, None), puzzle.solve_ida_star())
+
+    def test_unsolvable_puzzle_fails_fast(self):
+        initial_state = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [13, 14, 15, 0]]
+        final_state = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [13, 15, 14, 0]]
+        puzzle = Puzzle(0, 4, 4, 15, initial_state, [final_state])
+        self.assertFalse(puzzle.encoded_final_state_set)
+        for solve in [puzzle.solve, puzzle.solve_ida_star, puzzle.solve_bidirectional, puzzle.solve_anytime]:
+            self.assertTupleEqual((False, None), solve(node_budget=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from src.file_parser import PuzzleArchiveReader, PuzzleArchiveWriter, PuzzleInputParser
+from src.sliding_block_puzzle import Puzzle
+import src.state_encoding as se
+import src.state_transitions as st
+
+
+class PuzzleInputParserUnittest(unittest.TestCase):
+    SAMPLE_INPUTS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                           'sample_inputs')
+
+    def _read_sample_input(self, format_directory: str, file_name: str) -> str:
+        with open(os.path.join(self.SAMPLE_INPUTS_DIRECTORY, format_directory, file_name)) as f:
+            return f.read()
+
+    def test_stream_plain_formatted_file(self):
+        contents = [self._read_sample_input('plain_formatted_inputs', file_name)
+                    for file_name in ['input1.inp', 'input2.inp', 'input3.inp']]
+        # Small chunks split lines and numbers between reads
+        PuzzleInputParser.READ_CHUNK_SIZE = 7
+        try:
+            puzzles = list(PuzzleInputParser.stream_file(io.StringIO('\n'.join(contents) * 2)))
+        finally:
+            PuzzleInputParser.READ_CHUNK_SIZE = 1 << 20
+
+        self.assertEqual(6, len(puzzles))
+        for puzzle, content in zip(puzzles, contents * 2):
+            expected_puzzle = PuzzleInputParser.parse_plain_formatted_file(io.StringIO(content))
+            self.assertListEqual(expected_puzzle.initial_state, puzzle.initial_state)
+            self.assertListEqual(expected_puzzle.final_states, puzzle.final_states)
+
+    def test_stream_json_lines_file(self):
+        contents = [self._read_sample_input('dict_formatted_inputs', file_name)
+                    for file_name in ['input2.inp', 'input3.inp']]
+        json_lines = ''.join(json.dumps(json.loads(content)) + '\n' for content in contents)
+        puzzles = list(PuzzleInputParser.stream_file(io.StringIO(json_lines)))
+
+        self.assertEqual(2, len(puzzles))
+        for puzzle, content in zip(puzzles, contents):
+            self.assertListEqual(json.loads(content)[PuzzleInputParser.INITIAL_STATE_LABEL], puzzle.initial_state)
+
+    def test_stream_dict_formatted_file(self):
+        # Dictionary like formatted files span many lines, so they are streamed as a single puzzle
+        for file_name in ['input1.inp', 'input3.inp']:
+            content = self._read_sample_input('dict_formatted_inputs', file_name)
+            for chunk_size in [7, 1 << 20]:
+                PuzzleInputParser.READ_CHUNK_SIZE = chunk_size
+                try:
+                    puzzles = list(PuzzleInputParser.stream_file(io.StringIO(content)))
+                finally:
+                    PuzzleInputParser.READ_CHUNK_SIZE = 1 << 20
+
+                self.assertEqual(1, len(puzzles))
+                self.assertListEqual(json.loads(content)[PuzzleInputParser.INITIAL_STATE_LABEL],
+                                     puzzles[0].initial_state)
+                self.assertListEqual(json.loads(content)[PuzzleInputParser.FINAL_STATES_LABEL],
+                                     puzzles[0].final_states)
+
+    def test_invalid_inputs(self):
+        content = self._read_sample_input('plain_formatted_inputs', 'input2.inp')
+        with self.assertRaises(ValueError):
+            list(PuzzleInputParser.stream_plain_formatted_file(io.StringIO(content.replace('0 3 3\n', '0 3\n', 1))))
+        with self.assertRaises(ValueError):
+            list(PuzzleInputParser.stream_plain_formatted_file(io.StringIO(content[:content.index('F')])))
+        with self.assertRaises(ValueError):
+            list(PuzzleInputParser.stream_json_lines_file(io.StringIO('{"row": 4\n')))
+        # Dictionary like formatted files are not evaluated as code
+        with self.assertRaises(ValueError):
+            PuzzleInputParser.parse_dict_formatted_file(io.StringIO('{"row": __import__("os").getpid()}'))
+
+    def test_puzzle_archive(self):
+        puzzles = [PuzzleInputParser.parse_file(io.StringIO(self._read_sample_input(format_directory, file_name)))
+                   for format_directory, file_name in [('dict_formatted_inputs', 'input2.inp'),
+                                                       ('plain_formatted_inputs', 'input3.inp'),
+                                                       ('dict_formatted_inputs', 'input4.inp')]]
+        solution_moves = st.find_moves(puzzles[0].move_generator, [se.encode_state(node.state)
+                                                                   for node in puzzles[0].solve()[1]])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'puzzles.sbpa')
+            with PuzzleArchiveWriter(path) as writer:
+                self.assertEqual(0, writer.add(puzzles[0], solution_moves))
+                self.assertEqual(1, writer.add(puzzles[1]))
+                self.assertEqual(2, writer.add(puzzles[2], []))
+
+            with PuzzleArchiveReader(path) as reader:
+                self.assertEqual(3, len(reader))
+                # Puzzles are read in any order
+                for puzzle_index in [2, 0, 1]:
+                    puzzle = reader.read_puzzle(puzzle_index)
+                    self.assertListEqual(puzzles[puzzle_index].initial_state, puzzle.initial_state)
+                    self.assertListEqual(puzzles[puzzle_index].final_states, puzzle.final_states)
+                    self.assertEqual(puzzles[puzzle_index].heuristic_function, puzzle.heuristic_function)
+                self.assertListEqual(solution_moves, reader.read_solution(0))
+                self.assertIsNone(reader.read_solution(1))
+                self.assertListEqual([], reader.read_solution(2))
+                with self.assertRaises(IndexError):
+                    reader.read_puzzle(3)
+
+                # Replaying the moves reaches a final state
+                state = puzzles[0].encoded_initial_state
+                for move in reader.read_solution(0):
+                    state = puzzles[0].move_generator.apply_move(state, move)
+                self.assertIn(state, puzzles[0].encoded_final_state_set)
+
+            with self.assertRaises(ValueError):
+                PuzzleArchiveReader(os.path.join(self.SAMPLE_INPUTS_DIRECTORY, 'dict_formatted_inputs', 'input2.inp'))
+
+    def test_puzzle_archive_closes_with_states_in_use(self):
+        puzzle = PuzzleInputParser.parse_file(io.StringIO(self._read_sample_input('dict_formatted_inputs',
+                                                                                  'input2.inp')))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'puzzles.sbpa')
+            with PuzzleArchiveWriter(path) as writer:
+                writer.add(puzzle)
+            reader = PuzzleArchiveReader(path)
+            _, _, _, _, initial_state, final_states = reader.read_encoded_puzzle(0)
+            reader.close()
+            self.assertEqual(puzzle.encoded_initial_state, initial_state)
+            self.assertListEqual(puzzle.encoded_final_states, final_states)
+
+    def test_puzzle_archive_size_limits(self):
+        # A single row of 300 cells does not fit into the one byte column count of a puzzle record
+        puzzle = Puzzle(0, 1, 300, 1, [[1] + [0] * 299], [[[0] * 299 + [1]]])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'puzzles.sbpa')
+            with self.assertRaises(ValueError):
+                with PuzzleArchiveWriter(path) as writer:
+                    writer.add(puzzle)
+            # Archives of failed writers are discarded
+            self.assertListEqual([], os.listdir(directory))
+
+
+if __name__ == '__main__':
+    unittest.main()
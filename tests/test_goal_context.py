@@ -0,0 +1,102 @@
+from collections import deque
+import unittest
+
+from src.goal_context import DEFAULT_STATE_BUDGET, DistanceTable, GoalContext
+from src.search_statistics import SearchStatistics
+from src.sliding_block_puzzle import Puzzle
+
+
+class GoalContextUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    def _create_puzzle(self, initial_state, goal_context: GoalContext = None):
+        return Puzzle(0, 4, 3, 3, initial_state, [self.final_state], goal_context=goal_context)
+
+    @staticmethod
+    def _find_exact_distances(goal_context: GoalContext) -> dict:
+        distances = {final_state: 0 for final_state in goal_context.final_states}
+        queue = deque(distances)
+        while queue:
+            state = queue.popleft()
+            for child_state, _ in goal_context.move_generator.successors(state):
+                if child_state not in distances:
+                    distances[child_state] = distances[state] + 1
+                    queue.append(child_state)
+        return distances
+
+    def test_distance_table(self):
+        table = DistanceTable(4, 2)
+        states = [bytes([index % 7, index // 7 % 7, index // 49, 1]) for index in range(300)]
+        for index, state in enumerate(states):
+            table.add(state, index)
+        self.assertEqual(300, len(table))
+        self.assertEqual(1024, table.slot_count)
+        self.assertListEqual(list(range(300)), [table.get(state) for state in states])
+        self.assertIsNone(table.get(bytes([0, 0, 0, 2])))
+        self.assertDictEqual(dict(zip(states, range(300))), dict(table.items()))
+
+    def test_complete_context(self):
+        goal_context = GoalContext.for_puzzle(self._create_puzzle(self.initial_state))
+        self.assertTrue(goal_context.is_complete)
+        exact_distances = self._find_exact_distances(goal_context)
+        self.assertDictEqual(exact_distances, dict(goal_context.table.items()))
+        state = bytes(sum(self.initial_state, []))
+        path = goal_context.find_path(state)
+        self.assertEqual(exact_distances[state], len(path))
+        self.assertIn(path[-1][0], goal_context.final_states)
+
+    def test_partial_context(self):
+        puzzle = self._create_puzzle(self.initial_state)
+        exact_distances = self._find_exact_distances(GoalContext.for_puzzle(puzzle))
+        goal_context = GoalContext.for_puzzle(puzzle, state_budget=100)
+        self.assertFalse(goal_context.is_complete)
+        self.assertEqual(100, len(goal_context))
+        for state, distance in exact_distances.items():
+            if goal_context.distance(state) is not None:
+                self.assertEqual(distance, goal_context.distance(state))
+            else:
+                self.assertGreaterEqual(distance, goal_context.radius)
+                self.assertEqual(goal_context.radius, goal_context.estimate(state, 0))
+
+    def test_solve_with_goal_context(self):
+        solution_exists, solution_path = self._create_puzzle(self.initial_state).solve()
+        self.assertTrue(solution_exists)
+
+        for state_budget in [10, 100, DEFAULT_STATE_BUDGET]:
+            goal_context = GoalContext.for_puzzle(self._create_puzzle(self.initial_state), state_budget)
+            statistics = SearchStatistics()
+            context_solution_exists, context_solution_path = self._create_puzzle(
+                self.initial_state, goal_context).solve(statistics=statistics)
+            self.assertTrue(context_solution_exists)
+            self.assertEqual(solution_path[-1].g_value, context_solution_path[-1].g_value)
+            self.assertEqual(len(solution_path), len(context_solution_path))
+            self.assertListEqual(self.final_state, context_solution_path[-1].state)
+            if goal_context.distance(bytes(sum(self.initial_state, []))) is not None:
+                # The whole path is read from the table
+                self.assertEqual(0, statistics.expansion_count)
+
+    def test_mismatching_goal_context(self):
+        other_final_state = [[0, 3, 3], [0, 3, 3], [2, 0, 0], [1, 0, 0]]
+        goal_context = GoalContext(4, 3, 3, [bytes(sum(other_final_state, []))])
+        with self.assertRaises(ValueError):
+            self._create_puzzle(self.initial_state, goal_context)
+        # Distances to a subset of the final states overestimate the distances to all of them
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state, other_final_state])
+        self.assertFalse(goal_context.matches(puzzle))
+        self.assertTrue(GoalContext.for_puzzle(puzzle, 10).matches(puzzle))
+
+
+if __name__ == '__main__':
+    unittest.main()
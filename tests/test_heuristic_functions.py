@@ -0,0 +1,112 @@
+import unittest
+
+from src.heuristic_functions import (
+    Heuristics, IncrementalHeuristic, PackedIncrementalHeuristic, find_encoded_heuristic_function,
+    find_euclidean_distance, find_heuristic_function, find_manhattan_distance, find_misplaced_blocks)
+from src.state_encoding import encode_state
+
+
+class HeuristicFunctionUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    def test_valid_heuristic_function(self):
+        self.assertEquals(find_manhattan_distance, find_heuristic_function(int(Heuristics.MANHATTAN_DISTANCE.value)))
+        self.assertEquals(find_euclidean_distance, find_heuristic_function(int(Heuristics.EUCLIDEAN_DISTANCE.value)))
+
+    def test_invalid_heuristic_function(self):
+        with self.assertRaises(ValueError) as context:
+            find_heuristic_function(int(1e10))
+
+        self.assertEquals(ValueError, type(context.exception))
+
+    def test_pattern_database_has_no_state_heuristic_function(self):
+        # Pattern databases are built for a board, so they are only available as incremental heuristics
+        with self.assertRaises(ValueError):
+            find_heuristic_function(Heuristics.PATTERN_DATABASE.value)
+
+    def test_manhattan_heuristic(self):
+        expected_distance = 7
+        output_distance = find_manhattan_distance(self.initial_state, self.final_state)
+        self.assertEquals(expected_distance, output_distance)
+
+    def test_misplaced_blocks_heuristic(self):
+        self.assertEqual(3, find_misplaced_blocks(self.initial_state, self.final_state))
+        self.assertEqual(0, find_misplaced_blocks(self.final_state, self.final_state))
+
+    def test_euclidean_heuristic(self):
+        expected_distance = 5.650281539872885
+        output_distance = find_euclidean_distance(self.initial_state, self.final_state)
+        self.assertAlmostEqual(expected_distance, output_distance, delta=1e-4)
+
+    def test_encoded_heuristics(self):
+        initial_state = encode_state(self.initial_state)
+        final_state = encode_state(self.final_state)
+        columns = len(self.initial_state[0])
+        for heuristic in [Heuristics.MANHATTAN_DISTANCE, Heuristics.EUCLIDEAN_DISTANCE, Heuristics.MISPLACED_BLOCKS]:
+            self.assertAlmostEqual(find_heuristic_function(heuristic.value)(self.initial_state, self.final_state),
+                                   find_encoded_heuristic_function(heuristic.value)(initial_state, final_state,
+                                                                                    columns), delta=1e-4)
+
+    def test_incremental_heuristic(self):
+        initial_state = encode_state(self.initial_state)
+        final_state = encode_state(self.final_state)
+        rows, columns = len(self.initial_state), len(self.initial_state[0])
+        for heuristic in [Heuristics.MANHATTAN_DISTANCE, Heuristics.EUCLIDEAN_DISTANCE, Heuristics.MISPLACED_BLOCKS]:
+            incremental_heuristic = IncrementalHeuristic(heuristic.value, rows, columns, [final_state, initial_state])
+            components = incremental_heuristic.evaluate(initial_state)
+            self.assertAlmostEqual(find_encoded_heuristic_function(heuristic.value)(initial_state, final_state,
+                                                                                    columns), components[0], delta=1e-4)
+            self.assertEqual(0, components[1])
+
+            # Slide block 2 right by one cell
+            moved_state = encode_state([
+                [0, 0, 0],
+                [1, 0, 2],
+                [0, 3, 3],
+                [0, 3, 3]
+            ])
+            moved_components = incremental_heuristic.update(components, 2, initial_state.find(2), moved_state.find(2))
+            for expected_component, moved_component in zip(incremental_heuristic.evaluate(moved_state),
+                                                            moved_components):
+                self.assertAlmostEqual(expected_component, moved_component, delta=1e-4)
+
+    def test_packed_incremental_heuristic(self):
+        initial_state = encode_state(self.initial_state)
+        moved_state = encode_state([
+            [0, 0, 0],
+            [1, 0, 2],
+            [0, 3, 3],
+            [0, 3, 3]
+        ])
+        final_states = [encode_state(self.final_state), initial_state, moved_state]
+        rows, columns = len(self.initial_state), len(self.initial_state[0])
+        incremental_heuristic = IncrementalHeuristic(Heuristics.MANHATTAN_DISTANCE.value, rows, columns, final_states)
+        packed_heuristic = PackedIncrementalHeuristic(Heuristics.MANHATTAN_DISTANCE.value, rows, columns,
+                                                      final_states)
+
+        for state in [initial_state, moved_state, encode_state(self.final_state)]:
+            self.assertEqual(incremental_heuristic.value(incremental_heuristic.evaluate(state)),
+                             packed_heuristic.value(packed_heuristic.evaluate(state)))
+        components = packed_heuristic.update(packed_heuristic.evaluate(moved_state), 2, moved_state.find(2),
+                                             initial_state.find(2))
+        self.assertEqual(packed_heuristic.evaluate(initial_state), components)
+        self.assertEqual(0, packed_heuristic.value(components))
+
+        with self.assertRaises(ValueError):
+            PackedIncrementalHeuristic(Heuristics.EUCLIDEAN_DISTANCE.value, rows, columns, final_states)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from src.sliding_block_puzzle import Puzzle, SearchLimitExceeded
+import src.state_transitions as st
+
+
+class CrashingMoveGenerator(st.MoveGenerator):
+    def successors(self, state: bytes):
+        raise MemoryError("Worker is out of memory")
+
+
+class ParallelSearchUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    def test_parallel_solution(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        for workers in [1, 3]:
+            solution_exists, solution_path = puzzle.solve_parallel(workers)
+
+            self.assertTrue(solution_exists)
+            self.assertListEqual(self.initial_state, solution_path[0].state)
+            self.assertListEqual(self.final_state, solution_path[-1].state)
+            self.assertEqual(list(range(8)), [node.g_value for node in solution_path])
+
+    def test_parallel_unsolvable_puzzle(self):
+        puzzle = Puzzle(0, 3, 3, 2, [[0, 0, 0], [2, 2, 2], [0, 1, 0]], [[[0, 1, 0], [2, 2, 2], [0, 0, 0]]])
+        self.assertTupleEqual((False, None), puzzle.solve_parallel(2))
+
+    def test_parallel_search_limits(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        with self.assertRaises(SearchLimitExceeded):
+            puzzle.solve_parallel(2, node_budget=1)
+
+    def test_parallel_worker_crash(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        puzzle.move_generator = CrashingMoveGenerator(puzzle.encoded_initial_state, 4, 3, 3)
+        # Coordinator fails instead of waiting for the results of the dead worker forever
+        with self.assertRaises(RuntimeError):
+            puzzle.solve_parallel(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
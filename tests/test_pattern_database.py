@@ -0,0 +1,81 @@
+from collections import deque
+import os
+import tempfile
+import unittest
+
+from src.pattern_database import PatternDatabase, PatternDatabaseHeuristic
+from src.state_encoding import encode_state
+import src.state_transitions as st
+
+
+class PatternDatabaseUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    rows = len(initial_state)
+    columns = len(initial_state[0])
+
+    def _find_exact_distances(self) -> dict:
+        # Exact distances of all states to the final state by breadth first search
+        final_state = encode_state(self.final_state)
+        move_generator = st.MoveGenerator(final_state, self.rows, self.columns, 3)
+        distances = {final_state: 0}
+        queue = deque([final_state])
+        while queue:
+            state = queue.popleft()
+            for child_state, _ in move_generator.successors(state):
+                if child_state not in distances:
+                    distances[child_state] = distances[state] + 1
+                    queue.append(child_state)
+        return distances
+
+    def test_admissible_distances(self):
+        final_states = [encode_state(self.final_state)]
+        for pattern_blocks in [[1], [2, 3], [1, 2, 3]]:
+            pattern_database = PatternDatabase.build(self.rows, self.columns, 3, final_states, pattern_blocks)
+            for state, distance in self._find_exact_distances().items():
+                self.assertLessEqual(pattern_database.distance(pattern_database.index(state)), distance)
+
+        # Pattern of all blocks is exact
+        for state, distance in self._find_exact_distances().items():
+            self.assertEqual(distance, pattern_database.distance(pattern_database.index(state)))
+
+    def test_saved_table(self):
+        final_states = [encode_state(self.final_state)]
+        with tempfile.TemporaryDirectory() as directory:
+            built_database = PatternDatabase.build(self.rows, self.columns, 3, final_states, directory=directory)
+            self.assertEqual(1, len(os.listdir(directory)))
+            loaded_database = PatternDatabase.build(self.rows, self.columns, 3, final_states, directory=directory)
+
+            self.assertListEqual(built_database.pattern_blocks, loaded_database.pattern_blocks)
+            self.assertEqual(bytes(built_database.table), bytes(loaded_database.table))
+
+    def test_incremental_heuristic(self):
+        initial_state = encode_state(self.initial_state)
+        final_states = [encode_state(self.final_state)]
+        heuristic = PatternDatabaseHeuristic(self.rows, self.columns, 3, final_states, [2, 3])
+        move_generator = st.MoveGenerator(initial_state, self.rows, self.columns, 3)
+
+        distances = self._find_exact_distances()
+        components = heuristic.evaluate(initial_state)
+        self.assertLessEqual(heuristic.value(components), distances[initial_state])
+        for child_state, move in move_generator.successors(initial_state):
+            child_components = heuristic.update(components, move.block, initial_state.find(move.block),
+                                                child_state.find(move.block))
+            self.assertEqual(heuristic.value(heuristic.evaluate(child_state)), heuristic.value(child_components))
+            self.assertLessEqual(heuristic.value(child_components), distances[child_state])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import random
+import unittest
+
+from src.file_parser import PuzzleInputParser
+from src.puzzle_generator import generate_puzzle, generate_puzzles
+from src.sliding_block_puzzle import Puzzle
+
+
+class PuzzleGeneratorUnittest(unittest.TestCase):
+    def test_generated_puzzles_are_solvable(self):
+        for rows, columns, block_count, final_state_count in [(3, 3, 4, 1), (4, 4, 6, 3), (2, 5, 9, 2)]:
+            for puzzle_dict in generate_puzzles(3, 7, rows=rows, columns=columns, block_count=block_count,
+                                                final_state_count=final_state_count, walk_length=10):
+                puzzle = PuzzleInputParser.parse_dict(puzzle_dict)
+                self.assertIsInstance(puzzle, Puzzle)
+                self.assertEqual(final_state_count, len(puzzle.final_states))
+                self.assertEqual(set(range(block_count + 1)), set(puzzle.encoded_initial_state))
+                solution_exists, solution_path = puzzle.solve()
+                self.assertTrue(solution_exists)
+                self.assertLessEqual(len(solution_path) - 1, 10)
+
+    def test_generation_is_reproducible(self):
+        options = {'rows': 4, 'columns': 4, 'block_count': 5, 'final_state_count': 2}
+        self.assertListEqual(list(generate_puzzles(5, 3, **options)), list(generate_puzzles(5, 3, **options)))
+        self.assertNotEqual(list(generate_puzzles(5, 3, **options)), list(generate_puzzles(5, 4, **options)))
+        with self.assertRaises(ValueError):
+            generate_puzzle(2, 2, 4)
+
+    def test_crowded_board(self):
+        # Three unit blocks on a 2x2 board reach only 12 states and a single block on a 1x2 board reaches only 2
+        with self.assertRaises(ValueError):
+            generate_puzzle(2, 2, 3, final_state_count=20, rng=random.Random(0))
+        with self.assertRaises(ValueError):
+            generate_puzzle(1, 2, 1, final_state_count=3, rng=random.Random(0))
+        self.assertEqual(3, len(generate_puzzle(2, 2, 3, final_state_count=3, rng=random.Random(0))[
+            PuzzleInputParser.FINAL_STATES_LABEL]))
+
+
+if __name__ == '__main__':
+    unittest.main()
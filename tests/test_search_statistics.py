@@ -0,0 +1,59 @@
+import json
+import unittest
+
+from src.search_statistics import SearchStatistics
+from src.sliding_block_puzzle import Puzzle
+
+
+class SearchStatisticsUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    def test_search_statistics(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        progress_reports = []
+        statistics = SearchStatistics(lambda reported: progress_reports.append(reported.expansion_count), 2)
+        solution_exists, solution_path = puzzle.solve(statistics=statistics)
+
+        self.assertTrue(solution_exists)
+        self.assertEqual(7, solution_path[-1].g_value)
+        self.assertGreater(statistics.expansion_count, 0)
+        self.assertListEqual(list(range(2, statistics.expansion_count + 1, 2)), progress_reports)
+        # Heuristic is evaluated once for the start node and updated for each new or reopened child
+        self.assertEqual(1 + statistics.generated_count - statistics.duplicate_count + statistics.reopening_count,
+                         statistics.heuristic_call_count)
+        self.assertGreater(statistics.peak_open_size, 0)
+        self.assertLessEqual(statistics.peak_closed_size, statistics.expansion_count)
+        # Manhattan distance is consistent, so no expanded node exceeds the optimal cost
+        self.assertLessEqual(statistics.maximum_f_value, solution_path[-1].g_value)
+        self.assertGreater(statistics.elapsed_time, 0)
+
+        dumped_statistics = json.loads(statistics.to_json())
+        self.assertEqual(statistics.expansion_count, dumped_statistics['expansions'])
+        self.assertEqual(statistics.generated_count, dumped_statistics['generated'])
+
+        # Instrumented search expands exactly the nodes of an uninstrumented one
+        self.assertEqual(len(solution_path), len(puzzle.solve(node_budget=statistics.expansion_count)[1]))
+
+    def test_progress_callback_stops_search(self):
+        def stop_search(_):
+            raise KeyboardInterrupt
+
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        with self.assertRaises(KeyboardInterrupt):
+            puzzle.solve(statistics=SearchStatistics(stop_search, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+import importlib.util
+import unittest
+
+from src.sliding_block_puzzle import Puzzle, SearchLimitExceeded, SearchStrategies
+import src.state_encoding as se
+import src.state_transitions as st
+
+
+class PuzzleUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    unsolvable_initial_state = [
+        [0, 0, 0],
+        [2, 2, 2],
+        [0, 1, 0]
+    ]
+
+    unsolvable_final_state = [
+        [0, 1, 0],
+        [2, 2, 2],
+        [0, 0, 0]
+    ]
+
+    def test_optimal_solution(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        solution_exists, solution_path = puzzle.solve()
+
+        self.assertTrue(solution_exists)
+        self.assertListEqual(self.initial_state, solution_path[0].state)
+        self.assertListEqual(self.final_state, solution_path[-1].state)
+        self.assertEqual(7, solution_path[-1].g_value)
+        self.assertEqual(list(range(8)), [node.g_value for node in solution_path])
+
+    def test_solution_with_euclidean_heuristic(self):
+        puzzle = Puzzle(1, 4, 3, 3, self.initial_state, [self.final_state])
+        solution_exists, solution_path = puzzle.solve()
+
+        self.assertTrue(solution_exists)
+        self.assertEqual(7, solution_path[-1].g_value)
+
+    def test_solution_with_pattern_database_heuristic(self):
+        puzzle = Puzzle(2, 4, 3, 3, self.initial_state, [self.final_state])
+        for solve in [puzzle.solve, puzzle.solve_ida_star]:
+            solution_exists, solution_path = solve()
+
+            self.assertTrue(solution_exists)
+            self.assertEqual(7, solution_path[-1].g_value)
+
+    def test_initial_state_is_final_state(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.final_state, [self.initial_state, self.final_state])
+        solution_exists, solution_path = puzzle.solve()
+
+        self.assertTrue(solution_exists)
+        self.assertEqual(1, len(solution_path))
+
+    def test_unsolvable_puzzle(self):
+        puzzle = Puzzle(0, 3, 3, 2, self.unsolvable_initial_state, [self.unsolvable_final_state])
+        solution_exists, solution_path = puzzle.solve()
+
+        self.assertFalse(solution_exists)
+        self.assertIsNone(solution_path)
+
+    def test_ida_star_solution(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        for transposition_table_size in [None, 1, 1000]:
+            solution_exists, solution_path = puzzle.solve_ida_star(transposition_table_size)
+
+            self.assertTrue(solution_exists)
+            self.assertListEqual(self.initial_state, solution_path[0].state)
+            self.assertListEqual(self.final_state, solution_path[-1].state)
+            self.assertEqual(list(range(8)), [node.g_value for node in solution_path])
+
+    def test_bidirectional_solution(self):
+        other_final_state = [
+            [0, 0, 0],
+            [2, 0, 0],
+            [3, 3, 0],
+            [3, 3, 1]
+        ]
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [other_final_state, self.final_state])
+        solution_exists, solution_path = puzzle.solve_bidirectional()
+
+        self.assertTrue(solution_exists)
+        self.assertListEqual(self.initial_state, solution_path[0].state)
+        self.assertListEqual(self.final_state, solution_path[-1].state)
+        self.assertEqual(list(range(8)), [node.g_value for node in solution_path])
+        self.assertEqual(puzzle.solve()[1][-1].g_value, solution_path[-1].g_value)
+
+    def test_bidirectional_unsolvable_puzzle(self):
+        puzzle = Puzzle(0, 3, 3, 2, self.unsolvable_initial_state, [self.unsolvable_final_state])
+        solution_exists, solution_path = puzzle.solve_bidirectional()
+
+        self.assertFalse(solution_exists)
+        self.assertIsNone(solution_path)
+
+    def test_search_limits(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        for strategy in SearchStrategies:
+            # Batched strategies are skipped if their optional NumPy dependency is not installed
+            if strategy in [SearchStrategies.BREADTH_FIRST, SearchStrategies.BEAM] and \
+                    importlib.util.find_spec('numpy') is None:
+                continue
+            with self.assertRaises(SearchLimitExceeded):
+                puzzle.solve_with_strategy(strategy.value, node_budget=1)
+            with self.assertRaises(SearchLimitExceeded):
+                puzzle.solve_with_strategy(strategy.value, time_limit=-1)
+            self.assertTrue(puzzle.solve_with_strategy(strategy.value, node_budget=10000, time_limit=60)[0])
+
+    def test_macro_move_solution(self):
+        for transition_mode in [st.TransitionModes.STRAIGHT, st.TransitionModes.FREE]:
+            # Costs counted per cell keep the optimal cost of single cell moves
+            puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state], transition_mode=transition_mode.value)
+            solution_exists, solution_path = puzzle.solve()
+            self.assertTrue(solution_exists)
+            self.assertEqual(7, solution_path[-1].g_value)
+
+            # Every slide costs one so fewer moves are needed
+            puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state], transition_mode=transition_mode.value,
+                            move_cost=st.MoveCosts.PER_MOVE.value)
+            solution_exists, solution_path = puzzle.solve()
+            self.assertTrue(solution_exists)
+            self.assertListEqual(self.final_state, solution_path[-1].state)
+            self.assertEqual(len(solution_path) - 1, solution_path[-1].g_value)
+            self.assertLess(solution_path[-1].g_value, 7)
+            for node, next_node in zip(solution_path, solution_path[1:]):
+                self.assertIn(se.encode_state(next_node.state), [child_state for child_state, _ in
+                              puzzle.move_generator.successors(se.encode_state(node.state))])
+
+            with self.assertRaises(ValueError):
+                puzzle.solve_ida_star()
+
+    def test_solution_moves(self):
+        for transition_mode in st.TransitionModes:
+            puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state], transition_mode=transition_mode.value)
+            strategies = [SearchStrategies.A_STAR, SearchStrategies.IDA_STAR, SearchStrategies.BIDIRECTIONAL]
+            for strategy in strategies if transition_mode == st.TransitionModes.SINGLE else strategies[:1]:
+                solution_path = puzzle.solve_with_strategy(strategy.value)[1]
+                solution_moves = Puzzle.get_solution_moves(solution_path)
+                self.assertEqual(len(solution_path) - 1, len(solution_moves))
+
+                # Replaying the moves from the initial state gives the states of the path
+                state = puzzle.encoded_initial_state
+                for node, move in zip(solution_path[1:], solution_moves):
+                    state = puzzle.move_generator.apply_move(state, move)
+                    self.assertEqual(se.encode_state(node.state), state)
+
+        self.assertEqual('2 UP', st.format_move(st.Move(2, st.Directions.UP)))
+        self.assertEqual('2 UP LEFT', st.format_move(st.MacroMove(2, (st.Directions.UP, st.Directions.LEFT))))
+
+    def test_weighted_solution(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        for weight in [1, 1.5, 5]:
+            solution_exists, solution_path = puzzle.solve(weight=weight)
+            self.assertTrue(solution_exists)
+            self.assertListEqual(self.final_state, solution_path[-1].state)
+            self.assertLessEqual(solution_path[-1].g_value, weight * 7)
+        with self.assertRaises(ValueError):
+            puzzle.solve(weight=0.5)
+        with self.assertRaises(ValueError):
+            puzzle.solve_with_strategy(SearchStrategies.IDA_STAR.value, weight=2)
+
+    def test_anytime_solution(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        published_costs = []
+        solution_exists, solution_path = puzzle.solve_anytime(
+            5, 1, solution_callback=lambda path: published_costs.append(path[-1].g_value))
+
+        self.assertTrue(solution_exists)
+        self.assertListEqual(self.initial_state, solution_path[0].state)
+        self.assertListEqual(self.final_state, solution_path[-1].state)
+        # Each published solution is better than the previous one and the last one is optimal
+        self.assertEqual(7, solution_path[-1].g_value)
+        self.assertEqual(published_costs, sorted(set(published_costs), reverse=True))
+        self.assertEqual(7, published_costs[-1])
+        for node, next_node, move in zip(solution_path, solution_path[1:], Puzzle.get_solution_moves(solution_path)):
+            self.assertEqual(se.encode_state(next_node.state),
+                             puzzle.move_generator.apply_move(se.encode_state(node.state), move))
+
+        # The best solution found so far is returned once the budget is exceeded
+        first_cost = published_costs[0]
+        solution_exists, solution_path = puzzle.solve_anytime(5, 1, node_budget=first_cost * 4)
+        self.assertTrue(solution_exists)
+        self.assertGreaterEqual(solution_path[-1].g_value, 7)
+
+        unsolvable_puzzle = Puzzle(0, 3, 3, 2, self.unsolvable_initial_state, [self.unsolvable_final_state])
+        self.assertTupleEqual((False, None), unsolvable_puzzle.solve_anytime())
+
+    def test_ida_star_unsolvable_puzzle(self):
+        puzzle = Puzzle(0, 3, 3, 2, self.unsolvable_initial_state, [self.unsolvable_final_state])
+        solution_exists, solution_path = puzzle.solve_ida_star(1000)
+
+        self.assertFalse(solution_exists)
+        self.assertIsNone(solution_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
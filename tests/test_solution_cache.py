@@ -0,0 +1,92 @@
+import os
+import tempfile
+from typing import List
+import unittest
+
+from src.sliding_block_puzzle import Puzzle
+from src.solution_cache import SolutionCache, find_fingerprint
+
+
+class SolutionCacheUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    def _solve_with_cache(self, solution_cache: SolutionCache, initial_state: List[List[int]], heuristic: int = 0):
+        puzzle = Puzzle(heuristic, 4, 3, 3, initial_state, [self.final_state])
+        return puzzle.solve_with_strategy(solution_cache=solution_cache)
+
+    def test_suffix_hits(self):
+        solution_cache = SolutionCache()
+        solution_exists, solution_path = self._solve_with_cache(solution_cache, self.initial_state)
+        self.assertTrue(solution_exists)
+        self.assertEqual((0, 1), (solution_cache.hit_count, solution_cache.miss_count))
+        self.assertEqual(len(solution_path), len(solution_cache))
+
+        # Every later state of the path is solved by the cache with the rest of the same path
+        for offset in range(len(solution_path)):
+            solution_exists, cached_solution_path = self._solve_with_cache(solution_cache,
+                                                                           solution_path[offset].state)
+            self.assertTrue(solution_exists)
+            self.assertListEqual([node.state for node in solution_path[offset:]],
+                                 [node.state for node in cached_solution_path])
+            self.assertListEqual([node.move for node in solution_path[offset + 1:]],
+                                 [node.move for node in cached_solution_path[1:]])
+            self.assertEqual(solution_path[-1].g_value - solution_path[offset].g_value,
+                             cached_solution_path[-1].g_value)
+        self.assertEqual((len(solution_path), 1), (solution_cache.hit_count, solution_cache.miss_count))
+
+        # Heuristic function is a part of the key
+        self._solve_with_cache(solution_cache, self.initial_state, heuristic=1)
+        self.assertEqual(2, solution_cache.miss_count)
+
+    def test_least_recently_used_eviction(self):
+        solution_cache = SolutionCache(capacity=3)
+        _, solution_path = self._solve_with_cache(solution_cache, self.initial_state)
+        self.assertEqual(3, len(solution_cache))
+        # States closest to the initial state are kept while the ones closest to the final state are evicted
+        self._solve_with_cache(solution_cache, solution_path[2].state)
+        self._solve_with_cache(solution_cache, solution_path[-2].state)
+        self.assertEqual((1, 2), (solution_cache.hit_count, solution_cache.miss_count))
+        self.assertEqual(3, len(solution_cache))
+
+    def test_database_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            database_path = os.path.join(directory, 'solutions.sqlite')
+            with SolutionCache(database_path=database_path) as solution_cache:
+                _, solution_path = self._solve_with_cache(solution_cache, self.initial_state)
+                # Block 3 has another shape than in the final state
+                unsolvable_state = [[0, 0, 0], [1, 2, 0], [3, 3, 3], [0, 0, 0]]
+                self.assertTupleEqual((False, None), self._solve_with_cache(solution_cache, unsolvable_state))
+
+            # A new cache starts with an empty memory tier and finds entries in the database
+            with SolutionCache(database_path=database_path) as solution_cache:
+                solution_exists, cached_solution_path = self._solve_with_cache(solution_cache, solution_path[3].state)
+                self.assertTrue(solution_exists)
+                self.assertListEqual([node.state for node in solution_path[3:]],
+                                     [node.state for node in cached_solution_path])
+                self.assertTupleEqual((False, None), self._solve_with_cache(solution_cache, unsolvable_state))
+                self.assertEqual((2, 0), (solution_cache.hit_count, solution_cache.miss_count))
+                self.assertEqual(2, len(solution_cache))
+
+    def test_fingerprint_ignores_final_state_order(self):
+        other_final_state = [[0, 3, 3], [0, 3, 3], [2, 0, 0], [1, 0, 0]]
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state, other_final_state])
+        reordered_puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [other_final_state, self.final_state])
+        self.assertEqual(find_fingerprint(puzzle), find_fingerprint(reordered_puzzle))
+        self.assertNotEqual(find_fingerprint(puzzle), find_fingerprint(
+            Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])))
+
+
+if __name__ == '__main__':
+    unittest.main()
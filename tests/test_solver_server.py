@@ -0,0 +1,126 @@
+import asyncio
+import io
+import json
+import os
+import socket
+import struct
+import unittest
+
+from src.batch_solver import ERROR_STATUS, LIMIT_EXCEEDED_STATUS, SOLVED_STATUS, UNSOLVABLE_STATUS
+from src.solution_cache import SolutionCache
+from src.solver_server import answer_request, serve_stream, start_socket_server
+from src.solver_service import SolverService
+
+
+class SolverServerUnittest(unittest.IsolatedAsyncioTestCase):
+    puzzle = {
+        'heuristic_function': 0,
+        'row': 4,
+        'column': 3,
+        'blocks': 3,
+        'start_state': [
+            [0, 0, 0],
+            [1, 2, 0],
+            [0, 3, 3],
+            [0, 3, 3]
+        ],
+        'final_states': [
+            [
+                [3, 3, 0],
+                [3, 3, 0],
+                [2, 0, 0],
+                [1, 0, 0]
+            ]
+        ]
+    }
+
+    @staticmethod
+    def _read_hard_puzzle() -> dict:
+        # Fifteen puzzle which takes A* Search far longer than any of the tests
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_inputs',
+                            'dict_formatted_inputs', 'input1.inp')
+        with open(path) as f:
+            return json.load(f)
+
+    def test_answer_request(self):
+        response = answer_request(json.dumps(dict(self.puzzle, id='first')))
+        self.assertEqual('first', response['id'])
+        self.assertEqual(SOLVED_STATUS, response['status'])
+        self.assertEqual(7, response['cost'])
+        self.assertEqual(7, len(response['moves']))
+        self.assertEqual('1 DOWN', response['moves'][0])
+
+        unsolvable_puzzle = dict(self.puzzle, start_state=[[0, 0, 0], [2, 2, 2], [0, 1, 0], [0, 3, 3]])
+        self.assertEqual(UNSOLVABLE_STATUS, answer_request(json.dumps(unsolvable_puzzle))['status'])
+        response = answer_request(json.dumps(dict(self._read_hard_puzzle(), id=3, node_budget=10)))
+        self.assertEqual(3, response['id'])
+        self.assertEqual(LIMIT_EXCEEDED_STATUS, response['status'])
+        response = answer_request('{"id": 4}')
+        self.assertEqual(4, response['id'])
+        self.assertEqual(ERROR_STATUS, response['status'])
+        self.assertIn('KeyError', response['error'])
+        self.assertEqual(ERROR_STATUS, answer_request('not a request')['status'])
+
+    def test_serve_stream(self):
+        request_lines = [json.dumps(dict(self.puzzle, id=request_id)) for request_id in range(3)]
+        output_file = io.StringIO()
+        with SolutionCache() as solution_cache:
+            self.assertEqual(3, serve_stream(io.StringIO('\n'.join(request_lines + ['', ''])), output_file,
+                                             solution_cache))
+            # Only the first request searches while the later ones are answered by the warm cache
+            self.assertEqual(1, solution_cache.miss_count)
+            self.assertEqual(2, solution_cache.hit_count)
+        responses = [json.loads(line) for line in output_file.getvalue().splitlines()]
+        self.assertListEqual([0, 1, 2], [response['id'] for response in responses])
+        self.assertListEqual([responses[0]['moves']] * 3, [response['moves'] for response in responses])
+
+    def test_invalid_options(self):
+        with SolutionCache() as solution_cache:
+            self.assertEqual(SOLVED_STATUS, answer_request(json.dumps(self.puzzle), solution_cache)['status'])
+            # Options are rejected even though the puzzle is answered by the cache without searching
+            for options in [{'weight': 'x'}, {'weight': 0.5}, {'node_budget': -1}, {'node_budget': 1.5},
+                            {'node_budget': True}, {'time_limit': '1'}, {'time_limit': float('inf')}]:
+                response = answer_request(json.dumps(dict(self.puzzle, id=1, **options)), solution_cache)
+                self.assertEqual(ERROR_STATUS, response['status'], options)
+                self.assertEqual(1, response['id'])
+                self.assertIn(next(iter(options)), response['error'])
+            self.assertEqual(SOLVED_STATUS, answer_request(json.dumps(dict(self.puzzle, weight=2, node_budget=100,
+                                                                            time_limit=10)))['status'])
+
+    async def test_socket_server(self):
+        async with SolverService(max_concurrency=2) as service:
+            async with await start_socket_server(service) as server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                writer.write((json.dumps(dict(self._read_hard_puzzle(), id='hard', node_budget=100)) + '\n' +
+                              json.dumps(dict(self.puzzle, id='easy')) + '\n').encode())
+                # Requests in flight are answered after the client closes its side
+                writer.write_eof()
+                responses = {}
+                for _ in range(2):
+                    response = json.loads(await asyncio.wait_for(reader.readline(), 10))
+                    responses[response['id']] = response
+                self.assertEqual(b'', await reader.readline())
+                writer.close()
+                self.assertEqual(LIMIT_EXCEEDED_STATUS, responses['hard']['status'])
+                self.assertEqual(SOLVED_STATUS, responses['easy']['status'])
+                self.assertEqual(7, responses['easy']['cost'])
+
+    async def test_lost_connection(self):
+        async with SolverService(max_concurrency=1, progress_interval=100) as service:
+            async with await start_socket_server(service) as server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                writer.write((json.dumps(self._read_hard_puzzle()) + '\n').encode())
+                await writer.drain()
+                while not service.jobs:
+                    await asyncio.sleep(0.01)
+                job = next(iter(service.jobs.values()))
+                # Resetting the connection cancels its solves, which releases the only worker
+                writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                writer.transport.abort()
+                await asyncio.wait_for(asyncio.wait([job.task]), 10)
+                self.assertTrue(job.cancel_event.is_set())
+                self.assertDictEqual({}, service.jobs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import unittest
+
+import src.file_parser as fp
+from src.sliding_block_puzzle import Puzzle, SearchLimitExceeded
+from src.solver_service import SolveCancelled, SolverService
+
+
+class SolverServiceUnittest(unittest.IsolatedAsyncioTestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    @staticmethod
+    def _parse_hard_puzzle():
+        # Fifteen puzzle which takes A* Search far longer than any of the tests
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_inputs',
+                            'dict_formatted_inputs', 'input1.inp')
+        with open(path) as f:
+            return fp.PuzzleInputParser.parse_file(f)
+
+    def _create_puzzle(self):
+        return Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+
+    async def test_solve(self):
+        async with SolverService(max_concurrency=2) as service:
+            solution_exists, solution_path = await service.solve(self._create_puzzle())
+            self.assertTrue(solution_exists)
+            self.assertEqual(8, len(solution_path))
+            self.assertListEqual(self.final_state, solution_path[-1].state)
+
+    async def test_coalesced_requests(self):
+        async with SolverService(max_concurrency=2) as service:
+            requests = [service.submit(self._create_puzzle()) for _ in range(3)]
+            other_request = service.submit(self._create_puzzle(), weight=2)
+            results = await asyncio.gather(*requests, other_request)
+            self.assertEqual(2, service.coalesced_count)
+            self.assertIs(results[0], results[1])
+            self.assertIs(results[0], results[2])
+            self.assertIsNot(results[0], results[3])
+            self.assertDictEqual({}, service.jobs)
+
+    async def test_progress_snapshots(self):
+        async with SolverService(progress_interval=1) as service:
+            request = service.submit(self._create_puzzle())
+            snapshots = [snapshot async for snapshot in request]
+            solution_exists, solution_path = await request
+            self.assertTrue(solution_exists)
+            self.assertTrue(snapshots)
+            expansion_counts = [snapshot['expansions'] for snapshot in snapshots]
+            self.assertListEqual(sorted(expansion_counts), expansion_counts)
+            self.assertLessEqual(snapshots[-1]['maximum_f_value'], solution_path[-1].g_value)
+
+    async def test_limits(self):
+        async with SolverService() as service:
+            with self.assertRaises(SearchLimitExceeded):
+                await service.solve(self._parse_hard_puzzle(), node_budget=100)
+            with self.assertRaises(SearchLimitExceeded):
+                await service.solve(self._parse_hard_puzzle(), time_limit=0.05)
+
+    async def test_cancellation(self):
+        async with SolverService(max_concurrency=1, progress_interval=100) as service:
+            request = service.submit(self._parse_hard_puzzle())
+            waiting_request = service.submit(self._create_puzzle())
+            wait_task = asyncio.ensure_future(request)
+            # The search is running once the first snapshot arrives
+            await request.__aiter__().__anext__()
+            wait_task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await wait_task
+            # Search stops at its next progress callback and releases the only worker for the waiting request
+            with self.assertRaises(SolveCancelled):
+                await request.job.task
+            solution_exists, _ = await asyncio.wait_for(waiting_request, 10)
+            self.assertTrue(solution_exists)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+from src.state_encoding import MAXIMUM_BLOCK_ID, decode_state, encode_state
+
+
+class StateEncodingUnittest(unittest.TestCase):
+    state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    def test_encode_state(self):
+        self.assertEqual(bytes([0, 0, 0, 1, 2, 0, 0, 3, 3, 0, 3, 3]), encode_state(self.state))
+
+    def test_decode_state(self):
+        self.assertListEqual(self.state, decode_state(encode_state(self.state), 4, 3))
+
+    def test_invalid_block_id(self):
+        with self.assertRaises(ValueError):
+            encode_state([[0, MAXIMUM_BLOCK_ID + 1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
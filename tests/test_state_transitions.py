@@ -0,0 +1,225 @@
+import unittest
+
+from src.state_encoding import encode_state
+from src.state_transitions import (
+    Directions, MacroMoveGenerator, Move, MoveCosts, MoveGenerator, TransitionModes, decode_move, encode_move,
+    find_move_generator, find_moves, slide_block_down, slide_block_left, slide_block_right, slide_block_up,
+    slide_encoded_block_down, slide_encoded_block_left, slide_encoded_block_right, slide_encoded_block_up)
+
+
+class StateTransition(unittest.TestCase):
+    # Block ids which will be used through all the test cases
+    TARGET_BLOCK_ID = 1
+    OBSTACLE_BLOCK_ID = 2
+
+    # Test state
+    state = [
+        [0, 0, 0],
+        [0, 0, 0],
+        [0, 0, 0],
+        [0, 0, 0]
+    ]
+
+    row = len(state)
+    column = len(state[0])
+
+    def test_normal_up_transitions(self):
+        for row_index in range(self.row - 1, -1, -1):
+            input_state = [x[:] for x in self.state]
+            input_state[row_index][1] = self.TARGET_BLOCK_ID
+
+            # Get output state
+            output_state = slide_block_up(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
+            if row_index - 1 >= 0:
+                expected_state = [x[:] for x in self.state]
+                expected_state[row_index - 1][1] = self.TARGET_BLOCK_ID
+                self.assertListEqual(expected_state, output_state)
+            else:
+                self.assertIsNone(output_state)
+
+    def test_normal_down_transitions(self):
+        for row_index in range(0, self.row):
+            input_state = [x[:] for x in self.state]
+            input_state[row_index][1] = self.TARGET_BLOCK_ID
+
+            # Get output state
+            output_state = slide_block_down(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
+            if row_index + 1 < self.row:
+                expected_state = [x[:] for x in self.state]
+                expected_state[row_index + 1][1] = self.TARGET_BLOCK_ID
+                self.assertListEqual(expected_state, output_state)
+            else:
+                self.assertIsNone(output_state)
+
+    def test_normal_left_transitions(self):
+        for column_index in range(self.column - 1, -1, -1):
+            input_state = [x[:] for x in self.state]
+            input_state[2][column_index] = self.TARGET_BLOCK_ID
+
+            # Get output state
+            output_state = slide_block_left(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
+            if column_index - 1 >= 0:
+                expected_state = [x[:] for x in self.state]
+                expected_state[2][column_index - 1] = self.TARGET_BLOCK_ID
+                self.assertListEqual(expected_state, output_state)
+            else:
+                self.assertIsNone(output_state)
+
+    def test_normal_right_transitions(self):
+        for column_index in range(0, self.column):
+            input_state = [x[:] for x in self.state]
+            input_state[2][column_index] = self.TARGET_BLOCK_ID
+
+            # Get output state
+            output_state = slide_block_right(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
+            if column_index + 1 < self.column:
+                expected_state = [x[:] for x in self.state]
+                expected_state[2][column_index + 1] = self.TARGET_BLOCK_ID
+                self.assertListEqual(expected_state, output_state)
+            else:
+                self.assertIsNone(output_state)
+
+    def test_obstacled_up_transitions(self):
+        input_state = [x[:] for x in self.state]
+        input_state[3][1] = self.TARGET_BLOCK_ID
+        input_state[2][1] = self.TARGET_BLOCK_ID
+        input_state[1][1] = self.OBSTACLE_BLOCK_ID
+
+        # Get output state
+        output_state = slide_block_up(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
+        self.assertIsNone(output_state)
+
+    def test_obstacled_down_transitions(self):
+        input_state = [x[:] for x in self.state]
+        input_state[1][1] = self.TARGET_BLOCK_ID
+        input_state[2][1] = self.TARGET_BLOCK_ID
+        input_state[3][1] = self.OBSTACLE_BLOCK_ID
+
+        # Get output state
+        output_state = slide_block_down(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
+        self.assertIsNone(output_state)
+
+    def test_obstacled_left_transitions(self):
+        input_state = [x[:] for x in self.state]
+        input_state[1][2] = self.TARGET_BLOCK_ID
+        input_state[1][1] = self.TARGET_BLOCK_ID
+        input_state[1][0] = self.OBSTACLE_BLOCK_ID
+
+        # Get output state
+        output_state = slide_block_left(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
+        self.assertIsNone(output_state)
+
+    def test_obstacled_right_transitions(self):
+        input_state = [x[:] for x in self.state]
+        input_state[1][0] = self.TARGET_BLOCK_ID
+        input_state[1][1] = self.TARGET_BLOCK_ID
+        input_state[1][2] = self.OBSTACLE_BLOCK_ID
+
+        # Get output state
+        output_state = slide_block_right(input_state, self.row, self.column, self.TARGET_BLOCK_ID)
+        self.assertIsNone(output_state)
+
+    def test_encoded_transitions_match_list_transitions(self):
+        input_state = [x[:] for x in self.state]
+        input_state[1][1] = self.TARGET_BLOCK_ID
+        input_state[2][1] = self.TARGET_BLOCK_ID
+        input_state[2][2] = self.OBSTACLE_BLOCK_ID
+
+        transitions = [(slide_block_up, slide_encoded_block_up), (slide_block_down, slide_encoded_block_down),
+                       (slide_block_left, slide_encoded_block_left), (slide_block_right, slide_encoded_block_right)]
+        for block in [self.TARGET_BLOCK_ID, self.OBSTACLE_BLOCK_ID]:
+            for list_transition, encoded_transition in transitions:
+                expected_state = list_transition(input_state, self.row, self.column, block)
+                output_state = encoded_transition(encode_state(input_state), self.row, self.column, block)
+                if expected_state is None:
+                    self.assertIsNone(output_state)
+                else:
+                    self.assertEqual(encode_state(expected_state), output_state)
+
+    def test_move_generator_matches_transitions(self):
+        input_state = encode_state([
+            [0, 0, 0],
+            [1, 2, 2],
+            [0, 0, 2],
+            [3, 3, 0]
+        ])
+        move_generator = MoveGenerator(input_state, self.row, self.column, 3)
+        transitions = [slide_encoded_block_up, slide_encoded_block_down,
+                       slide_encoded_block_left, slide_encoded_block_right]
+
+        expected_successors = []
+        for block in range(1, 4):
+            for direction, transition in zip(Directions, transitions):
+                output_state = transition(input_state, self.row, self.column, block)
+                if output_state is not None:
+                    expected_successors.append((output_state, Move(block, direction)))
+        self.assertListEqual(expected_successors, list(move_generator.successors(input_state)))
+
+        for output_state, move in expected_successors:
+            self.assertEqual(output_state, move_generator.apply_move(input_state, move))
+        self.assertIsNone(move_generator.apply_move(input_state, Move(2, Directions.RIGHT)))
+
+    def test_macro_move_generator(self):
+        input_state = encode_state([
+            [0, 0, 0],
+            [1, 2, 2],
+            [0, 0, 2],
+            [3, 3, 0]
+        ])
+        move_generator = MoveGenerator(input_state, self.row, self.column, 3)
+
+        # Block 3 slides right by one cell and then it is blocked by the border
+        straight_generator = MacroMoveGenerator(move_generator, False)
+        straight_moves = [(move.block, move.directions) for _, move in straight_generator.successors(input_state)]
+        self.assertListEqual([(1, (Directions.UP,)), (1, (Directions.DOWN,)), (2, (Directions.UP,)),
+                              (2, (Directions.DOWN,)), (3, (Directions.UP,)), (3, (Directions.RIGHT,))],
+                             straight_moves)
+        # Block 1 slides two cells to the right in one move when nothing blocks it
+        open_state = encode_state([
+            [1, 0, 0],
+            [0, 0, 0],
+            [0, 0, 0],
+            [0, 0, 0]
+        ])
+        straight_generator = MacroMoveGenerator(MoveGenerator(open_state, self.row, self.column, 1), False)
+        self.assertIn((1, (Directions.RIGHT, Directions.RIGHT)),
+                      [(move.block, move.directions) for _, move in straight_generator.successors(open_state)])
+
+        # Block 1 reaches every cell of the empty region turning corners where cells are counted by the shortest path
+        free_generator = MacroMoveGenerator(move_generator, True, MoveCosts.PER_CELL.value)
+        block_successors = [(child_state.find(1), move.directions, cost)
+                            for child_state, move, cost in free_generator.weighted_successors(input_state)
+                            if move.block == 1]
+        self.assertListEqual([0, 6, 1, 7, 2], [anchor for anchor, _, _ in block_successors])
+        self.assertListEqual([1, 1, 2, 2, 3], [cost for _, _, cost in block_successors])
+        for child_state, move in free_generator.successors(input_state):
+            self.assertEqual(child_state, free_generator.apply_move(input_state, move))
+
+        # Every move costs one if costs are counted per move
+        per_move_generator = find_move_generator(input_state, self.row, self.column, 3, TransitionModes.FREE.value,
+                                                 MoveCosts.PER_MOVE.value)
+        self.assertSetEqual({1}, {cost for _, _, cost in per_move_generator.weighted_successors(input_state)})
+        self.assertIsInstance(find_move_generator(input_state, self.row, self.column, 3), MoveGenerator)
+
+    def test_find_moves(self):
+        input_state = encode_state([
+            [0, 0, 0],
+            [1, 2, 2],
+            [0, 0, 2],
+            [3, 3, 0]
+        ])
+        move_generator = MoveGenerator(input_state, self.row, self.column, 3)
+        moves = [Move(1, Directions.UP), Move(1, Directions.RIGHT), Move(3, Directions.UP)]
+        states = [input_state]
+        for move in moves:
+            states.append(move_generator.apply_move(states[-1], move))
+        self.assertListEqual(moves, find_moves(move_generator, states))
+        # Slides by many cells are split into single cell moves
+        self.assertListEqual(moves[:2], find_moves(move_generator, [states[0], states[2]]))
+        self.assertListEqual(moves, [decode_move(encode_move(move)) for move in moves])
+        with self.assertRaises(ValueError):
+            find_moves(move_generator, [states[0], states[3]])
+
+
+if __name__ == '__main__':
+    unittest.main()
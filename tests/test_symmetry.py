@@ -0,0 +1,71 @@
+import unittest
+
+from src.sliding_block_puzzle import Puzzle
+from src.symmetry import StateCanonicalizer
+
+
+class StateCanonicalizerUnittest(unittest.TestCase):
+    def test_interchangeable_blocks(self):
+        initial_state = bytes([1, 0, 2,
+                               0, 3, 3])
+        final_states = [bytes([0, 1, 2, 3, 3, 0]), bytes([0, 2, 1, 3, 3, 0])]
+        canonicalizer = StateCanonicalizer(initial_state, 2, 3, final_states)
+        self.assertListEqual([[1, 2]], canonicalizer.block_groups)
+        self.assertEqual(canonicalizer.canonicalize(bytes([1, 0, 2, 0, 3, 3])),
+                         canonicalizer.canonicalize(bytes([2, 0, 1, 0, 3, 3])))
+
+        # Blocks are not interchangeable if a final state tells them apart
+        canonicalizer = StateCanonicalizer(initial_state, 2, 3, final_states[:1])
+        self.assertTrue(canonicalizer.is_trivial)
+        self.assertNotEqual(canonicalizer.canonicalize(bytes([1, 0, 2, 0, 3, 3])),
+                            canonicalizer.canonicalize(bytes([2, 0, 1, 0, 3, 3])))
+
+    def test_reflections(self):
+        initial_state = bytes([1, 0, 0,
+                               0, 2, 2])
+        # Final states are mirrored versions of each other through the vertical axis
+        final_states = [bytes([0, 0, 1, 2, 2, 0]), bytes([1, 0, 0, 0, 2, 2])]
+        canonicalizer = StateCanonicalizer(initial_state, 2, 3, final_states)
+        self.assertEqual(1, len(canonicalizer.reflections))
+        self.assertEqual(canonicalizer.canonicalize(bytes([1, 0, 0, 2, 2, 0])),
+                         canonicalizer.canonicalize(bytes([0, 0, 1, 0, 2, 2])))
+
+        # Reflections are not folded if they change the shape of a block even if final states are mirrored
+        canonicalizer = StateCanonicalizer(bytes([1, 0, 0, 1, 1, 0]), 2, 3,
+                                           [bytes([1, 0, 0, 1, 1, 0]), bytes([0, 0, 1, 0, 1, 1])])
+        self.assertTrue(canonicalizer.is_trivial)
+
+    def test_canonical_solution(self):
+        initial_state = [
+            [1, 0, 2],
+            [0, 0, 0],
+            [3, 0, 4]
+        ]
+        final_states = [
+            [[0, 0, 0], [1, 2, 3], [0, 4, 0]],
+            [[0, 4, 0], [1, 2, 3], [0, 0, 0]],
+        ]
+        # Any labeling of the four interchangeable blocks is a final state
+        final_states = [[[{1: a, 2: b, 3: c, 4: d}.get(cell, 0) for cell in row] for row in final_state]
+                        for final_state in final_states
+                        for a in range(1, 5) for b in range(1, 5) for c in range(1, 5) for d in range(1, 5)
+                        if len({a, b, c, d}) == 4]
+        puzzle = Puzzle(0, 3, 3, 4, initial_state, final_states)
+        expected_length = len(puzzle.solve()[1])
+
+        canonical_puzzle = Puzzle(0, 3, 3, 4, initial_state, final_states, canonicalize=True)
+        self.assertFalse(canonical_puzzle.canonicalizer.is_trivial)
+        solution_exists, solution_path = canonical_puzzle.solve()
+
+        self.assertTrue(solution_exists)
+        self.assertEqual(expected_length, len(solution_path))
+        self.assertListEqual(initial_state, solution_path[0].state)
+        self.assertIn(solution_path[-1].state, final_states)
+        # Consecutive states of the concrete path differ by a single move
+        for node, next_node in zip(solution_path, solution_path[1:]):
+            self.assertIn(bytes(sum(next_node.state, [])), [child_state for child_state, _ in
+                          canonical_puzzle.move_generator.successors(bytes(sum(node.state, [])))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+import src.heuristic_functions as hf
+from src.sliding_block_puzzle import Puzzle
+import src.state_encoding as se
+from src.vectorized_search import BatchedHeuristic, BatchedMoveGenerator, StateKeyPacker, _find_known, _find_new
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class VectorizedSearchUnittest(unittest.TestCase):
+    initial_state = [
+        [0, 0, 0],
+        [1, 2, 0],
+        [0, 3, 3],
+        [0, 3, 3]
+    ]
+
+    final_state = [
+        [3, 3, 0],
+        [3, 3, 0],
+        [2, 0, 0],
+        [1, 0, 0]
+    ]
+
+    def test_batched_successors(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        batched_move_generator = BatchedMoveGenerator(puzzle.move_generator)
+
+        # Second layer of states is expanded at once and compared with successors of each state
+        states = [child_state for child_state, _ in puzzle.move_generator.successors(puzzle.encoded_initial_state)]
+        children, parents, moves = batched_move_generator.expand(np.array([list(state) for state in states],
+                                                                          dtype=np.uint8))
+        expected_successors = sorted((index, child_state, move.block << 2 | move.direction.value)
+                                     for index, state in enumerate(states)
+                                     for child_state, move in puzzle.move_generator.successors(state))
+        actual_successors = sorted(zip(parents.tolist(), map(bytes, children), moves.tolist()))
+        self.assertListEqual(expected_successors, actual_successors)
+
+    def test_state_keys(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        batched_move_generator = BatchedMoveGenerator(puzzle.move_generator)
+        key_packer = StateKeyPacker(batched_move_generator, puzzle.encoded_initial_state)
+        self.assertTrue(key_packer.packs_anchors)
+
+        states = np.frombuffer(puzzle.encoded_initial_state, dtype=np.uint8)[None, :].copy()
+        keys = key_packer.pack(states)
+        for _ in range(3):
+            children, parents, moves = batched_move_generator.expand(states, key_packer.find_anchors(states, keys))
+            children_keys = key_packer.pack_children(children, keys, parents, moves)
+            # Keys derived from parents are the same as keys packed from boards
+            np.testing.assert_array_equal(key_packer.pack(children), children_keys)
+            states, keys = children, children_keys
+
+        # Cells are packed when anchors do not fit into a single word
+        key_packer.packs_anchors = False
+        cell_keys = key_packer.pack(states)
+        self.assertEqual(len({bytes(state) for state in states}), len({tuple(key) for key in cell_keys.tolist()}))
+        # Every state is among the unique keys
+        self.assertTrue(_find_known(cell_keys[_find_new(cell_keys[:0], cell_keys)], cell_keys).all())
+
+    def test_batched_heuristic(self):
+        for heuristic_function in [hf.Heuristics.MANHATTAN_DISTANCE, hf.Heuristics.EUCLIDEAN_DISTANCE]:
+            puzzle = Puzzle(heuristic_function.value, 4, 3, 3, self.initial_state,
+                            [self.final_state, self.initial_state[::-1]])
+            batched_move_generator = BatchedMoveGenerator(puzzle.move_generator)
+            batched_heuristic = BatchedHeuristic(heuristic_function.value, 4, 3, puzzle.encoded_final_states)
+
+            states = [child_state for child_state, _ in
+                      puzzle.move_generator.successors(puzzle.encoded_initial_state)]
+            state_array = np.array([list(state) for state in states], dtype=np.uint8)
+            values = batched_heuristic.score(state_array, batched_move_generator.find_anchors(state_array))
+            for state, value in zip(states, values):
+                self.assertAlmostEqual(puzzle.heuristic.value(puzzle.heuristic.evaluate(state)), value)
+
+    def test_breadth_first_solution(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        solution_exists, solution_path = puzzle.solve_breadth_first()
+
+        self.assertTrue(solution_exists)
+        self.assertListEqual(self.initial_state, solution_path[0].state)
+        self.assertListEqual(self.final_state, solution_path[-1].state)
+        self.assertEqual(8, len(solution_path))
+
+    def test_beam_solution(self):
+        puzzle = Puzzle(0, 4, 3, 3, self.initial_state, [self.final_state])
+        for beam_width in [1, 4, 1000]:
+            solution_exists, solution_path = puzzle.solve_beam(beam_width)
+
+            self.assertTrue(solution_exists)
+            self.assertListEqual(self.final_state, solution_path[-1].state)
+            # Consecutive states of the path differ by a single move
+            for node, next_node in zip(solution_path, solution_path[1:]):
+                self.assertIn(se.encode_state(next_node.state), [child_state for child_state, _ in
+                              puzzle.move_generator.successors(se.encode_state(node.state))])
+
+    def test_beam_solution_with_pattern_database(self):
+        puzzle = Puzzle(2, 4, 3, 3, self.initial_state, [self.final_state])
+        solution_exists, solution_path = puzzle.solve_beam(4)
+        self.assertTrue(solution_exists)
+        self.assertListEqual(self.final_state, solution_path[-1].state)
+
+    def test_unsolvable_puzzle(self):
+        puzzle = Puzzle(0, 3, 3, 2, [[0, 0, 0], [2, 2, 2], [0, 1, 0]], [[[0, 1, 0], [2, 2, 2], [0, 0, 0]]])
+        self.assertTupleEqual((False, None), puzzle.solve_breadth_first())
+        self.assertTupleEqual((False, None), puzzle.solve_beam(2))
+
+
+if __name__ == '__main__':
+    unittest.main()